@@ -2,6 +2,7 @@
 
 from typing import Dict, Any, Optional, List
 import os
+import time
 import logging
 from dataclasses import dataclass
 from langchain_openai import ChatOpenAI
@@ -152,6 +153,12 @@ class RealEstateAgent(BaseAgent):
     def __init__(self, config: AgentConfig, db_client=None):
         self.db_client = db_client
 
+        # Cached listings prompt, dropped on property change events
+        self.context_ttl = float(os.getenv("PROPERTIES_CONTEXT_TTL", "60"))
+        self._properties_context: Optional[str] = None
+        self._properties_context_at = 0.0
+        self._context_generation = 0
+
         system_prompt = """You are an expert real estate assistant for our property listings platform.
 
 IMPORTANT: You can ONLY discuss properties that are currently listed in our database. Do NOT discuss or recommend properties that are not in our inventory.
@@ -186,11 +193,20 @@ Be professional, knowledgeable, and helpful while staying focused on our propert
         else:
             logger.warning("CODEXHUB_MCP_AUTH_TOKEN not found, real estate web search disabled")
 
+    def invalidate_properties_context(self):
+        # Drop the cached listings prompt; an in-flight rebuild won't be stored
+        self._properties_context = None
+        self._context_generation += 1
+
     async def get_properties_context(self):
         # Fetch current property listings for context
         if not self.db_client:
             return "No database connection available."
 
+        if self._properties_context is not None and time.monotonic() - self._properties_context_at < self.context_ttl:
+            return self._properties_context
+        generation = self._context_generation
+
         try:
             db = self.db_client[os.getenv('DB_NAME', 'ai_agents')]
             properties = await db.properties.find({"status": "active"}).limit(50).to_list(50)
@@ -213,6 +229,9 @@ Amenities: {', '.join(prop.get('amenities', []))}
 MLS: {prop.get('mls_number', 'N/A')}
 ---"""
 
+            if generation == self._context_generation:
+                self._properties_context = properties_text
+                self._properties_context_at = time.monotonic()
             return properties_text
 
         except Exception as e:
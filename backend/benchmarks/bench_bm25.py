@@ -0,0 +1,129 @@
+# Keyword search latency: in-memory BM25 index vs a Mongo $text query over the same synthetic listings
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.bm25 import BM25Index
+from realty.search import TEXT_WEIGHTS
+
+LISTINGS = int(os.environ.get("BENCH_LISTINGS", "100000"))
+REPEATS = 50
+QUERIES = ["wine cellar", "ocean view malibu", "pool", "renovated kitchen garage", "fire*"]
+
+WORDS = (
+    "pool gym garage garden ocean view wine cellar fireplace renovated kitchen hardwood floors balcony "
+    "rooftop terrace doorman elevator basement patio deck lake mountain downtown quiet spacious modern "
+    "historic loft studio courtyard solar smart home office guest suite walk closet vaulted ceilings"
+).split()
+CITIES = ["Austin, TX", "Malibu, CA", "Brooklyn, NY", "Aspen, CO", "Miami, FL", "Seattle, WA"]
+
+
+def make_docs(n: int, seed: int = 7) -> List[dict]:
+    # Zipf-distributed terms: a few very common words and a long tail of rare ones
+    rng = np.random.default_rng(seed)
+    vocab = [f"term{i}" for i in range(20_000)]
+    for rank, word in enumerate(WORDS, start=1):
+        # Listing vocabulary sits below the filler head, as real descriptions are dominated by common words
+        vocab[rank * 25] = word
+    draws = iter(rng.zipf(1.3, size=n * 40) % len(vocab))
+
+    def words(k: int) -> List[str]:
+        return [vocab[next(draws)] for _ in range(k)]
+
+    return [
+        {
+            "id": f"bench-{i:07d}",
+            "title": " ".join(words(4)),
+            "description": " ".join(words(30)),
+            "location": CITIES[i % len(CITIES)],
+            "amenities": words(6),
+            "status": "sold" if i % 5 == 0 else "active",
+            "property_type": "condo" if i % 2 else "house",
+            "price": (i % 30 + 1) * 100_000,
+            "bedrooms": i % 6 + 1,
+        }
+        for i in range(n)
+    ]
+
+
+def timed_ms(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+def bench_memory(docs: List[dict]) -> None:
+    index = BM25Index()
+    start = time.perf_counter()
+    index.load(docs)
+    stats = index.stats()
+    print(
+        f"BM25 build: {time.perf_counter() - start:.2f}s, {stats['terms']} terms, "
+        f"{stats['postings']} postings ({stats['postings_bytes'] / 1e6:.1f} MB)"
+    )
+    for q in QUERIES:
+        ms = timed_ms(lambda: index.search(q, limit=20, status="active"))
+        print(f"  memory  {q!r:>28} {ms:8.3f} ms")
+
+
+def bench_mongo(docs: List[dict]) -> None:
+    mongo_url = os.environ.get("MONGO_URL")
+    if not mongo_url:
+        print("MONGO_URL not set; skipping $text comparison")
+        return
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+
+    client = MongoClient(mongo_url, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as e:
+        print(f"MongoDB unreachable ({e}); skipping $text comparison")
+        return
+
+    collection = client["bench_bm25"]["properties"]
+    try:
+        collection.drop()
+        collection.insert_many([dict(doc) for doc in docs], ordered=False)
+        collection.create_index(
+            [("status", 1), *((name, "text") for name in TEXT_WEIGHTS)],
+            weights=TEXT_WEIGHTS,
+            default_language="english",
+        )
+        for q in QUERIES:
+            # $text has no prefix matching, so the wildcard is dropped
+            text = q.replace("*", "")
+
+            def run():
+                list(
+                    collection.find(
+                        {"status": "active", "$text": {"$search": text}},
+                        {"_id": 0, "id": 1, "score": {"$meta": "textScore"}},
+                    ).sort([("score", {"$meta": "textScore"})]).limit(20)
+                )
+
+            print(f"  $text   {q!r:>28} {timed_ms(run):8.3f} ms")
+    finally:
+        client.drop_database("bench_bm25")
+        client.close()
+
+
+def main():
+    docs = make_docs(LISTINGS)
+    print(f"{LISTINGS} synthetic listings, mean of {REPEATS} runs per query")
+    bench_memory(docs)
+    bench_mongo(docs)
+
+
+if __name__ == "__main__":
+    main()
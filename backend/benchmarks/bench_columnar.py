@@ -0,0 +1,148 @@
+# Structured listing filters: columnar NumPy snapshot vs the indexed Mongo find over the same listings
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.columnar import ColumnarInventory
+from realty.indexes import INDEX_REGISTRY
+from realty.sorting import parse_sort
+
+LISTINGS = int(os.environ.get("BENCH_LISTINGS", "1000000"))
+REPEATS = 50
+PAGE = 20
+
+# (label, filters, sort) mirroring GET /api/properties query strings
+QUERIES = [
+    ("status", {"status": "active"}, None),
+    ("status+type", {"status": "active", "property_type": "condo"}, None),
+    ("status+price", {"status": "active", "min_price": 400_000, "max_price": 600_000}, None),
+    ("status+bedrooms+price", {"status": "active", "bedrooms": 3, "max_price": 900_000}, "-price"),
+    (
+        "status+type+bedrooms+price",
+        {"status": "active", "property_type": "house", "bedrooms": 4, "min_price": 1_500_000},
+        "price_per_sqft",
+    ),
+]
+TYPES = ["house", "condo", "townhouse", "apartment", "land"]
+
+
+def make_docs(n: int, seed: int = 11) -> List[dict]:
+    rng = np.random.default_rng(seed)
+    price = np.round(rng.lognormal(13.2, 0.6, n), -3)
+    sqft = rng.integers(500, 6000, n)
+    bedrooms = rng.integers(1, 7, n)
+    year_built = rng.integers(1900, 2024, n)
+    status = rng.choice(["active", "pending", "sold"], n, p=[0.8, 0.1, 0.1])
+    property_type = rng.choice(TYPES, n)
+    minutes = rng.integers(0, 525_600, n)
+    start = datetime(2023, 1, 1)
+    return [
+        {
+            "id": f"bench-{i:07d}",
+            "status": str(status[i]),
+            "property_type": str(property_type[i]),
+            "price": float(price[i]),
+            "bedrooms": int(bedrooms[i]),
+            "bathrooms": int(bedrooms[i]) // 2 + 1,
+            "sqft": int(sqft[i]),
+            "year_built": int(year_built[i]),
+            "price_per_sqft": round(float(price[i]) / int(sqft[i]), 2),
+            "created_at": start + timedelta(minutes=int(minutes[i])),
+        }
+        for i in range(n)
+    ]
+
+
+def timed_ms(fn) -> float:
+    # Median, so a noisy neighbour doesn't dominate sub-millisecond timings
+    runs = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return float(np.median(runs)) * 1000
+
+
+def mongo_query(filters: Dict) -> Dict:
+    # The filter _property_query builds in server.py
+    query = {"status": filters["status"]}
+    if "property_type" in filters:
+        query["property_type"] = filters["property_type"]
+    if "min_price" in filters:
+        query.setdefault("price", {})["$gte"] = filters["min_price"]
+    if "max_price" in filters:
+        query.setdefault("price", {})["$lte"] = filters["max_price"]
+    if "bedrooms" in filters:
+        query["bedrooms"] = filters["bedrooms"]
+    return query
+
+
+def bench_memory(docs: List[dict]) -> None:
+    inventory = ColumnarInventory(("active", "pending"))
+    start = time.perf_counter()
+    for doc in docs:
+        inventory.upsert(doc)
+    stats = inventory.stats()
+    print(
+        f"Columnar build: {time.perf_counter() - start:.2f}s, {stats['listings']} listings "
+        f"({stats['bytes'] / 1e6:.1f} MB)"
+    )
+    for label, filters, sort in QUERIES:
+        mask_ms = timed_ms(lambda: inventory.mask(**filters))
+        matches = int(inventory.mask(**filters).sum())
+        page_ms = timed_ms(lambda: inventory.page(parse_sort(sort), PAGE, **filters))
+        print(f"  memory  {label:>28} mask {mask_ms:7.3f} ms  page {page_ms:7.3f} ms  ({matches} matches)")
+
+
+def bench_mongo(docs: List[dict]) -> None:
+    mongo_url = os.environ.get("MONGO_URL")
+    if not mongo_url:
+        print("MONGO_URL not set; skipping Mongo comparison")
+        return
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+
+    client = MongoClient(mongo_url, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as e:
+        print(f"MongoDB unreachable ({e}); skipping Mongo comparison")
+        return
+
+    collection = client["bench_columnar"]["properties"]
+    try:
+        collection.drop()
+        for i in range(0, len(docs), 50_000):
+            collection.insert_many([dict(doc) for doc in docs[i:i + 50_000]], ordered=False)
+        collection.create_indexes([spec.to_model() for spec in INDEX_REGISTRY if spec.collection == "properties"])
+        for label, filters, sort in QUERIES:
+            keyset = parse_sort(sort)
+
+            def run():
+                list(collection.find(mongo_query(filters), {"_id": 0}).sort(keyset.spec()).limit(PAGE))
+
+            print(f"  mongo   {label:>28} page {timed_ms(run):7.3f} ms")
+    finally:
+        client.drop_database("bench_columnar")
+        client.close()
+
+
+def main():
+    docs = make_docs(LISTINGS)
+    print(f"{LISTINGS} synthetic listings, median of {REPEATS} runs per query, {PAGE} per page")
+    bench_memory(docs)
+    bench_mongo(docs)
+
+
+if __name__ == "__main__":
+    main()
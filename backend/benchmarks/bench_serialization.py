@@ -0,0 +1,84 @@
+# Per-request serialization cost: validated response_model path vs trusted orjson path
+
+import json
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from pydantic import TypeAdapter
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from server import Property
+from realty.serialization import fast_response, trusted_dump_many
+
+SIZES = [100, 1_000, 10_000]
+REPEATS = 5
+
+
+def make_docs(n: int) -> List[dict]:
+    # Shaped like Mongo documents, including _id
+    return [
+        {
+            "_id": i,
+            "id": str(uuid.uuid4()),
+            "title": f"Listing {i}",
+            "description": "Bright home with an open floor plan and a renovated kitchen. " * 4,
+            "price": 400_000 + i,
+            "location": "Austin, TX",
+            "address": f"{i} Main St, Austin, TX 78701",
+            "bedrooms": 3,
+            "bathrooms": 2,
+            "sqft": 1800,
+            "property_type": "house",
+            "status": "active",
+            "image_url": "https://example.com/image.jpg",
+            "amenities": ["Pool", "Gym", "Garage"],
+            "year_built": 2010,
+            "garage": 2,
+            "lot_size": 0.25,
+            "mls_number": f"AU{i:08d}",
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+        }
+        for i in range(n)
+    ]
+
+
+def validated_path(docs: List[dict], adapter: TypeAdapter) -> bytes:
+    # Property(**doc), then FastAPI's response_model validation and stdlib json encoding
+    models = [Property(**doc) for doc in docs]
+    content = adapter.validate_python([m.model_dump() for m in models])
+    return json.dumps(adapter.dump_python(content, mode="json")).encode()
+
+
+def fast_path(docs: List[dict], adapter: TypeAdapter) -> bytes:
+    return fast_response(trusted_dump_many(Property, docs)).body
+
+
+def best_of(fn, docs, adapter) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(docs, adapter)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    adapter = TypeAdapter(List[Property])
+    print(f"{'listings':>10} {'validated ms':>14} {'fast ms':>10} {'speedup':>9}")
+    for n in SIZES:
+        docs = make_docs(n)
+        slow = best_of(validated_path, docs, adapter)
+        fast = best_of(fast_path, docs, adapter)
+        print(f"{n:>10} {slow:>14.2f} {fast:>10.2f} {slow / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# Property inventory storage helpers
+
+from .amenities import (
+    AMENITY_ALIASES,
+    TAG_FIELD,
+    amenity_filter,
+    amenity_tags,
+    backfill_amenity_tags,
+    normalize_amenity,
+    parse_amenities,
+)
+from .archive import (
+    ARCHIVE_COLLECTION,
+    HOT_STATUSES,
+    ListingArchiver,
+    archivable_query,
+    archive_listings,
+    is_archived_status,
+    merge_pages,
+    merge_ranked,
+    restore_listing,
+)
+from .batch import fetch_by_ids, ordered_results
+from .bm25 import BM25Index, BM25Maintainer, tokenize
+from .columnar import COLUMNAR_FIELDS, ColumnarInventory, ColumnarMaintainer
+from .cache import CollectionVersion, VersionedLRUCache, cache_key
+from .etag import compute_etag, conditional_json_response, etag_headers, etag_matches
+from .export import EXPORT_FORMATS, export_rows
+from .facets import FACET_FIELDS, PRICE_BOUNDARIES, facet_pipeline, shape_facets
+from .geo import (
+    GEO_FIELD,
+    METERS_PER_MILE,
+    OfflineGeocoder,
+    geo_point,
+    near_pipeline,
+    normalize_place,
+    parse_bbox,
+    parse_point,
+    within_bbox,
+)
+from .indexes import INDEX_REGISTRY, QUERY_SHAPES, IndexSpec, QueryShape, ensure_indexes, find_collscans
+from .ingest import IngestReport, ingest_ndjson
+from .invalidation import ChangeEvent, ChangeWatcher, InvalidationBus
+from .mirror import MirrorMaintainer
+from .pagination import DEFAULT_PROPERTY_SORT, KeysetSort
+from .projection import parse_fields, to_projection, trim
+from .search import TEXT_SCORE, TEXT_WEIGHTS, ParsedSearch, parse_search_query, text_query
+from .serialization import cached_json_response, fast_response, render_json, trusted_dump, trusted_dump_many
+from .similar import NUMERIC_FEATURES, SIMILAR_FIELDS, SimilarityIndex, SimilarityMaintainer
+from .sorting import (
+    PRICE_PER_SQFT_EXPR,
+    PROPERTY_SORTS,
+    SORT_FIELDS,
+    backfill_price_per_sqft,
+    parse_sort,
+    price_per_sqft,
+)
+from .status_checks import (
+    STATUS_CHECK_SORT,
+    STATUS_CHECK_TTL_INDEX,
+    ensure_status_check_ttl,
+    latest_pipeline,
+    parse_clients,
+    status_check_query,
+)
+from .stats import STATS_FIELDS, InventoryStats, QuantileSketch, StatsMaintainer
+from .updates import INITIAL_VERSION, PatchOp, bulk_patch, parse_if_match, version_filter, versioned_update
+from .write_behind import WriteBehindQueue
+from .valuation import DEFAULT_COMPARABLE_STATUSES, VALUATION_FIELDS, ComparableSet
+
+__all__ = [
+    "AMENITY_ALIASES",
+    "TAG_FIELD",
+    "amenity_filter",
+    "amenity_tags",
+    "backfill_amenity_tags",
+    "normalize_amenity",
+    "parse_amenities",
+    "ARCHIVE_COLLECTION",
+    "HOT_STATUSES",
+    "ListingArchiver",
+    "archivable_query",
+    "archive_listings",
+    "is_archived_status",
+    "merge_pages",
+    "merge_ranked",
+    "restore_listing",
+    "fetch_by_ids",
+    "ordered_results",
+    "BM25Index",
+    "BM25Maintainer",
+    "tokenize",
+    "CollectionVersion",
+    "VersionedLRUCache",
+    "cache_key",
+    "COLUMNAR_FIELDS",
+    "ColumnarInventory",
+    "ColumnarMaintainer",
+    "compute_etag",
+    "conditional_json_response",
+    "etag_headers",
+    "etag_matches",
+    "EXPORT_FORMATS",
+    "export_rows",
+    "FACET_FIELDS",
+    "PRICE_BOUNDARIES",
+    "facet_pipeline",
+    "shape_facets",
+    "GEO_FIELD",
+    "METERS_PER_MILE",
+    "OfflineGeocoder",
+    "geo_point",
+    "near_pipeline",
+    "normalize_place",
+    "parse_bbox",
+    "parse_point",
+    "within_bbox",
+    "INDEX_REGISTRY",
+    "QUERY_SHAPES",
+    "IndexSpec",
+    "QueryShape",
+    "ensure_indexes",
+    "find_collscans",
+    "IngestReport",
+    "ingest_ndjson",
+    "ChangeEvent",
+    "ChangeWatcher",
+    "InvalidationBus",
+    "MirrorMaintainer",
+    "DEFAULT_PROPERTY_SORT",
+    "KeysetSort",
+    "parse_fields",
+    "to_projection",
+    "trim",
+    "TEXT_SCORE",
+    "TEXT_WEIGHTS",
+    "ParsedSearch",
+    "parse_search_query",
+    "text_query",
+    "cached_json_response",
+    "fast_response",
+    "render_json",
+    "trusted_dump",
+    "trusted_dump_many",
+    "NUMERIC_FEATURES",
+    "SIMILAR_FIELDS",
+    "SimilarityIndex",
+    "SimilarityMaintainer",
+    "PRICE_PER_SQFT_EXPR",
+    "PROPERTY_SORTS",
+    "SORT_FIELDS",
+    "backfill_price_per_sqft",
+    "parse_sort",
+    "price_per_sqft",
+    "STATUS_CHECK_SORT",
+    "STATUS_CHECK_TTL_INDEX",
+    "ensure_status_check_ttl",
+    "latest_pipeline",
+    "parse_clients",
+    "status_check_query",
+    "STATS_FIELDS",
+    "InventoryStats",
+    "QuantileSketch",
+    "StatsMaintainer",
+    "INITIAL_VERSION",
+    "PatchOp",
+    "bulk_patch",
+    "parse_if_match",
+    "version_filter",
+    "versioned_update",
+    "WriteBehindQueue",
+    "DEFAULT_COMPARABLE_STATUSES",
+    "VALUATION_FIELDS",
+    "ComparableSet"
+]
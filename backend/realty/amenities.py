@@ -0,0 +1,78 @@
+# Normalized amenity tags for index-backed any/all filtering
+
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+TAG_FIELD = "amenity_tags"
+
+# Common spellings folded onto one tag
+AMENITY_ALIASES = {
+    "swimming pool": "pool",
+    "pools": "pool",
+    "fitness center": "gym",
+    "fitness room": "gym",
+    "home gym": "gym",
+    "garages": "garage",
+    "parking garage": "garage",
+    "ac": "air conditioning",
+    "a c": "air conditioning",
+    "central air": "air conditioning",
+    "washer dryer": "laundry",
+    "in unit laundry": "laundry",
+}
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_amenity(value: str) -> str:
+    # "Swimming-Pool " -> "pool"
+    tag = " ".join(_NON_WORD.sub(" ", value.lower()).split())
+    return AMENITY_ALIASES.get(tag, tag)
+
+
+def amenity_tags(amenities: Optional[Iterable[str]]) -> List[str]:
+    # Sorted, de-duplicated tags for a listing's free-form amenities
+    return sorted({tag for tag in (normalize_amenity(a) for a in amenities or []) if tag})
+
+
+def parse_amenities(value: Optional[str]) -> Optional[List[str]]:
+    # "Pool, Gym" -> ["gym", "pool"]; None when absent or empty
+    if value is None:
+        return None
+    return amenity_tags(value.split(",")) or None
+
+
+def amenity_filter(query: Dict[str, Any], all_of: Optional[List[str]], any_of: Optional[List[str]]) -> Dict[str, Any]:
+    # $all and $in on the same multikey field; both may apply at once
+    if not all_of and not any_of:
+        return query
+    condition: Dict[str, Any] = {}
+    if all_of:
+        condition["$all"] = all_of
+    if any_of:
+        condition["$in"] = any_of
+    return {**query, TAG_FIELD: condition}
+
+
+async def backfill_amenity_tags(collection, batch_size: int = 1000) -> int:
+    # Tag documents written before amenity_tags existed; returns how many were updated
+    updated = 0
+    batch: List[UpdateOne] = []
+    cursor = collection.find({TAG_FIELD: {"$exists": False}}, {"_id": 0, "id": 1, "amenities": 1})
+    try:
+        async for doc in cursor.batch_size(batch_size):
+            batch.append(UpdateOne({"id": doc["id"]}, {"$set": {TAG_FIELD: amenity_tags(doc.get("amenities"))}}))
+            if len(batch) >= batch_size:
+                updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+                batch = []
+        if batch:
+            updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+    except PyMongoError as e:
+        logger.error(f"Amenity tag backfill failed: {e}")
+    return updated
@@ -0,0 +1,168 @@
+# Hot/cold partitioning: listings that left active/pending move to an archive collection
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from pymongo import ASCENDING, ReplaceOne
+from pymongo.errors import PyMongoError
+
+from .pagination import KeysetSort
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLLECTION = "properties_archive"
+
+# Statuses that always stay in the hot collection, whatever their age
+HOT_STATUSES = ("active", "pending")
+
+
+def is_archived_status(status: Optional[str]) -> bool:
+    # Listing queries for any other status read through to the archive
+    return status is not None and status not in HOT_STATUSES
+
+
+def archivable_query(cutoff: datetime) -> Dict[str, Any]:
+    # Served by the updated_at index; every write bumps updated_at, so an edited listing restarts its clock
+    return {"status": {"$nin": list(HOT_STATUSES)}, "updated_at": {"$lt": cutoff}}
+
+
+async def archive_listings(hot, cold, cutoff: datetime, batch_size: int = 500) -> int:
+    # Copy-then-delete in batches. The copy is an idempotent upsert, so a crash between the two steps
+    # only leaves a duplicate that the next run cleans up (readers prefer the hot copy meanwhile).
+    # Documents keep their _id both ways: change-stream deletes identify listings by it.
+    query = archivable_query(cutoff)
+    moved = 0
+    while True:
+        docs = await hot.find(query).sort("updated_at", ASCENDING).limit(batch_size).to_list(batch_size)
+        if not docs:
+            return moved
+        ids = [doc["id"] for doc in docs]
+        await cold.bulk_write([ReplaceOne({"id": doc["id"]}, doc, upsert=True) for doc in docs], ordered=False)
+
+        # Re-check the guard: a listing relisted or edited since the copy stays hot
+        result = await hot.delete_many({"id": {"$in": ids}, **query})
+        moved += result.deleted_count
+        if result.deleted_count < len(ids):
+            kept = await hot.distinct("id", {"id": {"$in": ids}})
+            if kept:
+                await cold.delete_many({"id": {"$in": kept}})
+        if len(docs) < batch_size:
+            return moved
+
+
+async def restore_listing(hot, cold, property_id: str) -> bool:
+    # Move one archived listing back so it can be edited (e.g. relisted as active)
+    doc = await cold.find_one({"id": property_id})
+    if doc is None:
+        return False
+    await hot.replace_one({"id": property_id}, doc, upsert=True)
+    await cold.delete_one({"id": property_id})
+    return True
+
+
+def _sort_key(keyset: KeysetSort) -> Callable[[Mapping[str, Any]], Any]:
+    # Mongo's order: null/missing before every value, `id` as the tie-breaker
+    def key(doc: Mapping[str, Any]) -> Any:
+        value = doc.get(keyset.field)
+        return (value is not None, value, doc["id"])
+    return key
+
+
+def merge_pages(
+    hot: List[Dict[str, Any]],
+    cold: List[Dict[str, Any]],
+    keyset: KeysetSort,
+    limit: int,
+) -> List[Dict[str, Any]]:
+    # Both inputs are sorted pages of the same query; a listing present in both (mid-move) is
+    # taken from the hot side
+    merged = _union(hot, cold)
+    merged.sort(key=_sort_key(keyset), reverse=keyset.direction != ASCENDING)
+    return merged[:limit]
+
+
+def merge_ranked(hot: List[Dict[str, Any]], cold: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    # merge_pages for $text results: highest `score` first, `id` breaking ties
+    merged = _union(hot, cold)
+    merged.sort(key=lambda doc: (-doc["score"], doc["id"]))
+    return merged[:limit]
+
+
+def _union(hot: List[Dict[str, Any]], cold: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    hot_ids = {doc["id"] for doc in hot}
+    return hot + [doc for doc in cold if doc["id"] not in hot_ids]
+
+
+class ListingArchiver:
+    # Periodically moves listings whose status left active/pending more than `after_days` ago.
+    # `on_archive` is called with the number moved so caches and mirrors can drop them.
+
+    def __init__(
+        self,
+        hot,
+        cold,
+        after_days: float,
+        interval: float = 3600.0,
+        batch_size: int = 500,
+        on_archive: Optional[Callable[[int], None]] = None,
+    ):
+        self.hot = hot
+        self.cold = cold
+        self.after_days = after_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.on_archive = on_archive
+        self.runs = 0
+        self.archived = 0
+        self.last_run_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def cutoff(self, after_days: Optional[float] = None) -> datetime:
+        return datetime.utcnow() - timedelta(days=self.after_days if after_days is None else after_days)
+
+    async def run_once(self, after_days: Optional[float] = None) -> int:
+        # Runs never overlap; a manual run waits for the periodic one
+        async with self._lock:
+            started = time.perf_counter()
+            moved = await archive_listings(self.hot, self.cold, self.cutoff(after_days), self.batch_size)
+            self.runs += 1
+            self.archived += moved
+            self.last_run_seconds = round(time.perf_counter() - started, 3)
+        if moved:
+            logger.info(f"Archived {moved} listings in {self.last_run_seconds}s")
+            if self.on_archive is not None:
+                self.on_archive(moved)
+        return moved
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except PyMongoError as e:
+                logger.error(f"Listing archival failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "after_days": self.after_days,
+            "runs": self.runs,
+            "archived": self.archived,
+            "last_run_seconds": self.last_run_seconds,
+        }
@@ -0,0 +1,48 @@
+# Batch get-by-ids: cached documents first, one $in query for the rest
+
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from .cache import VersionedLRUCache, cache_key
+
+
+async def fetch_by_ids(
+    collection,
+    ids: List[str],
+    projection: Optional[Dict[str, Any]],
+    dump: Callable[[Mapping[str, Any]], Dict[str, Any]],
+    cache: Optional[VersionedLRUCache] = None,
+    fields: Optional[str] = None,
+    fallback=None,
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    # id -> dumped document, or None when it doesn't exist; duplicate ids are looked up once.
+    # Ids missing from `collection` get one more $in against `fallback` (e.g. the archive).
+    found: Dict[str, Optional[Dict[str, Any]]] = {}
+    misses: List[str] = []
+    for doc_id in dict.fromkeys(ids):
+        cached = cache.get(cache_key("doc", id=doc_id, fields=fields)) if cache is not None else None
+        if cached is not None:
+            found[doc_id] = cached
+        else:
+            misses.append(doc_id)
+
+    version = cache.version.value if cache is not None else None
+    for source in (collection, fallback):
+        if source is None or not misses:
+            continue
+        async for doc in source.find({"id": {"$in": misses}}, projection).batch_size(len(misses)):
+            dumped = dump(doc)
+            found[doc["id"]] = dumped
+            if cache is not None:
+                cache.set(cache_key("doc", id=doc["id"], fields=fields), dumped, version)
+        misses = [doc_id for doc_id in misses if doc_id not in found]
+    return {doc_id: found.get(doc_id) for doc_id in ids}
+
+
+def ordered_results(ids: List[str], found: Mapping[str, Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    # Request order, one entry per requested id, with explicit not-found markers
+    results = [
+        {"id": doc_id, "found": found.get(doc_id) is not None, "property": found.get(doc_id)}
+        for doc_id in ids
+    ]
+    not_found = [doc_id for doc_id in dict.fromkeys(ids) if found.get(doc_id) is None]
+    return {"results": results, "not_found": not_found}
@@ -0,0 +1,343 @@
+# Incrementally maintained in-memory BM25 index over listings
+
+import math
+import re
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .mirror import MirrorMaintainer
+
+# Field boosts folded into term frequencies (a simple BM25F)
+FIELD_WEIGHTS = {"title": 3.0, "location": 2.0, "amenities": 2.0, "description": 1.0}
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or the to with".split()
+)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_MAX_PREFIX_EXPANSIONS = 64
+# Posting lists at least this long keep their scores between queries (4 bytes per posting)
+_MEMOIZED_POSTINGS = 4096
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _field_text(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return str(value) if value is not None else ""
+
+
+class BM25Index:
+    # Postings are typed arrays (int32 slots, float32 weighted tf) read through zero-copy NumPy views.
+    # Slots are append-only, so removals are tombstones until the next compaction.
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, field_weights: Mapping[str, float] = FIELD_WEIGHTS):
+        self.k1 = k1
+        self.b = b
+        self.field_weights = dict(field_weights)
+        self.ready = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._term_ids: Dict[str, int] = {}
+        self._postings_slots: List[array] = []
+        self._postings_tf: List[array] = []
+        self._df = array("i")
+        self._sorted_terms: Optional[List[str]] = None
+        self._impact_cache: Dict[int, Tuple[Tuple[Any, ...], np.ndarray]] = {}
+
+        self._ids: List[Optional[str]] = []
+        self._slot_of: Dict[str, int] = {}
+        self._doc_terms: List[Optional[Tuple[array, array]]] = []
+        self._alive = array("b")
+        self._doc_len = array("f")
+        self._total_len = 0.0
+
+        # Filter columns, one entry per slot
+        self._codes: Dict[str, Dict[str, int]] = {"status": {}, "property_type": {}}
+        self._status = array("i")
+        self._type = array("i")
+        self._price = array("q")
+        self._bedrooms = array("i")
+
+    # --- maintenance ---------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def load(self, docs: Iterable[Mapping[str, Any]]) -> None:
+        self._reset()
+        for doc in docs:
+            self.upsert(doc)
+        self.ready = True
+
+    def upsert(self, doc: Mapping[str, Any]) -> None:
+        doc_id = doc["id"]
+        if doc_id in self._slot_of:
+            self.remove(doc_id)
+
+        weighted: Dict[int, float] = {}
+        for field_name, weight in self.field_weights.items():
+            for token in tokenize(_field_text(doc.get(field_name))):
+                tid = self._term_id(token)
+                weighted[tid] = weighted.get(tid, 0.0) + weight
+
+        slot = len(self._ids)
+        self._ids.append(doc_id)
+        self._slot_of[doc_id] = slot
+        self._alive.append(1)
+        length = sum(weighted.values())
+        self._doc_len.append(length)
+        self._total_len += length
+        self._status.append(self._code("status", doc.get("status")))
+        self._type.append(self._code("property_type", doc.get("property_type")))
+        self._price.append(int(doc.get("price") or 0))
+        self._bedrooms.append(int(doc.get("bedrooms") or 0))
+
+        tids, tfs = array("i"), array("f")
+        for tid, tf in weighted.items():
+            self._postings_slots[tid].append(slot)
+            self._postings_tf[tid].append(tf)
+            self._df[tid] += 1
+            tids.append(tid)
+            tfs.append(tf)
+        self._doc_terms.append((tids, tfs))
+
+    def remove(self, doc_id: str) -> bool:
+        slot = self._slot_of.pop(doc_id, None)
+        if slot is None:
+            return False
+        self._alive[slot] = 0
+        self._total_len -= self._doc_len[slot]
+        tids, _ = self._doc_terms[slot]
+        for tid in tids:
+            self._df[tid] -= 1
+        self._doc_terms[slot] = None
+        self._ids[slot] = None
+
+        # Rebuild postings once tombstones dominate
+        if len(self._ids) > 1024 and len(self._slot_of) < len(self._ids) // 2:
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        # Renumber live slots and drop tombstoned postings
+        live = [slot for slot, alive in enumerate(self._alive) if alive]
+        terms = {tid: term for term, tid in self._term_ids.items()}
+        codes = {name: {code: value for value, code in mapping.items()} for name, mapping in self._codes.items()}
+        snapshot = [
+            (
+                self._ids[slot],
+                self._doc_terms[slot],
+                codes["status"].get(self._status[slot]),
+                codes["property_type"].get(self._type[slot]),
+                self._price[slot],
+                self._bedrooms[slot],
+                self._doc_len[slot],
+            )
+            for slot in live
+        ]
+        self._reset()
+        for doc_id, (tids, tfs), status, property_type, price, bedrooms, length in snapshot:
+            slot = len(self._ids)
+            self._ids.append(doc_id)
+            self._slot_of[doc_id] = slot
+            self._alive.append(1)
+            self._doc_len.append(length)
+            self._total_len += length
+            self._status.append(self._code("status", status))
+            self._type.append(self._code("property_type", property_type))
+            self._price.append(price)
+            self._bedrooms.append(bedrooms)
+            new_tids = array("i")
+            for tid, tf in zip(tids, tfs):
+                new_tid = self._term_id(terms[tid])
+                self._postings_slots[new_tid].append(slot)
+                self._postings_tf[new_tid].append(tf)
+                self._df[new_tid] += 1
+                new_tids.append(new_tid)
+            self._doc_terms.append((new_tids, tfs))
+        self.ready = True
+
+    def _term_id(self, term: str) -> int:
+        tid = self._term_ids.get(term)
+        if tid is None:
+            tid = len(self._postings_slots)
+            self._term_ids[term] = tid
+            self._postings_slots.append(array("i"))
+            self._postings_tf.append(array("f"))
+            self._df.append(0)
+            self._sorted_terms = None
+        return tid
+
+    def _code(self, column: str, value: Optional[str]) -> int:
+        mapping = self._codes[column]
+        if value is None:
+            return -1
+        return mapping.setdefault(value, len(mapping))
+
+    # --- querying --------------------------------------------------------------
+
+    def _expand(self, token: str) -> List[int]:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._term_ids)
+        start = bisect_left(self._sorted_terms, token)
+        expanded = []
+        for term in self._sorted_terms[start:start + _MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            expanded.append(self._term_ids[term])
+        return expanded
+
+    def _query_terms(self, query: str, prefix: bool) -> List[int]:
+        raw = query.lower().split()
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        wildcard = {t.rstrip("*") for t in raw if t.endswith("*")}
+        tids: List[int] = []
+        for i, token in enumerate(tokens):
+            if token in wildcard or (prefix and i == len(tokens) - 1):
+                tids.extend(self._expand(token))
+            elif token in self._term_ids:
+                tids.append(self._term_ids[token])
+        return list(dict.fromkeys(tids))
+
+    def _impacts(self, tid: int, slots: np.ndarray, df: int, n_docs: int, avg_len: float, doc_len: np.ndarray) -> np.ndarray:
+        # Per-posting BM25 contributions; long lists are memoized until the corpus statistics move
+        key = (len(slots), df, n_docs, self._total_len)
+        cached = self._impact_cache.get(tid)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        tf = np.frombuffer(self._postings_tf[tid], dtype=np.float32)
+        idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1.0 - self.b + self.b * doc_len[slots] / avg_len)
+        impacts = (idf * (self.k1 + 1.0)) * tf / (tf + norm)
+        if len(slots) >= _MEMOIZED_POSTINGS:
+            self._impact_cache[tid] = (key, impacts)
+        return impacts
+
+    def _filter(
+        self,
+        slots: np.ndarray,
+        status: Optional[str],
+        property_type: Optional[str],
+        min_price: Optional[int],
+        max_price: Optional[int],
+        bedrooms: Optional[int],
+    ) -> np.ndarray:
+        # Boolean mask over `slots` for the structured filters (tombstones excluded)
+        mask = np.frombuffer(self._alive, dtype=np.int8)[slots] == 1
+        if status is not None:
+            mask &= np.frombuffer(self._status, dtype=np.int32)[slots] == self._codes["status"].get(status, -2)
+        if property_type:
+            mask &= np.frombuffer(self._type, dtype=np.int32)[slots] == self._codes["property_type"].get(property_type, -2)
+        if min_price is not None:
+            mask &= np.frombuffer(self._price, dtype=np.int64)[slots] >= min_price
+        if max_price is not None:
+            mask &= np.frombuffer(self._price, dtype=np.int64)[slots] <= max_price
+        if bedrooms is not None:
+            mask &= np.frombuffer(self._bedrooms, dtype=np.int32)[slots] == bedrooms
+        return mask
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        prefix: bool = True,
+        status: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        bedrooms: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        # (id, score) pairs, best first
+        tids = self._query_terms(query, prefix)
+        if not tids or not self._slot_of:
+            return []
+
+        n_docs = len(self._slot_of)
+        avg_len = self._total_len / n_docs if n_docs else 1.0
+        doc_len = np.frombuffer(self._doc_len, dtype=np.float32)
+        matched_slots, contributions = [], []
+        for tid in tids:
+            df = self._df[tid]
+            if df <= 0:
+                continue
+            slots = np.frombuffer(self._postings_slots[tid], dtype=np.int32)
+            matched_slots.append(slots)
+            contributions.append(self._impacts(tid, slots, df, n_docs, avg_len, doc_len))
+        if not matched_slots:
+            return []
+
+        slots = np.concatenate(matched_slots)
+        contribution = np.concatenate(contributions)
+        if slots.size * 8 < len(self._ids):
+            # Rare terms: sum per slot without touching a dense score vector
+            matched, inverse = np.unique(slots, return_inverse=True)
+            summed = np.bincount(inverse, weights=contribution)
+        else:
+            dense = np.bincount(slots, weights=contribution, minlength=len(self._ids))
+            matched = np.flatnonzero(dense)
+            summed = dense[matched]
+
+        # Filter on the matched slots, keeping scores aligned
+        keep = self._filter(matched, status, property_type, min_price, max_price, bedrooms)
+        if not keep.any():
+            return []
+        candidates = matched[keep]
+        candidate_scores = summed[keep]
+        wanted = offset + limit
+        if candidates.size > wanted:
+            top = np.argpartition(-candidate_scores, wanted - 1)[:wanted]
+        else:
+            top = np.arange(candidates.size)
+        # Score descending, then slot for a stable order
+        order = top[np.lexsort((candidates[top], -candidate_scores[top]))]
+        return [
+            (self._ids[candidates[i]], float(candidate_scores[i]))
+            for i in order[offset:wanted]
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        postings = sum(len(p) for p in self._postings_slots)
+        return {
+            "ready": self.ready,
+            "documents": len(self._slot_of),
+            "slots": len(self._ids),
+            "terms": len(self._term_ids),
+            "postings": postings,
+            "postings_bytes": postings * 8,
+        }
+
+
+# Fields the index needs from each property document
+INDEXED_FIELDS = ("id", "status", "property_type", "price", "bedrooms", *FIELD_WEIGHTS)
+
+
+class BM25Maintainer(MirrorMaintainer):
+    # MirrorMaintainer over a BM25Index
+
+    def __init__(self, collection, batch_size: int = 1000, refresh_interval: Optional[float] = None, **index_options):
+        super().__init__(
+            collection,
+            lambda: BM25Index(**index_options),
+            INDEXED_FIELDS,
+            name="Search index",
+            batch_size=batch_size,
+            refresh_interval=refresh_interval,
+        )
+
+    @property
+    def index(self) -> BM25Index:
+        return self.mirror
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.index.stats(), **super().stats()}
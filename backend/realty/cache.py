@@ -0,0 +1,111 @@
+# Versioned read-through cache for property queries
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class CollectionVersion:
+    # Monotonic write counter for one collection; bumped on every mutation
+    def __init__(self, name: str):
+        self.name = name
+        self.value = 0
+
+    def bump(self) -> int:
+        self.value += 1
+        return self.value
+
+
+def cache_key(namespace: str, **params: Any) -> Tuple[Hashable, ...]:
+    # Canonical key: parameter order and unset (None) parameters don't matter
+    items = []
+    for name in sorted(params):
+        value = params[name]
+        if value is None:
+            continue
+        if isinstance(value, (list, set, tuple)):
+            value = tuple(sorted(value)) if isinstance(value, set) else tuple(value)
+        items.append((name, value))
+    return (namespace, tuple(items))
+
+
+class VersionedLRUCache:
+    # Bounded LRU with TTL; entries written under an older collection version are stale
+
+    def __init__(
+        self,
+        version: CollectionVersion,
+        max_size: int = 256,
+        ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.version = version
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[int, float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        version, expires_at, value = entry
+        if version != self.version.value:
+            del self._entries[key]
+            self.invalidations += 1
+            self.misses += 1
+            return default
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        # Pass the version read *before* querying so a concurrent write can't be masked
+        if version is None:
+            version = self.version.value
+        if version != self.version.value or self.max_size <= 0:
+            return
+
+        self._entries[key] = (version, self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self) -> int:
+        # Bump the collection version; every existing entry becomes stale lazily
+        return self.version.bump()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "collection": self.version.name,
+            "version": self.version.value,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
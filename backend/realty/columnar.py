@@ -0,0 +1,280 @@
+# Columnar in-memory snapshot of hot listings: structured filters as vectorized NumPy masks
+
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from pymongo import ASCENDING
+
+from .mirror import MirrorMaintainer
+from .pagination import KeysetSort
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Numeric columns. Float columns are the sort keys: float64 so cursor values round-trip exactly
+# (created_at is microseconds since the epoch), with null/missing stored as -inf, which is where
+# Mongo orders nulls. Integer columns use -1 for null.
+COLUMN_DTYPES: Dict[str, Any] = {
+    "price": np.float64,
+    "bedrooms": np.int16,
+    "bathrooms": np.int16,
+    "sqft": np.float64,
+    "year_built": np.float64,
+    "price_per_sqft": np.float64,
+    "created_at": np.float64,
+}
+
+# Above this many matches, page() first bounds the sort key from a strided sample so only a
+# handful of rows are gathered and sorted
+_SAMPLE_ABOVE = 4096
+_SAMPLE_SIZE = 16384
+
+# Null price in the int32 filter column; also below any price bound a query can carry
+_PRICE_NULL = np.iinfo(np.int32).min
+_PRICE_MAX = np.iinfo(np.int32).max
+
+COLUMNAR_FIELDS = ("id", "status", "property_type", *COLUMN_DTYPES)
+
+
+def _null(dtype: Any) -> Any:
+    return -1 if np.issubdtype(dtype, np.integer) else -np.inf
+
+
+_INTEGER_COLUMNS = {name for name, dtype in COLUMN_DTYPES.items() if np.issubdtype(dtype, np.integer)}
+_INT16_RANGE = (np.iinfo(np.int16).min + 1, np.iinfo(np.int16).max)
+
+
+def _to_column(value: Any, integer: bool = False) -> Any:
+    # Plain Python numbers: assigning them into the arrays is much cheaper than NumPy scalars
+    if value is None:
+        return -1 if integer else -math.inf
+    if isinstance(value, datetime):
+        return (value.replace(tzinfo=None) - _EPOCH) / _MICROSECOND
+    try:
+        converted = float(value)
+    except (TypeError, ValueError):
+        converted = math.nan
+    if integer:
+        if converted != converted or not _INT16_RANGE[0] <= converted <= _INT16_RANGE[1]:
+            return -1
+        return int(converted)
+    return -math.inf if converted != converted else converted
+
+
+def _from_column(field: str, value: float) -> Any:
+    # Inverse of _to_column for cursor values
+    if value == -np.inf:
+        return None
+    if field == "created_at":
+        return _EPOCH + timedelta(microseconds=int(value))
+    return int(value) if float(value).is_integer() else float(value)
+
+
+class ColumnarInventory:
+    # Typed arrays, one slot per listing; removed slots are recycled. Only listings whose status is in
+    # `statuses` are kept, so a query for any other status must go to Mongo (see covers()).
+
+    def __init__(self, statuses: Iterable[str] = ("active",), capacity: int = 1024):
+        self.statuses = frozenset(statuses)
+        self.ready = False
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.full(capacity, _null(dtype), dtype=dtype) for name, dtype in COLUMN_DTYPES.items()
+        }
+        self.status = np.full(capacity, -1, dtype=np.int16)
+        self.property_type = np.full(capacity, -1, dtype=np.int16)
+        # Whole-dollar copy of price for range filters: half the bytes of the float64 sort column
+        self.price_filter = np.full(capacity, _PRICE_NULL, dtype=np.int32)
+        self.ids = np.empty(capacity, dtype=object)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._codes: Dict[str, Dict[Any, int]] = {"status": {}, "property_type": {}}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def covers(self, status: Optional[str]) -> bool:
+        return status in self.statuses
+
+    def _code(self, column: str, value: Any, create: bool = False) -> int:
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None and create:
+            code = codes[value] = len(codes)
+        return -1 if code is None else code
+
+    def _grow(self) -> None:
+        capacity = len(self.alive) * 2
+        for name, column in self.columns.items():
+            grown = np.full(capacity, _null(column.dtype), dtype=column.dtype)
+            grown[: len(column)] = column
+            self.columns[name] = grown
+        for name, null in (("status", -1), ("property_type", -1), ("price_filter", _PRICE_NULL)):
+            column = getattr(self, name)
+            grown = np.full(capacity, null, dtype=column.dtype)
+            grown[: self._size] = column[: self._size]
+            setattr(self, name, grown)
+        ids = np.empty(capacity, dtype=object)
+        ids[: self._size] = self.ids[: self._size]
+        self.ids = ids
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: self._size] = self.alive[: self._size]
+        self.alive = alive
+
+    def upsert(self, doc: Mapping[str, Any]) -> None:
+        doc_id = doc["id"]
+        if doc.get("status") not in self.statuses:
+            self.remove(doc_id)
+            return
+        slot = self._slots.get(doc_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                if self._size == len(self.alive):
+                    self._grow()
+                slot = self._size
+                self._size += 1
+            self._slots[doc_id] = slot
+        for name, column in self.columns.items():
+            column[slot] = _to_column(doc.get(name), name in _INTEGER_COLUMNS)
+        self.status[slot] = self._code("status", doc.get("status"), create=True)
+        self.property_type[slot] = self._code("property_type", doc.get("property_type"), create=True)
+        price = _to_column(doc.get("price"))
+        self.price_filter[slot] = _PRICE_NULL if price == -math.inf else min(max(round(price), _PRICE_NULL + 1), _PRICE_MAX)
+        self.ids[slot] = doc_id
+        self.alive[slot] = True
+
+    def remove(self, doc_id: str) -> bool:
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return False
+        self.alive[slot] = False
+        # No status code matches -1, so filters never need to consult `alive`
+        self.status[slot] = -1
+        self.ids[slot] = None
+        self._free.append(slot)
+        return True
+
+    def mask(
+        self,
+        status: str,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        bedrooms: Optional[int] = None,
+    ) -> np.ndarray:
+        # Same semantics as the Mongo filter from _property_query: nulls never match a range.
+        # Bounds are whole dollars like Property.price, so the int32 column compares exactly.
+        n = self._size
+        code = self._code("status", status)
+        if code < 0:
+            return np.zeros(n, dtype=bool)
+        mask = self.status[:n] == code
+        if property_type:
+            mask &= self.property_type[:n] == self._code("property_type", property_type)
+        price = self.price_filter[:n]
+        if min_price is not None:
+            mask &= price >= max(math.ceil(min_price), _PRICE_NULL + 1)
+        if max_price is not None:
+            if max_price < _PRICE_NULL + 1:
+                return np.zeros(n, dtype=bool)
+            mask &= price <= min(math.floor(max_price), _PRICE_MAX)
+            if min_price is None:
+                mask &= price != _PRICE_NULL
+        if bedrooms is not None:
+            if not _INT16_RANGE[0] <= bedrooms <= _INT16_RANGE[1]:
+                return np.zeros(n, dtype=bool)
+            mask &= self.columns["bedrooms"][:n] == bedrooms
+        return mask
+
+    def page(
+        self,
+        keyset: KeysetSort,
+        limit: int,
+        after: Optional[Tuple[Any, str]] = None,
+        **filters: Any,
+    ) -> List[Dict[str, Any]]:
+        # First `limit` matches after the decoded cursor, as {"id", <sort field>} rows for encode_cursor
+        ascending = keyset.direction == ASCENDING
+        column = self.columns[keyset.field][: self._size]
+        mask = self.mask(**filters)
+        ties = np.empty(0, dtype=np.intp)
+        if after is not None:
+            value, last_id = after
+            cursor_key = _to_column(value)
+            ties = np.flatnonzero(mask & (column == cursor_key))
+            tie_ids = self.ids[ties]
+            ties = ties[tie_ids > last_id if ascending else tie_ids < last_id]
+            mask &= column > cursor_key if ascending else column < cursor_key
+
+        matches = int(np.count_nonzero(mask)) + len(ties)
+        if matches > _SAMPLE_ABOVE and limit < matches:
+            mask = self._bound(mask, column, ascending, limit, matches)
+        slots = np.concatenate([ties, np.flatnonzero(mask)]) if len(ties) else np.flatnonzero(mask)
+
+        # Top-k by key, then order the (usually tiny) candidate set with the id tie-breaker
+        keys = column[slots] if ascending else -column[slots]
+        if len(slots) > limit:
+            kth = np.partition(keys, limit - 1)[limit - 1]
+            within = keys <= kth
+            slots, keys = slots[within], keys[within]
+        candidates = sorted(zip(keys.tolist(), self.ids[slots].tolist()), key=lambda row: row[1], reverse=not ascending)
+        candidates.sort(key=lambda row: row[0])
+        return [
+            {"id": doc_id, keyset.field: _from_column(keyset.field, key if ascending else -key)}
+            for key, doc_id in candidates[:limit]
+        ]
+
+    def _bound(self, mask: np.ndarray, column: np.ndarray, ascending: bool, limit: int, matches: int) -> np.ndarray:
+        # Estimate a key threshold that still admits comfortably more than `limit` matches from every
+        # step-th slot; if the estimate turns out too tight, keep the full mask
+        step = max(1, len(mask) // _SAMPLE_SIZE)
+        sample = column[::step][mask[::step]]
+        wanted = min(len(sample) - 1, int(4 * limit * len(sample) / matches) + 16)
+        if wanted < 0 or wanted >= len(sample) - 1:
+            return mask
+        if ascending:
+            bounded = mask & (column <= np.partition(sample, wanted)[wanted])
+        else:
+            bounded = mask & (column >= -np.partition(-sample, wanted)[wanted])
+        return bounded if np.count_nonzero(bounded) >= limit else mask
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "listings": len(self._slots),
+            "slots": len(self.alive),
+            "bytes": sum(column.nbytes for column in self.columns.values())
+            + self.status.nbytes + self.property_type.nbytes + self.ids.nbytes + self.alive.nbytes,
+        }
+
+
+class ColumnarMaintainer(MirrorMaintainer):
+    # MirrorMaintainer over ColumnarInventory, loading only the covered statuses
+
+    def __init__(
+        self,
+        collection,
+        statuses: Sequence[str] = ("active",),
+        refresh_interval: Optional[float] = 900.0,
+        batch_size: int = 5000,
+    ):
+        super().__init__(
+            collection,
+            lambda: ColumnarInventory(statuses),
+            COLUMNAR_FIELDS,
+            name="Columnar inventory",
+            batch_size=batch_size,
+            refresh_interval=refresh_interval,
+            query={"status": {"$in": list(statuses)}},
+        )
+
+    @property
+    def snapshot(self) -> ColumnarInventory:
+        return self.mirror
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), **self.mirror.stats()}
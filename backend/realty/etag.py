@@ -0,0 +1,51 @@
+# Strong ETags and If-None-Match handling for JSON bodies
+
+import hashlib
+from typing import Dict, Mapping, Optional
+
+from fastapi.responses import Response
+
+from .serialization import cached_json_response
+
+# Clients may store responses but must revalidate them with If-None-Match
+REVALIDATE = "no-cache"
+
+
+def compute_etag(body: bytes, version: Optional[int] = None) -> str:
+    # Content hash, so every replica derives the same tag for the same body; single documents prefix
+    # their version ("3-<hash>") so the tag can be echoed back in If-Match
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return f'"{version}-{digest}"' if version is not None else f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # Weak comparison, as RFC 9110 prescribes for If-None-Match
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def etag_headers(
+    body: bytes, headers: Optional[Mapping[str, str]] = None, version: Optional[int] = None
+) -> Dict[str, str]:
+    tagged = dict(headers or {})
+    tagged["ETag"] = compute_etag(body, version)
+    tagged["Cache-Control"] = REVALIDATE
+    return tagged
+
+
+def conditional_json_response(body: bytes, headers: Mapping[str, str], if_none_match: Optional[str]) -> Response:
+    # 304 with no body when the client's tag is current, else the full JSON body
+    etag = headers.get("ETag")
+    if etag and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": REVALIDATE})
+    return cached_json_response(body, headers)
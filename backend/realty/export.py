@@ -0,0 +1,88 @@
+# Streaming NDJSON / CSV export over an async Motor cursor
+
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional
+
+import orjson
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _csv_value(value: Any) -> Any:
+    # Nested documents (e.g. the GeoJSON geo point) as JSON, so a spreadsheet cell stays parseable
+    if isinstance(value, dict):
+        return orjson.dumps(value).decode()
+    if isinstance(value, list):
+        return "|".join(str(v) for v in value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def _merged_by_id(cursors: List[Any]) -> AsyncIterator[Dict[str, Any]]:
+    # Merge cursors already sorted by id; an id present in several (mid-archive) comes from the first
+    iterators = [cursor.__aiter__() for cursor in cursors]
+    heads: List[Optional[Dict[str, Any]]] = []
+    for iterator in iterators:
+        heads.append(await anext(iterator, None))
+    while True:
+        live = [i for i, head in enumerate(heads) if head is not None]
+        if not live:
+            return
+        smallest = min(heads[i]["id"] for i in live)
+        yield heads[min(i for i in live if heads[i]["id"] == smallest)]
+        for i in live:
+            if heads[i]["id"] == smallest:
+                heads[i] = await anext(iterators[i], None)
+
+
+async def export_rows(
+    collection,
+    query: Dict[str, Any],
+    fmt: str,
+    columns: List[str],
+    dump: Callable[[Mapping[str, Any]], Dict[str, Any]],
+    after_id: Optional[str] = None,
+    batch_size: int = 1000,
+    chunk_rows: int = 500,
+    archive=None,
+) -> AsyncIterator[bytes]:
+    # Ordered by `id` so an interrupted dump resumes with ?after_id=<last id written>; with `archive`
+    # set, archived matches are merged in by id
+    if after_id:
+        query = {**query, "id": {"$gt": after_id}}
+    collections = [collection] if archive is None else [collection, archive]
+    cursor = _merged_by_id([
+        source.find(query, {"_id": 0}).sort("id", 1).batch_size(batch_size) for source in collections
+    ])
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        if not after_id:
+            writer.writeheader()
+        rows = 0
+        async for doc in cursor:
+            writer.writerow({k: _csv_value(v) for k, v in dump(doc).items()})
+            rows += 1
+            if rows % chunk_rows == 0:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+        return
+
+    lines: List[bytes] = []
+    async for doc in cursor:
+        lines.append(orjson.dumps(dump(doc)))
+        if len(lines) >= chunk_rows:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
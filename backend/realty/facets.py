@@ -0,0 +1,97 @@
+# Facet counts for filter sidebars in a single $facet aggregation
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from .amenities import TAG_FIELD
+
+PRICE_BOUNDARIES = [0, 250_000, 500_000, 750_000, 1_000_000, 2_000_000, 5_000_000]
+_PRICE_OVERFLOW = "overflow"
+
+# Facet name -> field it groups on
+FACET_FIELDS = {
+    "status": "status",
+    "property_type": "property_type",
+    "bedrooms": "bedrooms",
+    "price": "price",
+    "location": "location",
+    "amenities": TAG_FIELD,
+}
+
+
+def _count_by(field: str, top: Optional[int], by_value: bool) -> List[Dict[str, Any]]:
+    stages: List[Dict[str, Any]] = [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+    stages.append({"$sort": {"_id": 1} if by_value else {"count": -1, "_id": 1}})
+    if top:
+        stages.append({"$limit": top})
+    return stages
+
+
+def _facet_stages(name: str, top: int) -> List[Dict[str, Any]]:
+    if name == "price":
+        return [{
+            "$bucket": {
+                "groupBy": "$price",
+                "boundaries": PRICE_BOUNDARIES,
+                "default": _PRICE_OVERFLOW,
+                "output": {"count": {"$sum": 1}},
+            }
+        }]
+    if name == "amenities":
+        return [{"$unwind": f"${TAG_FIELD}"}] + _count_by(TAG_FIELD, top, by_value=False)
+    if name == "bedrooms":
+        return _count_by("bedrooms", None, by_value=True)
+    return _count_by(FACET_FIELDS[name], top if name == "location" else None, by_value=False)
+
+
+def _merge(clauses: Mapping[str, Dict[str, Any]], skip: Optional[str] = None) -> Dict[str, Any]:
+    query: Dict[str, Any] = {}
+    for name, clause in clauses.items():
+        if name != skip:
+            query.update(clause)
+    return query
+
+
+def facet_pipeline(
+    clauses: Mapping[str, Dict[str, Any]],
+    base: Optional[Dict[str, Any]] = None,
+    facets: Sequence[str] = tuple(FACET_FIELDS),
+    top: int = 20,
+    union_with: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    # `base` applies to everything and goes in the leading $match, the only stage that can use an index.
+    # clauses: facet name -> that facet's own filter. Each facet is counted under every clause except
+    # its own, so a sidebar keeps showing the alternatives to the current selection. `union_with` names
+    # a collection (the archive) whose `base` matches are counted too.
+    branches: Dict[str, List[Dict[str, Any]]] = {}
+    for name in facets:
+        others = _merge(clauses, skip=name)
+        branches[name] = ([{"$match": others}] if others else []) + _facet_stages(name, top)
+    everything = _merge(clauses)
+    branches["total"] = ([{"$match": everything}] if everything else []) + [{"$count": "count"}]
+
+    pipeline: List[Dict[str, Any]] = [{"$match": base}] if base else []
+    if union_with:
+        pipeline.append({"$unionWith": {"coll": union_with, "pipeline": [{"$match": base}] if base else []}})
+    return pipeline + [{"$facet": branches}]
+
+
+def shape_facets(result: Optional[Mapping[str, List[Dict[str, Any]]]]) -> Dict[str, Any]:
+    # Raw $facet output -> {"total": n, "facets": {name: [{"value"|"min"/"max", "count"}]}}
+    result = result or {}
+    total = result.get("total") or [{"count": 0}]
+    facets: Dict[str, List[Dict[str, Any]]] = {}
+    for name, rows in result.items():
+        if name == "total":
+            continue
+        if name == "price":
+            facets[name] = [_price_bucket(row) for row in rows]
+        else:
+            facets[name] = [{"value": row["_id"], "count": row["count"]} for row in rows]
+    return {"total": total[0]["count"], "facets": facets}
+
+
+def _price_bucket(row: Mapping[str, Any]) -> Dict[str, Any]:
+    if row["_id"] == _PRICE_OVERFLOW:
+        return {"min": PRICE_BOUNDARIES[-1], "max": None, "count": row["count"]}
+    upper = PRICE_BOUNDARIES[PRICE_BOUNDARIES.index(row["_id"]) + 1]
+    return {"min": row["_id"], "max": upper, "count": row["count"]}
@@ -0,0 +1,124 @@
+# GeoJSON points, radius / bounding-box filters and an offline geocoding table
+
+import csv
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+METERS_PER_MILE = 1609.344
+GEO_FIELD = "geo"
+
+_COORDINATE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+_ZIP = re.compile(r"\s*\b\d{5}(?:-\d{4})?$")
+
+
+def geo_point(lng: float, lat: float) -> Dict[str, Any]:
+    if not -180 <= lng <= 180 or not -90 <= lat <= 90:
+        raise ValueError("Coordinates out of range")
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+
+def parse_point(value: str) -> Optional[Dict[str, Any]]:
+    # "lat,lng" (the order people paste from maps) -> GeoJSON point; None if not a coordinate pair
+    match = _COORDINATE.match(value)
+    if not match:
+        return None
+    lat, lng = float(match.group(1)), float(match.group(2))
+    return geo_point(lng, lat)
+
+
+def parse_bbox(value: str) -> Tuple[float, float, float, float]:
+    # "min_lng,min_lat,max_lng,max_lat" (GeoJSON bbox order)
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError("bbox must be min_lng,min_lat,max_lng,max_lat")
+    geo_point(min_lng, min_lat)
+    geo_point(max_lng, max_lat)
+    if min_lng >= max_lng or min_lat >= max_lat:
+        raise ValueError("bbox minimums must be below its maximums")
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def within_bbox(query: Dict[str, Any], bbox: Tuple[float, float, float, float]) -> Dict[str, Any]:
+    min_lng, min_lat, max_lng, max_lat = bbox
+    ring = [[min_lng, min_lat], [max_lng, min_lat], [max_lng, max_lat], [min_lng, max_lat], [min_lng, min_lat]]
+    return {**query, GEO_FIELD: {"$geoWithin": {"$geometry": {"type": "Polygon", "coordinates": [ring]}}}}
+
+
+def near_pipeline(
+    point: Dict[str, Any],
+    query: Dict[str, Any],
+    max_meters: Optional[float] = None,
+    skip: int = 0,
+    limit: int = 100,
+    projection: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    # $geoNear returns documents nearest first with their distance in meters
+    geo_near: Dict[str, Any] = {
+        "near": point,
+        "key": GEO_FIELD,
+        "distanceField": "distance",
+        "spherical": True,
+        "query": query,
+    }
+    if max_meters is not None:
+        geo_near["maxDistance"] = max_meters
+    return [
+        {"$geoNear": geo_near},
+        {"$skip": skip},
+        {"$limit": limit},
+        {"$project": projection or {"_id": 0}},
+    ]
+
+
+def normalize_place(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s,]", " ", text.lower()).replace(",", " , ").split()).replace(" ,", ",")
+
+
+class OfflineGeocoder:
+    # Place name / address / ZIP -> GeoJSON point from a local table; no network calls
+
+    def __init__(self, table: Optional[Mapping[str, Tuple[float, float]]] = None):
+        # table values are (lat, lng)
+        self._table: Dict[str, Tuple[float, float]] = {}
+        for name, (lat, lng) in (table or {}).items():
+            self.add(name, lat, lng)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "OfflineGeocoder":
+        # CSV with name,lat,lng columns, or a JSON object of name -> [lat, lng]
+        path = Path(path)
+        if path.suffix == ".json":
+            return cls({name: tuple(latlng) for name, latlng in json.loads(path.read_text()).items()})
+        with path.open(newline="") as f:
+            return cls({row["name"]: (float(row["lat"]), float(row["lng"])) for row in csv.DictReader(f)})
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def add(self, name: str, lat: float, lng: float) -> None:
+        self._table[normalize_place(name)] = (lat, lng)
+
+    def _candidates(self, text: str) -> Iterable[str]:
+        # Most specific first: "12 Main St, Austin, TX 78701" -> the full string, "austin, tx 78701",
+        # "tx 78701", the ZIP alone, then the same suffixes without the ZIP ("austin, tx", ...)
+        parts = [part.strip() for part in normalize_place(text).split(",") if part.strip()]
+        suffixes = [", ".join(parts[i:]) for i in range(len(parts))]
+        yield from suffixes
+        zip_match = _ZIP.search(parts[-1]) if parts else None
+        if zip_match:
+            yield zip_match.group().strip()
+            yield from (_ZIP.sub("", suffix) for suffix in suffixes)
+
+    def geocode(self, *texts: Optional[str]) -> Optional[Dict[str, Any]]:
+        # First text with a table hit wins (e.g. address before location)
+        for text in texts:
+            if not text:
+                continue
+            for candidate in self._candidates(text):
+                latlng = self._table.get(candidate)
+                if latlng is not None:
+                    return geo_point(latlng[1], latlng[0])
+        return None
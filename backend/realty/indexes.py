@@ -0,0 +1,283 @@
+# Declarative MongoDB index registry and query plan checks
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Tuple
+
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, TEXT, IndexModel
+from pymongo.errors import PyMongoError
+
+from .amenities import TAG_FIELD
+from .archive import ARCHIVE_COLLECTION, HOT_STATUSES
+from .geo import GEO_FIELD
+from .pagination import DEFAULT_PROPERTY_SORT
+from .search import TEXT_WEIGHTS
+from .sorting import SORT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    # One index on one collection
+    collection: str
+    name: str
+    keys: Tuple[Tuple[str, Any], ...]
+    unique: bool = False
+    options: Dict[str, Any] = field(default_factory=dict)
+
+    def to_model(self) -> IndexModel:
+        return IndexModel(list(self.keys), name=self.name, unique=self.unique, **self.options)
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    # Representative filter (and sort) for a query the router issues
+    name: str
+    collection: str
+    filter: Dict[str, Any]
+    sort: Tuple[Tuple[str, int], ...] = ()
+
+
+# Sort indexes that predate the generated names; MongoDB rejects the same keys under a new name
+_SORT_INDEX_NAMES = {"created_at": "properties_status_created_id"}
+
+# Equality fields first, range field (price) last
+INDEX_REGISTRY: List[IndexSpec] = [
+    IndexSpec("properties", "properties_id_unique", (("id", ASCENDING),), unique=True),
+    IndexSpec(
+        "properties",
+        "properties_status_type_price_id",
+        (("status", ASCENDING), ("property_type", ASCENDING), ("price", ASCENDING), ("id", ASCENDING)),
+    ),
+    IndexSpec(
+        "properties",
+        "properties_status_bedrooms_price",
+        (("status", ASCENDING), ("bedrooms", ASCENDING), ("price", ASCENDING)),
+    ),
+    # Keyset pagination orders for GET /api/properties?sort=; each also serves the reverse direction
+    *(
+        IndexSpec(
+            "properties",
+            _SORT_INDEX_NAMES.get(field, f"properties_status_{field}_id"),
+            (("status", ASCENDING), (field, ASCENDING), ("id", ASCENDING)),
+        )
+        for field in SORT_FIELDS
+    ),
+    # "Newest N of a type" without an in-memory sort
+    IndexSpec(
+        "properties",
+        "properties_status_type_created_id",
+        (("status", ASCENDING), ("property_type", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)),
+    ),
+    # Default-order pages filtered by bedrooms: every equality filter, then the sort (price ranges filter on fetch)
+    IndexSpec(
+        "properties",
+        "properties_status_bedrooms_created_id",
+        (("status", ASCENDING), ("bedrooms", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)),
+    ),
+    IndexSpec(
+        "properties",
+        "properties_status_type_bedrooms_created_id",
+        (
+            ("status", ASCENDING), ("property_type", ASCENDING), ("bedrooms", ASCENDING),
+            ("created_at", ASCENDING), ("id", ASCENDING),
+        ),
+    ),
+    # Weighted full-text search; the status prefix keeps each status's postings separate
+    IndexSpec(
+        "properties",
+        "properties_status_text",
+        (("status", ASCENDING),) + tuple((name, TEXT) for name in TEXT_WEIGHTS),
+        options={"weights": TEXT_WEIGHTS, "default_language": "english"},
+    ),
+    # Multikey: one entry per amenity tag, serves $all / $in amenity filters
+    IndexSpec("properties", "properties_amenity_tags_status", ((TAG_FIELD, ASCENDING), ("status", ASCENDING))),
+    # $geoNear / $geoWithin listing queries; documents without coordinates are left out of the index
+    IndexSpec("properties", "properties_geo_status", ((GEO_FIELD, GEOSPHERE), ("status", ASCENDING))),
+    # High-water mark polling when change streams are unavailable
+    IndexSpec("properties", "properties_updated_at", (("updated_at", ASCENDING),)),
+    # Cold listings: id lookups and the listing sorts for read-through queries; nothing here competes
+    # with the hot collection's indexes for memory
+    IndexSpec(ARCHIVE_COLLECTION, "properties_archive_id_unique", (("id", ASCENDING),), unique=True),
+    *(
+        IndexSpec(
+            ARCHIVE_COLLECTION,
+            f"properties_archive_status_{field}_id",
+            (("status", ASCENDING), (field, ASCENDING), ("id", ASCENDING)),
+        )
+        for field in SORT_FIELDS
+    ),
+    # Keyword search on archived statuses reads through with the same $text query
+    IndexSpec(
+        ARCHIVE_COLLECTION,
+        "properties_archive_status_text",
+        (("status", ASCENDING),) + tuple((name, TEXT) for name in TEXT_WEIGHTS),
+        options={"weights": TEXT_WEIGHTS, "default_language": "english"},
+    ),
+    IndexSpec("status_checks", "status_checks_id_unique", (("id", ASCENDING),), unique=True),
+    # Newest-first keyset pages, overall and per client; the per-client index also answers the latest view
+    IndexSpec("status_checks", "status_checks_timestamp_id", (("timestamp", DESCENDING), ("id", DESCENDING))),
+    IndexSpec(
+        "status_checks",
+        "status_checks_client_timestamp_id",
+        (("client_name", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)),
+    ),
+]
+
+_PRICE_RANGE = {"$gte": 0, "$lte": 1}
+_DEFAULT_SORT = tuple(DEFAULT_PROPERTY_SORT.spec())
+_BBOX_RING = [[-98, 30], [-97, 30], [-97, 31], [-98, 31], [-98, 30]]
+
+# Mirrors the filters built by the property routes and RealEstateAgent
+QUERY_SHAPES: List[QueryShape] = [
+    # Filter-only requests page in DEFAULT_PROPERTY_SORT order
+    QueryShape("get_properties:status", "properties", {"status": "active"}, sort=_DEFAULT_SORT),
+    QueryShape(
+        "get_properties:status+type",
+        "properties",
+        {"status": "active", "property_type": "house"},
+        sort=_DEFAULT_SORT,
+    ),
+    QueryShape(
+        "get_properties:status+price",
+        "properties",
+        {"status": "active", "price": _PRICE_RANGE},
+        sort=_DEFAULT_SORT,
+    ),
+    QueryShape("get_properties:status+bedrooms", "properties", {"status": "active", "bedrooms": 3}, sort=_DEFAULT_SORT),
+    QueryShape(
+        "get_properties:status+type+price",
+        "properties",
+        {"status": "active", "property_type": "house", "price": _PRICE_RANGE},
+        sort=_DEFAULT_SORT,
+    ),
+    QueryShape(
+        "get_properties:status+bedrooms+price",
+        "properties",
+        {"status": "active", "bedrooms": 3, "price": _PRICE_RANGE},
+        sort=_DEFAULT_SORT,
+    ),
+    QueryShape(
+        "get_properties:status+type+bedrooms+price",
+        "properties",
+        {"status": "active", "property_type": "house", "bedrooms": 3, "price": _PRICE_RANGE},
+        sort=_DEFAULT_SORT,
+    ),
+    QueryShape(
+        "get_properties:status sort=-created_at",
+        "properties",
+        {"status": "active"},
+        sort=(("created_at", DESCENDING), ("id", DESCENDING)),
+    ),
+    QueryShape(
+        "get_properties:status+type sort=-created_at",
+        "properties",
+        {"status": "active", "property_type": "condo"},
+        sort=(("created_at", DESCENDING), ("id", DESCENDING)),
+    ),
+    QueryShape(
+        "get_properties:status sort=price_per_sqft",
+        "properties",
+        {"status": "active"},
+        sort=(("price_per_sqft", ASCENDING), ("id", ASCENDING)),
+    ),
+    QueryShape("get_property:id", "properties", {"id": ""}),
+    QueryShape("search:status+text", "properties", {"status": "active", "$text": {"$search": "pool"}}),
+    QueryShape("search:archived status+text", ARCHIVE_COLLECTION, {"status": "sold", "$text": {"$search": "pool"}}),
+    QueryShape("get_properties:amenities_all+status", "properties", {TAG_FIELD: {"$all": ["gym", "pool"]}, "status": "active"}),
+    QueryShape("get_properties:amenities_any+status", "properties", {TAG_FIELD: {"$in": ["gym", "pool"]}, "status": "active"}),
+    QueryShape(
+        "get_properties:bbox+status",
+        "properties",
+        {GEO_FIELD: {"$geoWithin": {"$geometry": {"type": "Polygon", "coordinates": [_BBOX_RING]}}}, "status": "active"},
+    ),
+    QueryShape(
+        "archiver:candidates",
+        "properties",
+        {"status": {"$nin": list(HOT_STATUSES)}, "updated_at": {"$lt": 0}},
+        sort=(("updated_at", ASCENDING),),
+    ),
+    QueryShape(
+        "get_properties:archive status",
+        ARCHIVE_COLLECTION,
+        {"status": "sold"},
+        sort=(("created_at", ASCENDING), ("id", ASCENDING)),
+    ),
+    QueryShape("get_property:archive id", ARCHIVE_COLLECTION, {"id": ""}),
+    QueryShape("valuations:comparables", "properties", {"status": {"$in": ["sold"]}}),
+    QueryShape("valuations:archive comparables", ARCHIVE_COLLECTION, {"status": {"$in": ["sold"]}}),
+    QueryShape("change_watcher:poll", "properties", {"updated_at": {"$gte": 0}}),
+    QueryShape("status_checks:client", "status_checks", {"client_name": ""}),
+    QueryShape(
+        "status_checks:range",
+        "status_checks",
+        {"timestamp": {"$gte": 0, "$lt": 1}},
+        sort=(("timestamp", DESCENDING), ("id", DESCENDING)),
+    ),
+    QueryShape(
+        "status_checks:client+range",
+        "status_checks",
+        {"client_name": "", "timestamp": {"$gte": 0, "$lt": 1}},
+        sort=(("timestamp", DESCENDING), ("id", DESCENDING)),
+    ),
+]
+
+
+async def ensure_indexes(db, registry: Iterable[IndexSpec] = INDEX_REGISTRY) -> Dict[str, List[str]]:
+    # Create registry indexes, grouped per collection; existing indexes are a no-op
+    by_collection: Dict[str, List[IndexSpec]] = {}
+    for spec in registry:
+        by_collection.setdefault(spec.collection, []).append(spec)
+
+    created: Dict[str, List[str]] = {}
+    for collection, specs in by_collection.items():
+        try:
+            created[collection] = await db[collection].create_indexes([spec.to_model() for spec in specs])
+        except PyMongoError as e:
+            # One conflicting index fails the whole command; retry individually so the rest still get built
+            logger.error(f"Failed to create indexes on {collection}: {e}")
+            created[collection] = []
+            for spec in specs:
+                try:
+                    created[collection] += await db[collection].create_indexes([spec.to_model()])
+                except PyMongoError as e:
+                    logger.error(f"Failed to create index {spec.name} on {collection}: {e}")
+    return created
+
+
+def plan_stages(plan: Any) -> List[str]:
+    # Collect every stage name in an explain() plan tree
+    stages: List[str] = []
+    if isinstance(plan, dict):
+        stage = plan.get("stage")
+        if isinstance(stage, str):
+            stages.append(stage)
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(plan_stages(item))
+    return stages
+
+
+async def find_collscans(db, shapes: Iterable[QueryShape] = QUERY_SHAPES) -> List[str]:
+    # Names of query shapes whose winning plan scans the whole collection or sorts in memory
+    collscans: List[str] = []
+    for shape in shapes:
+        cursor = db[shape.collection].find(shape.filter)
+        if shape.sort:
+            cursor = cursor.sort(list(shape.sort))
+        try:
+            explain = await cursor.explain()
+        except PyMongoError as e:
+            logger.error(f"Failed to explain query shape {shape.name}: {e}")
+            continue
+        stages = plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        if "COLLSCAN" in stages:
+            logger.warning(f"Query shape {shape.name} on {shape.collection} falls back to COLLSCAN")
+            collscans.append(shape.name)
+        elif shape.sort and "SORT" in stages:
+            logger.warning(f"Query shape {shape.name} on {shape.collection} sorts in memory")
+            collscans.append(shape.name)
+    return collscans
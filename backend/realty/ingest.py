@@ -0,0 +1,117 @@
+# Streaming NDJSON ingestion with bounded unordered insert_many batches
+
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestReport:
+    rows_received: int = 0
+    inserted: int = 0
+    failed: int = 0
+    batches: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    errors_truncated: bool = False
+    duration_seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+    def add_error(self, line: int, error: str, max_errors: int) -> None:
+        self.failed += 1
+        if len(self.errors) < max_errors:
+            self.errors.append({"line": line, "error": error})
+        else:
+            self.errors_truncated = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, bytes, bool]]:
+    # Yield (line_number, line, oversized); only one partial line is ever buffered
+    buffer = b""
+    line_number = 0
+    oversized = False
+    async for chunk in chunks:
+        parts = (buffer + chunk).split(b"\n")
+        buffer = parts.pop()
+        for line in parts:
+            line_number += 1
+            yield line_number, b"" if oversized else line, oversized
+            oversized = False
+        if len(buffer) > max_line_bytes:
+            # Keep counting the line but stop holding its bytes
+            buffer = b""
+            oversized = True
+    if buffer or oversized:
+        line_number += 1
+        yield line_number, b"" if oversized else buffer, oversized
+
+
+async def ingest_ndjson(
+    chunks: AsyncIterator[bytes],
+    collection,
+    parse_row: Callable[[Dict[str, Any]], Dict[str, Any]],
+    batch_size: int = 1000,
+    max_errors: int = 1000,
+    max_line_bytes: int = 1 << 20,
+) -> IngestReport:
+    # Validate rows as they stream in; the next batch is read only after the previous insert
+    report = IngestReport()
+    started = time.perf_counter()
+    batch: List[Dict[str, Any]] = []
+    batch_lines: List[int] = []
+
+    async def flush() -> None:
+        if not batch:
+            return
+        report.batches += 1
+        try:
+            result = await collection.insert_many(batch, ordered=False)
+            report.inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            details = e.details or {}
+            report.inserted += details.get("nInserted", 0)
+            for write_error in details.get("writeErrors", []):
+                report.add_error(batch_lines[write_error["index"]], write_error.get("errmsg", "write error"), max_errors)
+        except PyMongoError as e:
+            logger.error(f"Bulk insert batch failed: {e}")
+            for line in batch_lines:
+                report.add_error(line, str(e), max_errors)
+        batch.clear()
+        batch_lines.clear()
+
+    async for line_number, line, oversized in iter_lines(chunks, max_line_bytes):
+        if oversized:
+            report.rows_received += 1
+            report.add_error(line_number, f"Row exceeds {max_line_bytes} bytes", max_errors)
+            continue
+        if not line.strip():
+            continue
+        report.rows_received += 1
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("Row must be a JSON object")
+            batch.append(parse_row(row))
+            batch_lines.append(line_number)
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            report.add_error(line_number, errors, max_errors)
+        except ValueError as e:
+            report.add_error(line_number, str(e), max_errors)
+        if len(batch) >= batch_size:
+            await flush()
+    await flush()
+
+    report.duration_seconds = round(time.perf_counter() - started, 3)
+    if report.duration_seconds > 0:
+        report.rows_per_second = round(report.rows_received / report.duration_seconds, 1)
+    return report
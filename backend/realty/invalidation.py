@@ -0,0 +1,212 @@
+# Cross-replica invalidation: change streams with an updated_at polling fallback
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Server error codes meaning "change streams need a replica set / sharded cluster"
+_CHANGE_STREAM_UNSUPPORTED = {40573, 40324, 20}
+
+
+@dataclass
+class ChangeEvent:
+    # One property mutation; `op` is insert/update/replace/delete, or "reset" when unknown.
+    # `id` is None for resets (and deletes whose listing can't be identified), so subscribers should
+    # drop everything.
+    op: str
+    id: Optional[str] = None
+    document: Optional[Dict[str, Any]] = None
+    source: str = "local"
+
+
+class InvalidationBus:
+    # Fan out change events to every in-process cache and context builder
+
+    def __init__(self):
+        self._subscribers: List[Callable[[ChangeEvent], None]] = []
+        self.published = 0
+
+    def subscribe(self, callback: Callable[[ChangeEvent], None]) -> None:
+        self._subscribers.append(callback)
+
+    def publish(self, event: ChangeEvent) -> None:
+        self.published += 1
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Invalidation subscriber failed for {event.op}: {e}")
+
+
+@dataclass
+class _PollState:
+    high_water: Optional[datetime] = None
+    seen: Set[Tuple[str, datetime]] = field(default_factory=set)
+    # Every listing id known to exist; a count that disagrees with it triggers an id rescan
+    ids: Set[Optional[str]] = field(default_factory=set)
+
+
+class ChangeWatcher:
+    # Background task publishing remote writes on one collection to the bus
+
+    def __init__(
+        self,
+        collection,
+        bus: InvalidationBus,
+        mode: str = "auto",
+        poll_interval: float = 5.0,
+        lookback: float = 2.0,
+    ):
+        self.collection = collection
+        self.bus = bus
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.lookback = timedelta(seconds=lookback)
+        self.active_mode: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._poll = _PollState()
+        # Delete events carry only documentKey. Listings are inserted with _id = id; older ones have
+        # ObjectId keys, mapped here so their deletes still name the listing.
+        self._legacy_ids: Dict[Any, Optional[str]] = {}
+
+    def start(self) -> None:
+        if self.mode == "off" or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        if self.mode in ("auto", "change_stream"):
+            try:
+                await self._watch_change_stream()
+                return
+            except OperationFailure:
+                if self.mode == "change_stream":
+                    raise
+                logger.info(f"Change streams unavailable on {self.collection.name}, polling updated_at instead")
+        await self._poll_forever()
+
+    async def _watch_change_stream(self) -> None:
+        resume_token = None
+        while True:
+            try:
+                async with self.collection.watch(full_document="updateLookup", resume_after=resume_token) as stream:
+                    self.active_mode = "change_stream"
+                    logger.info(f"Watching {self.collection.name} via change stream")
+                    # Loaded after the stream opens, so a key inserted meanwhile arrives in either
+                    await self.load_legacy_ids()
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self.bus.publish(self.change_event(change))
+            except OperationFailure as e:
+                if e.code in _CHANGE_STREAM_UNSUPPORTED:
+                    raise
+                # e.g. resume point fell off the oplog: start over and drop everything
+                logger.warning(f"Change stream on {self.collection.name} restarted: {e}")
+                resume_token = None
+                self.bus.publish(ChangeEvent(op="reset", source="change_stream"))
+                await asyncio.sleep(self.poll_interval)
+            except PyMongoError as e:
+                # Transient network error: resume from the last token; unknown gap means reset
+                logger.warning(f"Change stream on {self.collection.name} interrupted: {e}")
+                if resume_token is None:
+                    self.bus.publish(ChangeEvent(op="reset", source="change_stream"))
+                await asyncio.sleep(self.poll_interval)
+
+    async def load_legacy_ids(self) -> int:
+        cursor = self.collection.find({"_id": {"$not": {"$type": "string"}}}, {"_id": 1, "id": 1})
+        self._legacy_ids = {doc["_id"]: doc.get("id") async for doc in cursor}
+        return len(self._legacy_ids)
+
+    def change_event(self, change: Dict[str, Any]) -> ChangeEvent:
+        op = change["operationType"]
+        document = change.get("fullDocument")
+        key = (change.get("documentKey") or {}).get("_id")
+        if document is not None:
+            listing_id = document.get("id")
+            if key is not None and not isinstance(key, str):
+                self._legacy_ids[key] = listing_id
+        elif isinstance(key, str):
+            listing_id = key
+        elif op == "delete":
+            listing_id = self._legacy_ids.pop(key, None)
+        else:
+            listing_id = self._legacy_ids.get(key)
+        return ChangeEvent(op=op, id=listing_id, document=document, source="change_stream")
+
+    async def _poll_forever(self) -> None:
+        self.active_mode = "poll"
+        while True:
+            try:
+                await self.poll_once()
+            except PyMongoError as e:
+                logger.warning(f"Polling {self.collection.name} failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def poll_once(self) -> int:
+        # Publish documents updated since the high-water mark, then deletes found by diffing listing ids
+        state = self._poll
+        published = 0
+
+        if state.high_water is None:
+            latest = await self.collection.find({}, {"_id": 0, "updated_at": 1}).sort("updated_at", -1).limit(1).to_list(1)
+            state.high_water = latest[0]["updated_at"] if latest else datetime.min
+            recent = self.collection.find(
+                {"updated_at": {"$gte": _minus(state.high_water, self.lookback)}}, {"_id": 0, "id": 1, "updated_at": 1}
+            )
+            state.seen = {(doc.get("id"), doc["updated_at"]) async for doc in recent}
+            state.ids = await self._listing_ids()
+            return 0
+
+        # Overlap window absorbs clock skew between writer replicas
+        since = _minus(state.high_water, self.lookback)
+        cursor = self.collection.find({"updated_at": {"$gte": since}}, {"_id": 0}).sort("updated_at", 1)
+        async for doc in cursor:
+            marker = (doc.get("id"), doc["updated_at"])
+            if marker in state.seen:
+                continue
+            state.seen.add(marker)
+            self.bus.publish(ChangeEvent(op="update", id=doc.get("id"), document=doc, source="poll"))
+            state.ids.add(doc.get("id"))
+            published += 1
+            state.high_water = max(state.high_water, doc["updated_at"])
+
+        cutoff = _minus(state.high_water, self.lookback)
+        state.seen = {marker for marker in state.seen if marker[1] >= cutoff}
+
+        # Deletes leave no updated_at trace. Inserts seen above are already in `ids`, so a delete shows
+        # up as a count mismatch even when an insert in the same interval keeps the total unchanged.
+        if await self.collection.estimated_document_count() == len(state.ids):
+            return published
+        current = await self._listing_ids()
+        for listing_id in state.ids - current:
+            self.bus.publish(ChangeEvent(op="delete", id=listing_id, source="poll"))
+            published += 1
+        if current - state.ids:
+            # Inserted with an updated_at older than the lookback (e.g. restored from the archive)
+            self.bus.publish(ChangeEvent(op="reset", source="poll"))
+            published += 1
+        state.ids = current
+        return published
+
+    async def _listing_ids(self) -> Set[Optional[str]]:
+        return {doc.get("id") async for doc in self.collection.find({}, {"_id": 0, "id": 1})}
+
+
+def _minus(moment: datetime, delta: timedelta) -> datetime:
+    return moment - delta if moment - datetime.min > delta else datetime.min
@@ -0,0 +1,177 @@
+# Background-loaded in-memory mirrors of a collection, kept current by change events
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from pymongo.errors import PyMongoError
+
+from .invalidation import ChangeEvent
+
+logger = logging.getLogger(__name__)
+
+
+class MirrorMaintainer:
+    # Keeps a mirror (any object with upsert(doc), remove(id) and a `ready` flag) in step with a
+    # collection. Full loads run in the background and are swapped in when done; change events that
+    # arrive mid-load are replayed onto the new mirror. With refresh_interval set, start() also
+    # reloads periodically so anything missed by the event stream is corrected. `query` limits full loads;
+    # the mirror itself decides what to keep from change events. With `archive` set, full loads include
+    # the archive collection and deleted ids are looked up there, since archival deletes from the
+    # collection too.
+
+    def __init__(
+        self,
+        collection,
+        factory: Callable[[], Any],
+        fields: Sequence[str],
+        name: str = "mirror",
+        batch_size: int = 1000,
+        refresh_interval: Optional[float] = None,
+        query: Optional[Dict[str, Any]] = None,
+        archive=None,
+    ):
+        self.collection = collection
+        self.archive = archive
+        self.query = query or {}
+        self.factory = factory
+        self.fields = tuple(fields)
+        self.name = name
+        self.batch_size = batch_size
+        self.refresh_interval = refresh_interval
+        self.mirror = factory()
+        self.reloads = 0
+        self.last_reload_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self._pending: Optional[List[Any]] = None
+        self._reload_again = False
+        # Set when a reload was asked for because events couldn't be applied (resets), as opposed to
+        # the periodic refresh; only the latter is a check of how well events kept the mirror current
+        self._forced = False
+        self._archive_checks: Set[str] = set()
+        self._archive_task: Optional[asyncio.Task] = None
+
+    def handle(self, event) -> None:
+        # InvalidationBus subscriber
+        if self._pending is not None:
+            self._pending.append(event)
+        if not self._apply(event):
+            self.force_reload()
+
+    def force_reload(self) -> None:
+        self._forced = True
+        self.schedule_reload()
+
+    def _apply(self, event) -> bool:
+        # False when the event can't be applied incrementally
+        if event.op in ("insert", "update", "replace") and event.document is not None:
+            self.mirror.upsert(event.document)
+            return True
+        if event.op == "delete" and event.id is not None:
+            self.mirror.remove(event.id)
+            if self.archive is not None and event.source != "archive":
+                self._check_archive(event.id)
+            return True
+        return False
+
+    def _check_archive(self, doc_id: str) -> None:
+        # Deletes are batched into one $in lookup; listings found there were archived, not deleted
+        self._archive_checks.add(doc_id)
+        if self._archive_task is None or self._archive_task.done():
+            try:
+                self._archive_task = asyncio.get_running_loop().create_task(self._restore_archived())
+            except RuntimeError:
+                self._archive_checks.clear()
+
+    async def _restore_archived(self) -> None:
+        await asyncio.sleep(0)
+        while self._archive_checks:
+            ids, self._archive_checks = list(self._archive_checks), set()
+            projection = {"_id": 0, **{name: 1 for name in self.fields}}
+            try:
+                async for doc in self.archive.find({"id": {"$in": ids}, **self.query}, projection):
+                    # Through handle(), so a reload in progress replays it onto the fresh mirror
+                    self.handle(ChangeEvent("update", doc["id"], doc, source="archive"))
+            except PyMongoError as e:
+                logger.warning(f"{self.name} archive lookup failed: {e}")
+                self.force_reload()
+
+    def start(self) -> None:
+        self.schedule_reload()
+        if self.refresh_interval and self._refresher is None:
+            self._refresher = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            self.schedule_reload()
+
+    def schedule_reload(self) -> None:
+        # Coalesces: a request during a running load queues exactly one more
+        if self._task is not None and not self._task.done():
+            self._reload_again = True
+            return
+        try:
+            self._task = asyncio.get_running_loop().create_task(self._reload_loop())
+        except RuntimeError:
+            logger.warning(f"No running event loop; {self.name} reload skipped")
+
+    async def _reload_loop(self) -> None:
+        while True:
+            self._reload_again = False
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error(f"{self.name} reload failed: {e}")
+            if not self._reload_again:
+                return
+
+    async def reload(self) -> None:
+        started = time.perf_counter()
+        forced, self._forced = self._forced, False
+        self._pending = []
+        try:
+            fresh = self.factory()
+            projection = {"_id": 0, **{name: 1 for name in self.fields}}
+            # Archive first: a listing caught mid-move keeps its hot copy
+            for collection in (self.archive, self.collection):
+                if collection is None:
+                    continue
+                async for doc in collection.find(self.query, projection).batch_size(self.batch_size):
+                    fresh.upsert(doc)
+            fresh.ready = True
+            pending, self._pending = self._pending, None
+            # A reset during the load also means the old mirror was knowingly stale
+            self._swap(fresh, audit=not (forced or self._forced))
+            for event in pending:
+                if not self._apply(event):
+                    self._forced = self._reload_again = True
+        finally:
+            self._pending = None
+        self.reloads += 1
+        self.last_reload_seconds = round(time.perf_counter() - started, 3)
+        logger.info(f"{self.name} loaded {len(self.mirror)} documents in {self.last_reload_seconds}s")
+
+    def _swap(self, fresh: Any, audit: bool = False) -> None:
+        # `audit`: a periodic reload the mirror was expected to already agree with
+        self.mirror = fresh
+
+    async def stop(self) -> None:
+        for task in (self._refresher, self._task, self._archive_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._refresher = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.mirror.ready,
+            "reloads": self.reloads,
+            "loading": self._pending is not None,
+            "last_reload_seconds": self.last_reload_seconds,
+        }
@@ -0,0 +1,72 @@
+# Opaque keyset cursors for stable, index-friendly paging
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from pymongo import ASCENDING
+
+
+def _encode_value(value: Any) -> Any:
+    # JSON-safe cursor value; datetimes are tagged so they round-trip
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and set(value) == {"$date"}:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+
+@dataclass(frozen=True)
+class KeysetSort:
+    # Sort on one field with `id` as the unique tie-breaker
+    field: str
+    direction: int = ASCENDING
+
+    @property
+    def name(self) -> str:
+        return self.field if self.direction == ASCENDING else f"-{self.field}"
+
+    def spec(self) -> List[Tuple[str, int]]:
+        return [(self.field, self.direction), ("id", self.direction)]
+
+    def encode_cursor(self, doc: Dict[str, Any]) -> str:
+        payload = {"s": self.name, "k": _encode_value(doc.get(self.field)), "id": doc["id"]}
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> Tuple[Any, str]:
+        # Raises ValueError for malformed cursors or cursors from another sort
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            sort_name, value, last_id = payload["s"], _decode_value(payload["k"]), payload["id"]
+        except (ValueError, TypeError, KeyError) as e:
+            raise ValueError("Malformed cursor") from e
+        if sort_name != self.name or not isinstance(last_id, str):
+            raise ValueError("Cursor does not match the requested sort")
+        return value, last_id
+
+    def after(self, query: Dict[str, Any], cursor: str) -> Dict[str, Any]:
+        # Narrow `query` to documents strictly after the cursor position
+        value, last_id = self.decode_cursor(cursor)
+        op = "$gt" if self.direction == ASCENDING else "$lt"
+        # Mongo orders null/missing before every value, and $gt/$lt never match null
+        if value is None:
+            after_value = [{self.field: {"$ne": None}}] if self.direction == ASCENDING else []
+        else:
+            after_value = [{self.field: {op: value}}]
+            if self.direction != ASCENDING:
+                after_value.append({self.field: None})
+        keyset = {"$or": after_value + [{self.field: value, "id": {op: last_id}}]}
+        if "$or" in query:
+            return {"$and": [query, keyset]}
+        return {**query, **keyset}
+
+
+DEFAULT_PROPERTY_SORT = KeysetSort("created_at", ASCENDING)
@@ -0,0 +1,41 @@
+# Sparse fieldsets pushed down to Mongo projections
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+
+def parse_fields(
+    fields: Optional[str],
+    allowed: Iterable[str],
+    presets: Optional[Mapping[str, Iterable[str]]] = None,
+) -> Optional[List[str]]:
+    # "a,b,c" or a preset name -> ordered field list; None means whole documents
+    if fields is None or not fields.strip():
+        return None
+
+    presets = presets or {}
+    allowed = set(allowed)
+    selected: List[str] = ["id"]
+    for name in (part.strip() for part in fields.split(",")):
+        if not name:
+            continue
+        if name in presets:
+            names = list(presets[name])
+        elif name in allowed:
+            names = [name]
+        else:
+            raise ValueError(f"Unknown field: {name}")
+        selected.extend(n for n in names if n not in selected)
+    return selected
+
+
+def to_projection(field_names: Iterable[str]) -> Dict[str, int]:
+    # Inclusion projection that never returns Mongo's _id
+    projection = {"_id": 0}
+    for name in field_names:
+        projection[name] = 1
+    return projection
+
+
+def trim(doc: Mapping[str, Any], field_names: Iterable[str]) -> Dict[str, Any]:
+    # Drop helper fields (e.g. the sort key) fetched only for paging
+    return {name: doc[name] for name in field_names if name in doc}
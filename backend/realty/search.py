@@ -0,0 +1,51 @@
+# Free-text property search: query parsing for the weighted $text index
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+# Field weights for the properties text index
+TEXT_WEIGHTS = {"title": 10, "location": 6, "amenities": 4, "description": 1}
+
+_AMOUNT = r"\$?\s*(\d+(?:[.,]\d+)*)\s*(k|m|mm|mil|million|thousand)?\b"
+_MULTIPLIERS = {"k": 1_000, "thousand": 1_000, "m": 1_000_000, "mm": 1_000_000, "mil": 1_000_000, "million": 1_000_000}
+
+_MAX_PRICE = re.compile(r"\b(?:under|below|less than|max|up to)\s+" + _AMOUNT, re.IGNORECASE)
+_MIN_PRICE = re.compile(r"\b(?:over|above|more than|min)\s+" + _AMOUNT, re.IGNORECASE)
+_BEDROOMS = re.compile(r"\b(\d+)\s*(?:bd|br|bed|beds|bedroom|bedrooms)\b", re.IGNORECASE)
+
+
+@dataclass
+class ParsedSearch:
+    # Remaining keywords plus structured hints pulled out of the query text
+    text: str
+    hints: Dict[str, int] = field(default_factory=dict)
+
+
+def _amount(number: str, unit: Optional[str]) -> int:
+    value = float(number.replace(",", ""))
+    return int(value * _MULTIPLIERS.get((unit or "").lower(), 1))
+
+
+def parse_search_query(q: str) -> ParsedSearch:
+    # "pool ocean view under 1M" -> text "pool ocean view", hints {"max_price": 1000000}
+    hints: Dict[str, int] = {}
+
+    def take(pattern, name, convert):
+        nonlocal q
+        match = pattern.search(q)
+        if match:
+            hints[name] = convert(match)
+            q = q[:match.start()] + " " + q[match.end():]
+
+    take(_MAX_PRICE, "max_price", lambda m: _amount(m.group(1), m.group(2)))
+    take(_MIN_PRICE, "min_price", lambda m: _amount(m.group(1), m.group(2)))
+    take(_BEDROOMS, "bedrooms", lambda m: int(m.group(1)))
+    return ParsedSearch(" ".join(q.split()), hints)
+
+
+def text_query(base: Dict[str, Any], text: str) -> Dict[str, Any]:
+    return {**base, "$text": {"$search": text}}
+
+
+TEXT_SCORE = {"$meta": "textScore"}
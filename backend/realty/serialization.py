@@ -0,0 +1,53 @@
+# Fast read path: trusted (unvalidated) model dumps and orjson responses
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Type
+
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel
+
+
+@lru_cache(maxsize=None)
+def _field_plan(model: Type[BaseModel]) -> Tuple[Tuple[str, Any, Optional[Callable[[], Any]], bool], ...]:
+    # (name, default, default_factory, required) per field, in declaration order
+    return tuple(
+        (name, info.default, info.default_factory, info.is_required())
+        for name, info in model.model_fields.items()
+    )
+
+
+def trusted_dump(model: Type[BaseModel], doc: Mapping[str, Any]) -> Dict[str, Any]:
+    # Documents were validated on write: fill defaults, drop extras (e.g. _id), skip validation
+    out: Dict[str, Any] = {}
+    for name, default, factory, required in _field_plan(model):
+        if name in doc:
+            out[name] = doc[name]
+        elif factory is not None:
+            out[name] = factory()
+        elif not required:
+            out[name] = default
+    return out
+
+
+def trusted_dump_many(model: Type[BaseModel], docs: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    return [trusted_dump(model, doc) for doc in docs]
+
+
+def render_json(content: Any) -> bytes:
+    # Same encoding as ORJSONResponse, for bodies that are cached or hashed
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def fast_response(
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> ORJSONResponse:
+    # Returning a Response makes FastAPI skip response_model validation and encoding
+    return ORJSONResponse(content, status_code=status_code, headers=dict(headers) if headers else None)
+
+
+def cached_json_response(body: bytes, headers: Optional[Mapping[str, str]] = None) -> Response:
+    # Replay an already-encoded JSON body
+    return Response(body, media_type="application/json", headers=dict(headers) if headers else None)
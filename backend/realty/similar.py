@@ -0,0 +1,246 @@
+# "Homes like this one": k nearest neighbours over a cached, incrementally updated feature matrix
+
+import math
+import warnings
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .amenities import TAG_FIELD
+from .mirror import MirrorMaintainer
+
+NUMERIC_FEATURES = ("price", "sqft", "bedrooms", "bathrooms", "year_built", "lot_size")
+
+# Skewed features are compared on a log scale, so $100k vs $200k counts like $1M vs $2M
+_LOG_FEATURES = frozenset({"price", "sqft", "lot_size"})
+
+SIMILAR_FIELDS = ("id", "status", "property_type", TAG_FIELD, *NUMERIC_FEATURES)
+
+# Set bits per byte value, for popcounts on NumPy < 2.0 (no np.bitwise_count)
+_BYTE_BITS = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    # Set bits in each uint64 word
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    return _BYTE_BITS[words.view(np.uint8)].reshape(len(words), 8).sum(axis=1, dtype=np.uint16)
+
+
+# Squared-distance contribution of a numeric feature the query has but a listing lacks (one standard deviation)
+_MISSING_PENALTY = 1.0
+
+
+def _feature(name: str, value: Any) -> float:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    if name in _LOG_FEATURES:
+        return math.log1p(value) if value >= 0 else math.nan
+    return value
+
+
+class SimilarityIndex:
+    # One slot per listing: transformed numeric features (NaN when missing), a property type code and
+    # an amenity-tag bitset, stored one contiguous row per feature/word so every distance term is a
+    # flat pass over the inventory. Distance is Euclidean over standardized numeric features, plus
+    # `type_weight` for a different property type and `amenity_weight` times the Jaccard distance of
+    # the amenity sets.
+
+    def __init__(
+        self,
+        statuses: Iterable[str] = ("active",),
+        type_weight: float = 2.0,
+        amenity_weight: float = 1.0,
+        capacity: int = 1024,
+    ):
+        self.statuses = frozenset(statuses)
+        self.type_weight = type_weight
+        self.amenity_weight = amenity_weight
+        self.ready = False
+        self.features = np.full((len(NUMERIC_FEATURES), capacity), np.nan, dtype=np.float32)
+        self.status = np.full(capacity, -1, dtype=np.int16)
+        self.property_type = np.full(capacity, -1, dtype=np.int16)
+        self.amenities = np.zeros((1, capacity), dtype=np.uint64)
+        self.ids = np.empty(capacity, dtype=object)
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._codes: Dict[str, Dict[Any, int]] = {"status": {}, "property_type": {}}
+        self._tags: Dict[str, int] = {}
+        self._writes = 0
+        self._scale: Optional[np.ndarray] = None
+        self._scaled_at = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def covers(self, status: Optional[str]) -> bool:
+        return status in self.statuses
+
+    def _code(self, column: str, value: Any, create: bool = False) -> int:
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None and create:
+            code = codes[value] = len(codes)
+        return -1 if code is None else code
+
+    def _bits(self, tags: Iterable[str], create: bool = False) -> Tuple[List[int], int]:
+        # Bitset words over the known tag vocabulary, plus how many tags it doesn't contain
+        unknown = 0
+        bits = 0
+        for tag in set(tags or ()):
+            position = self._tags.get(tag)
+            if position is None and create:
+                position = self._tags[tag] = len(self._tags)
+            if position is None:
+                unknown += 1
+            else:
+                bits |= 1 << position
+        words = len(self.amenities)
+        if len(self._tags) > 64 * words:
+            words = (len(self._tags) + 63) // 64
+            widened = np.zeros((words, self.amenities.shape[1]), dtype=np.uint64)
+            widened[: len(self.amenities)] = self.amenities
+            self.amenities = widened
+        return [(bits >> (64 * word)) & 0xFFFFFFFFFFFFFFFF for word in range(words)], unknown
+
+    def _grow(self) -> None:
+        capacity = len(self.ids) * 2
+        for name, fill in (("features", np.nan), ("status", -1), ("property_type", -1), ("amenities", 0)):
+            array = getattr(self, name)
+            grown = np.full(array.shape[:-1] + (capacity,), fill, dtype=array.dtype)
+            grown[..., : array.shape[-1]] = array
+            setattr(self, name, grown)
+        ids = np.empty(capacity, dtype=object)
+        ids[: self._size] = self.ids[: self._size]
+        self.ids = ids
+
+    def upsert(self, doc: Mapping[str, Any]) -> None:
+        doc_id = doc["id"]
+        if doc.get("status") not in self.statuses:
+            self.remove(doc_id)
+            return
+        slot = self._slots.get(doc_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                if self._size == len(self.ids):
+                    self._grow()
+                slot = self._size
+                self._size += 1
+            self._slots[doc_id] = slot
+        self.features[:, slot] = [_feature(name, doc.get(name)) for name in NUMERIC_FEATURES]
+        self.status[slot] = self._code("status", doc.get("status"), create=True)
+        self.property_type[slot] = self._code("property_type", doc.get("property_type"), create=True)
+        bits = self._bits(doc.get(TAG_FIELD), create=True)[0]
+        self.amenities[:, slot] = bits
+        self.ids[slot] = doc_id
+        self._writes += 1
+
+    def remove(self, doc_id: str) -> bool:
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return False
+        self.status[slot] = -1
+        self.ids[slot] = None
+        self._free.append(slot)
+        self._writes += 1
+        return True
+
+    def scale(self) -> np.ndarray:
+        # Per-feature standard deviation over live rows; recomputed once writes since the last
+        # computation exceed 5% of the inventory, since a few listings barely move it
+        if self._scale is None or self._writes - self._scaled_at > max(100, len(self) // 20):
+            live = self.features[:, : self._size][:, self.status[: self._size] >= 0]
+            with warnings.catch_warnings():
+                # All-NaN features (e.g. no listing has a lot_size yet) warn; they get scale 1 below
+                warnings.simplefilter("ignore", RuntimeWarning)
+                scale = np.nanstd(live, axis=1) if live.shape[1] else np.ones(len(NUMERIC_FEATURES))
+            scale[~np.isfinite(scale) | (scale == 0)] = 1.0
+            self._scale = scale.astype(np.float32)
+            self._scaled_at = self._writes
+        return self._scale
+
+    def neighbours(self, doc: Mapping[str, Any], k: int, status: str = "active") -> List[Tuple[str, float]]:
+        # k nearest listings with `status` to `doc` (which need not be indexed), nearest first
+        n = self._size
+        code = self._code("status", status)
+        if code < 0 or n == 0:
+            return []
+        distance = np.zeros(n, dtype=np.float32)
+        term = np.empty(n, dtype=np.float32)
+        for row, name, scale in zip(self.features, NUMERIC_FEATURES, self.scale()):
+            value = _feature(name, doc.get(name))
+            if math.isnan(value):
+                # Unknown on the query side: no basis for comparison, and the same for every row
+                continue
+            np.subtract(row[:n], np.float32(value), out=term)
+            term *= np.float32(1 / scale)
+            term *= term
+            term[np.isnan(term)] = _MISSING_PENALTY
+            distance += term
+
+        type_code = self._code("property_type", doc.get("property_type"))
+        np.add(distance, np.float32(self.type_weight), out=distance, where=self.property_type[:n] != type_code)
+
+        bits, unknown = self._bits(doc.get(TAG_FIELD))
+        common = np.zeros(n, dtype=np.uint16)
+        union = np.full(n, unknown, dtype=np.uint16)
+        for row, word in zip(self.amenities, bits):
+            word = np.uint64(word)
+            common += _popcount(row[:n] & word)
+            union += _popcount(row[:n] | word)
+        # Jaccard distance (union - common) / union, and 0 when neither side has amenities
+        jaccard = (union - common).astype(np.float32)
+        jaccard /= np.maximum(union, 1)
+        jaccard *= np.float32(self.amenity_weight)
+        distance += jaccard
+
+        distance[self.status[:n] != code] = np.inf
+        own = self._slots.get(doc.get("id"))
+        if own is not None:
+            distance[own] = np.inf
+        k = min(k, n)
+        nearest = np.argpartition(distance, k - 1)[:k] if k < n else np.arange(n)
+        nearest = nearest[np.isfinite(distance[nearest])]
+        nearest = nearest[np.lexsort((self.ids[nearest].astype(str), distance[nearest]))]
+        return [(self.ids[slot], round(math.sqrt(float(distance[slot])), 4)) for slot in nearest]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "listings": len(self._slots),
+            "amenity_tags": len(self._tags),
+            "bytes": self.features.nbytes + self.status.nbytes + self.property_type.nbytes
+            + self.amenities.nbytes + self.ids.nbytes,
+        }
+
+
+class SimilarityMaintainer(MirrorMaintainer):
+    # MirrorMaintainer over SimilarityIndex, loading only the covered statuses
+
+    def __init__(
+        self,
+        collection,
+        statuses: Sequence[str] = ("active",),
+        refresh_interval: Optional[float] = 900.0,
+        batch_size: int = 5000,
+    ):
+        super().__init__(
+            collection,
+            lambda: SimilarityIndex(statuses),
+            SIMILAR_FIELDS,
+            name="Similarity index",
+            batch_size=batch_size,
+            refresh_interval=refresh_interval,
+            query={"status": {"$in": list(statuses)}},
+        )
+
+    @property
+    def index(self) -> SimilarityIndex:
+        return self.mirror
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), **self.mirror.stats()}
@@ -0,0 +1,58 @@
+# Listing sort options, each backed by a (status, field, id) index
+
+import logging
+from typing import Dict, Optional
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import PyMongoError
+
+from .pagination import DEFAULT_PROPERTY_SORT, KeysetSort
+
+logger = logging.getLogger(__name__)
+
+SORT_FIELDS = ("created_at", "price", "sqft", "year_built", "price_per_sqft")
+
+# "price" ascending, "-price" descending
+PROPERTY_SORTS: Dict[str, KeysetSort] = {}
+for _field in SORT_FIELDS:
+    for _direction in (ASCENDING, DESCENDING):
+        _sort = KeysetSort(_field, _direction)
+        PROPERTY_SORTS[_sort.name] = _sort
+
+# Stored so it can be indexed; recomputed server-side whenever price or sqft changes
+PRICE_PER_SQFT_EXPR = {
+    "$cond": [
+        {"$gt": ["$sqft", 0]},
+        {"$round": [{"$divide": ["$price", "$sqft"]}, 2]},
+        None,
+    ]
+}
+
+
+def parse_sort(value: Optional[str]) -> KeysetSort:
+    # Raises ValueError for unknown sort names
+    if value is None:
+        return DEFAULT_PROPERTY_SORT
+    sort = PROPERTY_SORTS.get(value.strip())
+    if sort is None:
+        raise ValueError(f"Unknown sort: {value}. Use one of {', '.join(PROPERTY_SORTS)}")
+    return sort
+
+
+def price_per_sqft(price: Optional[float], sqft: Optional[float]) -> Optional[float]:
+    # Mirrors PRICE_PER_SQFT_EXPR
+    if not sqft or sqft <= 0:
+        return None
+    return round((price or 0) / sqft, 2)
+
+
+async def backfill_price_per_sqft(collection) -> int:
+    # One server-side pipeline update for documents written before the field existed
+    try:
+        result = await collection.update_many(
+            {"price_per_sqft": {"$exists": False}}, [{"$set": {"price_per_sqft": PRICE_PER_SQFT_EXPR}}]
+        )
+    except PyMongoError as e:
+        logger.error(f"price_per_sqft backfill failed: {e}")
+        return 0
+    return result.modified_count
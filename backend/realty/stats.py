@@ -0,0 +1,223 @@
+# Incrementally maintained inventory statistics: counters plus mergeable price quantile sketches
+
+import logging
+import math
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from .mirror import MirrorMaintainer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# Fields each listing contributes to the statistics
+STATS_FIELDS = ("id", "status", "property_type", "price", "sqft")
+
+
+class QuantileSketch:
+    # DDSketch-style log-spaced buckets: any quantile is within `relative_accuracy` of the true value.
+    # Buckets are plain counts, so values can be removed again and sketches merge by adding counts.
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Counter = Counter()
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        # Midpoint (in relative terms) of bucket (gamma^(key-1), gamma^key]
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float, n: int = 1) -> None:
+        if value <= 0:
+            self.zeros += n
+        else:
+            key = self._key(value)
+            self.buckets[key] += n
+            if self.buckets[key] <= 0:
+                del self.buckets[key]
+        self.count += n
+        self.total += value * n
+
+    def remove(self, value: float) -> None:
+        self.add(value, -1)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Sketches must share relative_accuracy to merge")
+        self.buckets.update(other.buckets)
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                return self._value(key)
+        return self._value(max(self.buckets))
+
+    def summary(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {
+            "count": self.count,
+            "mean": round(self.total / self.count, 2) if self.count else None,
+            "min": _rounded(self.quantile(0.0)),
+            "max": _rounded(self.quantile(1.0)),
+        }
+        for p in percentiles:
+            summary[f"p{round(p * 100):g}"] = _rounded(self.quantile(p))
+        return summary
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+Row = Tuple[Optional[str], Optional[str], float, float]
+
+
+class InventoryStats:
+    # Per-listing contributions are remembered so an update or delete can subtract exactly what the
+    # previous version added. Reads cost O(statuses x buckets), independent of inventory size.
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.ready = False
+        self.updated_at = datetime.utcnow()
+        self._rows: Dict[str, Row] = {}
+        self._counts: Counter = Counter()
+        self._prices: Dict[Optional[str], QuantileSketch] = {}
+        self._ppsf: Dict[Optional[str], QuantileSketch] = {}
+        self._generation = 0
+        self._snapshot: Optional[Tuple[int, Dict[str, Any]]] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def upsert(self, doc: Mapping[str, Any]) -> None:
+        self.remove(doc["id"])
+        row = (doc.get("status"), doc.get("property_type"), float(doc.get("price") or 0), float(doc.get("sqft") or 0))
+        self._rows[doc["id"]] = row
+        self._apply(row, 1)
+
+    def remove(self, doc_id: str) -> bool:
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return False
+        self._apply(row, -1)
+        return True
+
+    def _apply(self, row: Row, n: int) -> None:
+        status, property_type, price, sqft = row
+        self._counts[(status, property_type)] += n
+        if self._counts[(status, property_type)] <= 0:
+            del self._counts[(status, property_type)]
+        self._sketch(self._prices, status).add(price, n)
+        if sqft > 0:
+            self._sketch(self._ppsf, status).add(price / sqft, n)
+        self._generation += 1
+        self.updated_at = datetime.utcnow()
+
+    def _sketch(self, sketches: Dict[Optional[str], QuantileSketch], status: Optional[str]) -> QuantileSketch:
+        sketch = sketches.get(status)
+        if sketch is None:
+            sketch = sketches[status] = QuantileSketch(self.relative_accuracy)
+        return sketch
+
+    def _merged(self, sketches: Dict[Optional[str], QuantileSketch]) -> QuantileSketch:
+        merged = QuantileSketch(self.relative_accuracy)
+        for sketch in sketches.values():
+            merged.merge(sketch)
+        return merged
+
+    def snapshot(self) -> Dict[str, Any]:
+        # Memoized until the next write
+        if self._snapshot is not None and self._snapshot[0] == self._generation:
+            return self._snapshot[1]
+
+        by_status: Counter = Counter()
+        by_type: Counter = Counter()
+        by_status_type: Dict[str, Dict[str, int]] = {}
+        for (status, property_type), count in self._counts.items():
+            by_status[str(status)] += count
+            by_type[str(property_type)] += count
+            by_status_type.setdefault(str(status), {})[str(property_type)] = count
+
+        price = {"all": self._merged(self._prices).summary()}
+        price_per_sqft = {"all": self._merged(self._ppsf).summary()}
+        for status, sketch in self._prices.items():
+            if sketch.count:
+                price[str(status)] = sketch.summary()
+        for status, sketch in self._ppsf.items():
+            if sketch.count:
+                price_per_sqft[str(status)] = sketch.summary()
+
+        snapshot = {
+            "total": len(self._rows),
+            "by_status": dict(by_status),
+            "by_type": dict(by_type),
+            "by_status_type": by_status_type,
+            "price": price,
+            "price_per_sqft": price_per_sqft,
+            "relative_accuracy": self.relative_accuracy,
+            "updated_at": self.updated_at,
+        }
+        self._snapshot = (self._generation, snapshot)
+        return snapshot
+
+    def drift(self, other: "InventoryStats") -> int:
+        # Listings whose contribution differs between two instances (e.g. incremental vs recomputed)
+        ids = self._rows.keys() | other._rows.keys()
+        return sum(1 for doc_id in ids if self._rows.get(doc_id) != other._rows.get(doc_id))
+
+
+class StatsMaintainer(MirrorMaintainer):
+    # MirrorMaintainer over InventoryStats; each periodic full recompute also measures drift. Reloads
+    # forced by resets (bulk writes, archival) replace stats known to be stale, so they aren't measured.
+
+    def __init__(
+        self,
+        collection,
+        refresh_interval: Optional[float] = 900.0,
+        relative_accuracy: float = 0.01,
+        batch_size: int = 1000,
+        archive=None,
+    ):
+        super().__init__(
+            collection,
+            lambda: InventoryStats(relative_accuracy),
+            STATS_FIELDS,
+            name="Inventory stats",
+            batch_size=batch_size,
+            refresh_interval=refresh_interval,
+            archive=archive,
+        )
+        self.last_drift: Optional[int] = None
+
+    @property
+    def inventory(self) -> InventoryStats:
+        return self.mirror
+
+    def _swap(self, fresh: InventoryStats, audit: bool = False) -> None:
+        if audit and self.mirror.ready:
+            self.last_drift = self.mirror.drift(fresh)
+            if self.last_drift:
+                logger.warning(f"Inventory stats drifted on {self.last_drift} listings; recomputed")
+        super()._swap(fresh, audit)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "last_drift": self.last_drift}
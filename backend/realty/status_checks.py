@@ -0,0 +1,87 @@
+# Status check history: TTL retention, time-range/client keyset paging and a per-client latest view
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import PyMongoError
+
+from .pagination import KeysetSort
+
+logger = logging.getLogger(__name__)
+
+# Newest first; every query is served by (timestamp, id) or (client_name, timestamp, id)
+STATUS_CHECK_SORT = KeysetSort("timestamp", DESCENDING)
+
+# Single-field TTL index on timestamp; created here rather than in INDEX_REGISTRY because its expiry
+# comes from configuration and may change between deploys
+STATUS_CHECK_TTL_INDEX = "status_checks_timestamp_ttl"
+
+
+def parse_clients(value: Optional[str]) -> List[str]:
+    # "web,worker-1" -> ["web", "worker-1"]
+    if not value:
+        return []
+    return list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+
+
+def status_check_query(
+    clients: Sequence[str] = (),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    # `since` is inclusive and `until` exclusive, so consecutive windows never overlap
+    query: Dict[str, Any] = {}
+    if len(clients) == 1:
+        query["client_name"] = clients[0]
+    elif clients:
+        query["client_name"] = {"$in": list(clients)}
+    window = {}
+    if since is not None:
+        window["$gte"] = since
+    if until is not None:
+        window["$lt"] = until
+    if window:
+        query["timestamp"] = window
+    return query
+
+
+def latest_pipeline(clients: Sequence[str] = ()) -> List[Dict[str, Any]]:
+    # $sort on the (client_name, timestamp) index followed by $group/$first is answered with a
+    # DISTINCT_SCAN: one index seek per client, however much history each one has
+    pipeline: List[Dict[str, Any]] = []
+    if clients:
+        pipeline.append({"$match": {"client_name": {"$in": list(clients)}}})
+    pipeline += [
+        {"$sort": {"client_name": ASCENDING, "timestamp": DESCENDING, "id": DESCENDING}},
+        {"$group": {"_id": "$client_name", "id": {"$first": "$id"}, "timestamp": {"$first": "$timestamp"}}},
+        {"$project": {"_id": 0, "id": 1, "client_name": "$_id", "timestamp": 1}},
+        {"$sort": {"client_name": ASCENDING}},
+    ]
+    return pipeline
+
+
+async def ensure_status_check_ttl(collection, ttl_seconds: Optional[int]) -> Optional[str]:
+    # Create the TTL index, retune its expiry in place (collMod) when the setting changes, or drop it
+    # when retention is turned off; returns what was done, None when already current
+    try:
+        current = (await collection.index_information()).get(STATUS_CHECK_TTL_INDEX)
+        if not ttl_seconds:
+            if current is None:
+                return None
+            await collection.drop_index(STATUS_CHECK_TTL_INDEX)
+            return "dropped"
+        if current is None:
+            await collection.create_index(
+                [("timestamp", ASCENDING)], name=STATUS_CHECK_TTL_INDEX, expireAfterSeconds=ttl_seconds
+            )
+            return "created"
+        if current.get("expireAfterSeconds") != ttl_seconds:
+            await collection.database.command(
+                "collMod", collection.name, index={"name": STATUS_CHECK_TTL_INDEX, "expireAfterSeconds": ttl_seconds}
+            )
+            return "updated"
+    except PyMongoError as e:
+        logger.error(f"Failed to apply status check retention: {e}")
+    return None
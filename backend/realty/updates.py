@@ -0,0 +1,114 @@
+# Single round-trip property updates with optimistic concurrency
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional
+
+from pymongo import UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Documents written before versioning existed count as version 1
+INITIAL_VERSION = 1
+
+
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    # If-Match carries the expected document version: bare (`3`, `"3"`) or the detail ETag echoed back
+    # (`"3-<hash>"`); `*` places no condition. Raises ValueError for tags without a version.
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    value = value.strip('"').split("-", 1)[0]
+    if not value.isdigit():
+        raise ValueError("If-Match does not match any version of this property")
+    return int(value)
+
+
+def version_filter(expected: int) -> Any:
+    if expected == INITIAL_VERSION:
+        return {"$in": [INITIAL_VERSION, None]}
+    return expected
+
+
+def versioned_update(fields: Mapping[str, Any], derived: Optional[Mapping[str, Any]] = None) -> List[Dict[str, Any]]:
+    # Pipeline update: set fields verbatim and bump `version`, treating a missing version as 1;
+    # `derived` expressions run afterwards, so they see the new field values
+    stage = {name: {"$literal": value} for name, value in fields.items()}
+    stage["version"] = {"$add": [{"$ifNull": ["$version", INITIAL_VERSION]}, 1]}
+    pipeline = [{"$set": stage}]
+    if derived:
+        pipeline.append({"$set": dict(derived)})
+    return pipeline
+
+
+@dataclass
+class PatchOp:
+    # One bulk patch operation: a single document by id, or every match of a filter
+    query: Dict[str, Any]
+    fields: Dict[str, Any]
+    many: bool = False
+    id: Optional[str] = None
+    derived: Optional[Dict[str, Any]] = None
+
+
+def _stamp() -> datetime:
+    # Millisecond precision, so the value compares equal after a round trip through BSON
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+async def _bulk_write(collection, requests: List[Any], order: List[int], errors: Dict[int, str]) -> Dict[str, int]:
+    # One unordered bulk_write; write errors are recorded against the caller's op indexes
+    if not requests:
+        return {"matched": 0, "modified": 0}
+    try:
+        result = await collection.bulk_write(requests, ordered=False)
+        return {"matched": result.matched_count, "modified": result.modified_count}
+    except BulkWriteError as e:
+        details = e.details or {}
+        for write_error in details.get("writeErrors", []):
+            errors[order[write_error["index"]]] = write_error.get("errmsg", "write error")
+        return {"matched": details.get("nMatched", 0), "modified": details.get("nModified", 0)}
+
+
+async def bulk_patch(collection, ops: List[PatchOp]) -> Dict[str, Any]:
+    # Filter ops in one unordered bulk_write, then id ops in a second, so an id op always lands on top
+    # of any filter op touching the same document (unordered writes have no execution order)
+    filter_ops = [i for i, op in enumerate(ops) if op.many]
+    id_ops = [i for i, op in enumerate(ops) if not op.many]
+
+    # Filter ops carry an earlier stamp, so a document stamped `id_stamp` afterwards was
+    # written by its id op, not by an overlapping filter op
+    id_stamp = _stamp()
+    filter_stamp = id_stamp - timedelta(milliseconds=1)
+
+    def request(op: PatchOp):
+        fields = {**op.fields, "updated_at": filter_stamp if op.many else id_stamp}
+        return (UpdateMany if op.many else UpdateOne)(op.query, versioned_update(fields, op.derived))
+
+    # bulk_write only reports totals: filter ops are counted (index-backed) just before writing
+    filter_counts = await asyncio.gather(*(collection.count_documents(ops[i].query) for i in filter_ops))
+    matched_by_op: Dict[int, int] = dict(zip(filter_ops, filter_counts))
+
+    errors: Dict[int, str] = {}
+    totals = {"matched": 0, "modified": 0}
+    for order in (filter_ops, id_ops):
+        written = await _bulk_write(collection, [request(ops[i]) for i in order], order, errors)
+        totals = {name: totals[name] + written[name] for name in totals}
+
+    touched = set()
+    if id_ops:
+        ids = [ops[i].id for i in id_ops]
+        cursor = collection.find({"id": {"$in": ids}, "updated_at": id_stamp}, {"_id": 0, "id": 1})
+        touched = {doc["id"] async for doc in cursor}
+
+    results = []
+    for i, op in enumerate(ops):
+        if i in errors:
+            results.append({"index": i, "matched": 0, "modified": 0, "error": errors[i]})
+            continue
+        count = matched_by_op.get(i, 0) if op.many else int(op.id in touched)
+        results.append({"index": i, "matched": count, "modified": count})
+    return {**totals, "operations": results}
@@ -0,0 +1,156 @@
+# Comparable-sales valuation: many candidates priced against stored listings in vectorized passes
+
+import asyncio
+import math
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .geo import normalize_place
+
+VALUATION_FIELDS = ("id", "status", "property_type", "location", "sqft", "year_built", "price")
+DEFAULT_COMPARABLE_STATUSES = ("sold",)
+
+# Distance units: a 25% size difference (log scale) or 15 years of age each count as 1, and a
+# comparable without year_built costs as much as being 15 years apart
+SIZE_SCALE = 0.25
+AGE_SCALE = 15.0
+MISSING_AGE = 1.0
+
+# Candidate x comparable distances computed per block, bounding memory for big requests
+_BLOCK_CELLS = 4_000_000
+
+
+def _year(value: Any) -> float:
+    try:
+        return float(value) if value is not None else math.nan
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class ComparableSet:
+    # Comparables grouped by (property type, normalized location) and by type alone; a candidate is
+    # priced from the k closest in size and age within the most specific group that has enough.
+
+    def __init__(self, docs: Iterable[Mapping[str, Any]]):
+        ids, log_sqft, years, ppsf, keys = [], [], [], [], []
+        for doc in docs:
+            price, sqft = doc.get("price"), doc.get("sqft")
+            if not price or not sqft or price <= 0 or sqft <= 0:
+                continue
+            ids.append(doc.get("id"))
+            log_sqft.append(math.log(sqft))
+            years.append(_year(doc.get("year_built")))
+            ppsf.append(price / sqft)
+            keys.append((doc.get("property_type"), normalize_place(doc.get("location") or "")))
+        self.ids = np.array(ids, dtype=object)
+        self.log_sqft = np.array(log_sqft, dtype=np.float32)
+        self.years = np.array(years, dtype=np.float32)
+        self.ppsf = np.array(ppsf, dtype=np.float64)
+
+        by_place: Dict[Tuple[Any, str], List[int]] = {}
+        by_type: Dict[Any, List[int]] = {}
+        for i, (property_type, place) in enumerate(keys):
+            by_place.setdefault((property_type, place), []).append(i)
+            by_type.setdefault(property_type, []).append(i)
+        self._by_place = {key: np.array(rows) for key, rows in by_place.items()}
+        self._by_type = {key: np.array(rows) for key, rows in by_type.items()}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    async def load(cls, collections: Sequence[Any], statuses: Sequence[str], batch_size: int = 5000):
+        docs = []
+        projection = {"_id": 0, **{name: 1 for name in VALUATION_FIELDS}}
+        for collection in collections:
+            async for doc in collection.find({"status": {"$in": list(statuses)}}, projection).batch_size(batch_size):
+                docs.append(doc)
+        # Building the arrays is CPU-bound; keep it off the event loop
+        return await asyncio.to_thread(cls, docs)
+
+    def value(
+        self, candidates: Sequence[Mapping[str, Any]], k: int = 10, min_comparables: int = 3
+    ) -> List[Dict[str, Any]]:
+        # One result per candidate, in order; candidates without enough comparables get null estimates
+        results: List[Optional[Dict[str, Any]]] = [None] * len(candidates)
+        blocks: Dict[Tuple[str, Any], List[int]] = {}
+        for i, candidate in enumerate(candidates):
+            property_type = candidate.get("property_type")
+            place = (property_type, normalize_place(candidate.get("location") or ""))
+            sqft = candidate.get("sqft")
+            if not sqft or sqft <= 0:
+                results[i] = _unvalued(i)
+            elif len(self._by_place.get(place, ())) >= min_comparables:
+                blocks.setdefault(("location", place), []).append(i)
+            elif len(self._by_type.get(property_type, ())) >= min_comparables:
+                blocks.setdefault(("type", property_type), []).append(i)
+            else:
+                results[i] = _unvalued(i)
+
+        for (match, key), members in blocks.items():
+            group = self._by_place[key] if match == "location" else self._by_type[key]
+            rows = max(1, _BLOCK_CELLS // len(group))
+            for start in range(0, len(members), rows):
+                chunk = members[start:start + rows]
+                for i, result in zip(chunk, self._value_block(group, [candidates[i] for i in chunk], k)):
+                    results[i] = {"index": i, "match": match, **result}
+        return results
+
+    def _value_block(self, group: np.ndarray, candidates: List[Mapping[str, Any]], k: int) -> List[Dict[str, Any]]:
+        # Distances for a block of candidates against one comparable group, as a single matrix
+        # float32 halves the memory traffic of the matrix passes; distances only rank comparables
+        sqft = np.array([candidate["sqft"] for candidate in candidates], dtype=np.float64)
+        years = np.array([_year(candidate.get("year_built")) for candidate in candidates], dtype=np.float32)
+
+        distance = np.log(sqft).astype(np.float32)[:, None] - self.log_sqft[group][None, :]
+        distance *= np.float32(1 / SIZE_SCALE)
+        distance *= distance
+        age = years[:, None] - self.years[group][None, :]
+        age *= np.float32(1 / AGE_SCALE)
+        age *= age
+        age[np.isnan(age)] = MISSING_AGE
+        # A candidate without year_built is compared on size alone
+        age[np.isnan(years)] = 0.0
+        distance += age
+
+        k = min(k, len(group))
+        if k < len(group):
+            nearest = np.argpartition(distance, k - 1, axis=1)[:, :k]
+        else:
+            nearest = np.tile(np.arange(k), (len(candidates), 1))
+        order = np.argsort(np.take_along_axis(distance, nearest, axis=1), axis=1, kind="stable")
+        nearest = np.take_along_axis(nearest, order, axis=1)
+
+        ppsf = self.ppsf[group][nearest]
+        low, mid, high = np.percentile(ppsf, [25, 50, 75], axis=1).tolist()
+        sqft = sqft.tolist()
+        ids = self.ids[group][nearest].tolist()
+        return [
+            {
+                "estimated_price": round(mid[row] * sqft[row]),
+                "price_low": round(low[row] * sqft[row]),
+                "price_high": round(high[row] * sqft[row]),
+                "price_per_sqft": round(mid[row], 2),
+                "price_per_sqft_low": round(low[row], 2),
+                "price_per_sqft_high": round(high[row], 2),
+                "comparables": k,
+                "comparable_ids": ids[row],
+            }
+            for row in range(len(candidates))
+        ]
+
+
+def _unvalued(index: int) -> Dict[str, Any]:
+    return {
+        "index": index,
+        "match": None,
+        "estimated_price": None,
+        "price_low": None,
+        "price_high": None,
+        "price_per_sqft": None,
+        "price_per_sqft_low": None,
+        "price_per_sqft_high": None,
+        "comparables": 0,
+        "comparable_ids": [],
+    }
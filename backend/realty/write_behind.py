@@ -0,0 +1,162 @@
+# Write-behind inserts: documents queue in memory and are written with insert_many in batches
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Queued after the last document by stop(), so everything submitted before it is flushed first
+_STOP = object()
+
+
+class WriteBehindQueue:
+    # Bounded queue in front of a collection. A batch is flushed once it holds `batch_size` documents
+    # or its oldest document has waited `max_delay` seconds. When the queue is full, submit() waits up
+    # to `put_timeout` seconds for room and then raises asyncio.QueueFull, pushing back on callers
+    # instead of growing without bound. Until start() (and after stop()) documents are inserted directly.
+
+    def __init__(
+        self,
+        collection,
+        batch_size: int = 500,
+        max_delay: float = 1.0,
+        max_queue: int = 10000,
+        put_timeout: float = 2.0,
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self.put_timeout = put_timeout
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+        self.waits = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self.last_flush_ms: Optional[float] = None
+        self.max_flush_ms: Optional[float] = None
+        self._flush_seconds = 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def buffering(self) -> bool:
+        return self._task is not None
+
+    async def submit(self, doc: Dict[str, Any]) -> None:
+        if not self.buffering:
+            await self.collection.insert_one(doc)
+            return
+        try:
+            self._queue.put_nowait(doc)
+        except asyncio.QueueFull:
+            self.waits += 1
+            queue = self._queue
+            try:
+                await asyncio.wait_for(queue.put(doc), self.put_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise asyncio.QueueFull(f"Write-behind queue full ({self.max_queue} documents)") from None
+            if not self.buffering:
+                # stop() finished while this caller waited for room; nothing reads the queue any more
+                self.enqueued += 1
+                await self._drain(queue)
+                return
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            doc = await self._queue.get()
+            if doc is _STOP:
+                return
+            batch: List[Dict[str, Any]] = [doc]
+            deadline = loop.time() + self.max_delay
+            stopping = False
+            while len(batch) < self.batch_size:
+                try:
+                    doc = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        doc = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if doc is _STOP:
+                    stopping = True
+                    break
+                batch.append(doc)
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        # Unordered, so one bad document doesn't stop the rest; failures are logged and counted
+        started = time.perf_counter()
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+            self.written += len(batch)
+        except BulkWriteError as e:
+            inserted = e.details.get("nInserted", 0)
+            self.written += inserted
+            self.failed += len(batch) - inserted
+            logger.error(f"Write-behind flush wrote {inserted}/{len(batch)} documents: {e}")
+        except PyMongoError as e:
+            self.failed += len(batch)
+            logger.error(f"Write-behind flush of {len(batch)} documents failed: {e}")
+        elapsed = time.perf_counter() - started
+        self.flushes += 1
+        self._flush_seconds += elapsed
+        self.last_flush_ms = round(elapsed * 1000, 3)
+        self.max_flush_ms = max(self.max_flush_ms or 0.0, self.last_flush_ms)
+
+    async def stop(self) -> None:
+        # Flushes everything already queued; later submits go straight to the collection
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        if not task.done():
+            await self._queue.put(_STOP)
+            await task
+        await self._drain(self._queue)
+
+    async def _drain(self, queue: asyncio.Queue) -> None:
+        # Whatever landed behind the stop marker (callers that were waiting for room)
+        batch = []
+        while not queue.empty():
+            doc = queue.get_nowait()
+            if doc is not _STOP:
+                batch.append(doc)
+        if batch:
+            await self._flush(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffering": self.buffering,
+            "depth": self._queue.qsize() if self.buffering else 0,
+            "max_depth": self.max_depth,
+            "capacity": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "waits": self.waits,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+            "last_flush_ms": self.last_flush_ms,
+            "avg_flush_ms": round(self._flush_seconds * 1000 / self.flushes, 3) if self.flushes else None,
+            "max_flush_ms": self.max_flush_ms,
+        }
@@ -1,18 +1,94 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+import asyncio
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional, Union
 import uuid
 from datetime import datetime
 
 # AI agents
 from ai_agents.agents import AgentConfig, SearchAgent, ChatAgent, RealEstateAgent
 
+# Property storage helpers
+from realty import (
+    ARCHIVE_COLLECTION,
+    HOT_STATUSES,
+    INITIAL_VERSION,
+    DEFAULT_PROPERTY_SORT,
+    EXPORT_FORMATS,
+    FACET_FIELDS,
+    METERS_PER_MILE,
+    PRICE_PER_SQFT_EXPR,
+    TEXT_SCORE,
+    BM25Maintainer,
+    ChangeEvent,
+    ChangeWatcher,
+    ColumnarMaintainer,
+    CollectionVersion,
+    ComparableSet,
+    DEFAULT_COMPARABLE_STATUSES,
+    PatchOp,
+    InvalidationBus,
+    STATUS_CHECK_SORT,
+    ListingArchiver,
+    OfflineGeocoder,
+    SimilarityMaintainer,
+    StatsMaintainer,
+    VersionedLRUCache,
+    amenity_filter,
+    amenity_tags,
+    backfill_amenity_tags,
+    backfill_price_per_sqft,
+    bulk_patch,
+    cache_key,
+    cached_json_response,
+    conditional_json_response,
+    etag_headers,
+    export_rows,
+    fetch_by_ids,
+    facet_pipeline,
+    ensure_indexes,
+    ensure_status_check_ttl,
+    fast_response,
+    find_collscans,
+    ingest_ndjson,
+    is_archived_status,
+    latest_pipeline,
+    merge_pages,
+    merge_ranked,
+    near_pipeline,
+    ordered_results,
+    parse_amenities,
+    parse_bbox,
+    parse_clients,
+    parse_fields,
+    parse_if_match,
+    parse_point,
+    parse_sort,
+    price_per_sqft,
+    parse_search_query,
+    render_json,
+    restore_listing,
+    shape_facets,
+    status_check_query,
+    text_query,
+    to_projection,
+    trim,
+    trusted_dump,
+    trusted_dump_many,
+    version_filter,
+    versioned_update,
+    within_bbox,
+    WriteBehindQueue,
+)
+
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -22,12 +98,110 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# Offline geocoding for listings saved without coordinates (GEOCODE_TABLE: CSV name,lat,lng or JSON)
+geocode_table = Path(os.environ.get('GEOCODE_TABLE', ROOT_DIR / 'data' / 'geocode.csv'))
+geocoder = OfflineGeocoder.from_file(geocode_table) if geocode_table.exists() else OfflineGeocoder()
+
+# Property read cache, invalidated by bumping the collection version on writes
+properties_version = CollectionVersion("properties")
+property_cache = VersionedLRUCache(
+    properties_version,
+    max_size=int(os.environ.get('PROPERTY_CACHE_SIZE', '512')),
+    ttl=float(os.environ.get('PROPERTY_CACHE_TTL', '30')),
+)
+# Per-listing documents for batch lookups, kept apart so large batches don't evict list/search pages
+property_doc_cache = VersionedLRUCache(
+    properties_version,
+    max_size=int(os.environ.get('PROPERTY_DOC_CACHE_SIZE', '4096')),
+    ttl=float(os.environ.get('PROPERTY_CACHE_TTL', '30')),
+)
+
+# Comparable sales for batch valuations, reloaded after bulk changes or COMPARABLES_TTL seconds; single
+# listing edits only move a valuation slightly, so they don't force a reload of the whole set
+comparables_version = CollectionVersion("comparables")
+comparables_cache = VersionedLRUCache(
+    comparables_version, max_size=4, ttl=float(os.environ.get('COMPARABLES_TTL', '300'))
+)
+
+# Status checks expire STATUS_CHECK_TTL_DAYS after their timestamp via a TTL index; 0 keeps them forever
+status_check_ttl = int(float(os.environ.get('STATUS_CHECK_TTL_DAYS', '30')) * 86400)
+
+# STATUS_WRITE_MODE=buffered acknowledges POST /status once queued and writes checks with insert_many every
+# STATUS_BATCH_SIZE checks or STATUS_FLUSH_INTERVAL seconds; direct (the default) awaits each insert
+status_write_mode = os.environ.get('STATUS_WRITE_MODE', 'direct')
+status_writer = WriteBehindQueue(
+    db.status_checks,
+    batch_size=int(os.environ.get('STATUS_BATCH_SIZE', '500')),
+    max_delay=float(os.environ.get('STATUS_FLUSH_INTERVAL', '1')),
+    max_queue=int(os.environ.get('STATUS_QUEUE_SIZE', '10000')),
+    put_timeout=float(os.environ.get('STATUS_QUEUE_TIMEOUT', '2')),
+)
+
 # AI agents init
 agent_config = AgentConfig()
 search_agent: Optional[SearchAgent] = None
 chat_agent: Optional[ChatAgent] = None
 real_estate_agent: Optional[RealEstateAgent] = None
 
+# Property change events (local writes and other replicas' writes) fan out to readers
+property_changes = InvalidationBus()
+property_watcher = ChangeWatcher(
+    db.properties,
+    property_changes,
+    mode=os.environ.get('PROPERTY_WATCH_MODE', 'auto'),
+    poll_interval=float(os.environ.get('PROPERTY_POLL_INTERVAL', '5')),
+)
+
+def _invalidate_property_readers(event: ChangeEvent):
+    property_cache.invalidate()
+    if event.op == "reset":
+        comparables_cache.invalidate()
+    if real_estate_agent is not None:
+        real_estate_agent.invalidate_properties_context()
+
+property_changes.subscribe(_invalidate_property_readers)
+
+# Dashboard statistics kept current from change events, fully recomputed every STATS_REFRESH_INTERVAL seconds
+# Archived listings count too: the archive is loaded alongside and consulted on deletes
+inventory_stats = StatsMaintainer(
+    db.properties,
+    refresh_interval=float(os.environ.get('STATS_REFRESH_INTERVAL', '900')),
+    archive=db[ARCHIVE_COLLECTION],
+)
+property_changes.subscribe(inventory_stats.handle)
+
+# In-process BM25 keyword index; SEARCH_BACKEND=memory serves /properties/search from it once loaded
+search_backend = os.environ.get('SEARCH_BACKEND', 'mongo')
+property_search_index = BM25Maintainer(db.properties)
+if search_backend == 'memory':
+    property_changes.subscribe(property_search_index.handle)
+
+# Feature matrix for /properties/{id}/similar, kept current from change events
+similar_listings = SimilarityMaintainer(
+    db.properties, statuses=HOT_STATUSES, refresh_interval=float(os.environ.get('SIMILAR_REFRESH_INTERVAL', '900'))
+)
+property_changes.subscribe(similar_listings.handle)
+
+# Columnar NumPy snapshot of hot listings; FILTER_BACKEND=memory serves GET /properties structured
+# filters from it once loaded, hydrating pages from the per-id document cache
+filter_backend = os.environ.get('FILTER_BACKEND', 'mongo')
+property_snapshot = ColumnarMaintainer(
+    db.properties, statuses=HOT_STATUSES, refresh_interval=float(os.environ.get('COLUMNAR_REFRESH_INTERVAL', '900'))
+)
+if filter_backend == 'memory':
+    property_changes.subscribe(property_snapshot.handle)
+
+# Listings out of active/pending for ARCHIVE_AFTER_DAYS move to a cold collection every ARCHIVE_INTERVAL
+# seconds, keeping the hot collection and its indexes small; unset leaves archival off
+archive_after_days = os.environ.get('ARCHIVE_AFTER_DAYS')
+listing_archiver = ListingArchiver(
+    db.properties,
+    db[ARCHIVE_COLLECTION],
+    after_days=float(archive_after_days or 0),
+    interval=float(os.environ.get('ARCHIVE_INTERVAL', '3600')),
+    on_archive=lambda moved: property_changes.publish(ChangeEvent("reset")),
+)
+
 # Main app
 app = FastAPI(title="AI Agents API", description="Minimal AI Agents API with LangGraph and MCP support")
 
@@ -44,7 +218,24 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+class StatusCheckLatest(BaseModel):
+    client_name: str
+    id: str
+    timestamp: datetime
+
 # Property models
+class GeoPoint(BaseModel):
+    # GeoJSON point, coordinates are [longitude, latitude]
+    type: Literal["Point"] = "Point"
+    coordinates: List[float] = Field(..., min_length=2, max_length=2)
+
+    @model_validator(mode="after")
+    def check_range(self):
+        lng, lat = self.coordinates
+        if not -180 <= lng <= 180 or not -90 <= lat <= 90:
+            raise ValueError("coordinates must be [longitude, latitude] within range")
+        return self
+
 class Property(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
@@ -59,13 +250,46 @@ class Property(BaseModel):
     status: str = "active"  # "active", "sold", "pending"
     image_url: str
     amenities: List[str] = Field(default_factory=list)
+    amenity_tags: List[str] = Field(default_factory=list)  # Normalized amenities, derived on write
+    price_per_sqft: Optional[float] = None  # Derived on write, sortable
     year_built: Optional[int] = None
     garage: Optional[int] = None
     lot_size: Optional[float] = None
     mls_number: Optional[str] = None
+    geo: Optional[GeoPoint] = None
+    version: int = 1  # Bumped on every update, checked against If-Match
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    @model_validator(mode="after")
+    def derive_fields(self):
+        self.amenity_tags = amenity_tags(self.amenities)
+        self.price_per_sqft = price_per_sqft(self.price, self.sqft)
+        return self
+
+class PropertySummary(BaseModel):
+    # Compact listing card shape, served via ?fields=summary
+    id: str
+    title: str
+    price: int
+    location: str
+    bedrooms: int
+    bathrooms: int
+    sqft: int
+    property_type: str
+    status: str
+    image_url: str
+    year_built: Optional[int] = None
+
+class PropertySearchResult(Property):
+    score: float  # Text relevance; higher is better
+
+class PropertyNearResult(Property):
+    distance_miles: float  # From the ?near= point
+
+class PropertySimilarResult(Property):
+    similarity_distance: float  # 0 for an identical listing; lower is more similar
+
 class PropertyCreate(BaseModel):
     title: str
     description: str
@@ -82,6 +306,7 @@ class PropertyCreate(BaseModel):
     garage: Optional[int] = None
     lot_size: Optional[float] = None
     mls_number: Optional[str] = None
+    geo: Optional[GeoPoint] = None
 
 class PropertyUpdate(BaseModel):
     title: Optional[str] = None
@@ -100,6 +325,57 @@ class PropertyUpdate(BaseModel):
     garage: Optional[int] = None
     lot_size: Optional[float] = None
     mls_number: Optional[str] = None
+    geo: Optional[GeoPoint] = None
+
+class PropertyFilter(BaseModel):
+    status: Optional[str] = None
+    property_type: Optional[str] = None
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    bedrooms: Optional[int] = None
+
+class BulkPatchOperation(BaseModel):
+    # Exactly one of `id` or `filter`; `version` (id ops only) works like If-Match
+    id: Optional[str] = None
+    filter: Optional[PropertyFilter] = None
+    update: PropertyUpdate
+    version: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if (self.id is None) == (self.filter is None):
+            raise ValueError("Provide exactly one of id or filter")
+        if self.filter is not None and not self.filter.dict(exclude_none=True):
+            raise ValueError("filter must set at least one field")
+        if self.filter is not None and self.version is not None:
+            raise ValueError("version is only supported for id operations")
+        if not self.update.dict(exclude_none=True):
+            raise ValueError("update must set at least one field")
+        return self
+
+class BatchGetRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=500)
+    fields: Optional[str] = None
+
+class ValuationRequest(BaseModel):
+    properties: List[PropertyCreate] = Field(..., min_length=1, max_length=10000)
+    k: int = Field(10, ge=1, le=50)
+    statuses: List[str] = Field(default_factory=lambda: list(DEFAULT_COMPARABLE_STATUSES), min_length=1)
+
+class BulkPatchRequest(BaseModel):
+    operations: List[BulkPatchOperation] = Field(..., min_length=1, max_length=1000)
+
+    @model_validator(mode="after")
+    def check_unique_ids(self):
+        ids = [op.id for op in self.operations if op.id is not None]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Each id may appear in only one operation")
+        # Filter ops are applied first and bump versions, so a guarded id op could fail against its own request
+        if any(op.filter is not None for op in self.operations) and any(
+            op.version is not None for op in self.operations
+        ):
+            raise ValueError("version cannot be combined with filter operations in one request")
+        return self
 
 
 # AI agent models
@@ -140,13 +416,46 @@ async def root():
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    try:
+        await status_writer.submit(status_obj.dict())
+    except asyncio.QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     return status_obj
 
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+@api_router.get("/status", response_model=List[StatusCheck], response_class=ORJSONResponse)
+async def get_status_checks(
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None
+):
+    # Newest first; comma-separated client_name, since inclusive, until exclusive, paged by X-Next-Cursor
+    query = status_check_query(parse_clients(client_name), since, until)
+    if cursor:
+        try:
+            query = STATUS_CHECK_SORT.after(query, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    status_checks = await (
+        db.status_checks.find(query, {"_id": 0}).sort(STATUS_CHECK_SORT.spec()).limit(limit + 1).to_list(limit + 1)
+    )
+    headers = {}
+    if len(status_checks) > limit:
+        status_checks = status_checks[:limit]
+        headers["X-Next-Cursor"] = STATUS_CHECK_SORT.encode_cursor(status_checks[-1])
+    return fast_response(trusted_dump_many(StatusCheck, status_checks), headers=headers)
+
+@api_router.get("/status/writes")
+async def get_status_write_stats():
+    # Write-behind queue depth, flush latency and throughput counters
+    return {"mode": status_write_mode, **status_writer.stats()}
+
+@api_router.get("/status/latest", response_model=List[StatusCheckLatest], response_class=ORJSONResponse)
+async def get_latest_status_checks(client_name: Optional[str] = None):
+    # Most recent check per client, one index seek each rather than a scan of the history
+    latest = await db.status_checks.aggregate(latest_pipeline(parse_clients(client_name))).to_list(None)
+    return fast_response(latest)
 
 
 # AI agent routes
@@ -263,24 +572,86 @@ async def get_agent_capabilities():
         }
 
 
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    # Read cache hit/miss/eviction counters
+    return {
+        "properties": property_cache.stats(),
+        "property_docs": property_doc_cache.stats(),
+        "watcher": property_watcher.active_mode,
+        "search_index": property_search_index.stats() if search_backend == 'memory' else None,
+        "columnar": property_snapshot.stats() if filter_backend == 'memory' else None,
+        "comparables": comparables_cache.stats(),
+    }
+
+
 # Property CRUD routes
-@api_router.post("/properties", response_model=Property)
+def _selected_fields(fields: Optional[str]) -> Optional[List[str]]:
+    # Parse ?fields= into a field list; "summary" expands to PropertySummary
+    try:
+        return parse_fields(fields, Property.model_fields, {"summary": PropertySummary.model_fields})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _near_point(near: str) -> dict:
+    # ?near= is "lat,lng" or a place name from the geocoding table
+    try:
+        point = parse_point(near) or geocoder.geocode(near)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if point is None:
+        raise HTTPException(status_code=400, detail=f"Unknown place for near: {near}")
+    return point
+
+def _derived_updates(fields: dict) -> Optional[dict]:
+    # Pipeline expressions for derived fields whose inputs an update touches
+    if "price" in fields or "sqft" in fields:
+        return {"price_per_sqft": PRICE_PER_SQFT_EXPR}
+    return None
+
+def _keyed(data: dict) -> dict:
+    # _id = id, so change-stream delete events (which carry only the _id) identify the listing
+    data["_id"] = data["id"]
+    return data
+
+def _with_geo(data: dict) -> dict:
+    # Fill missing coordinates from the address, then the location
+    if data.get("geo") is None:
+        data["geo"] = geocoder.geocode(data.get("address"), data.get("location"))
+    return data
+
+def _update_fields(update: PropertyUpdate) -> dict:
+    # Set fields of a PropertyUpdate plus what they imply: amenity tags, and fresh coordinates when the
+    # address or location moves without new ones. A move the geocoder can't place clears geo (the
+    # 2dsphere index skips nulls) rather than leaving the listing at its old coordinates.
+    fields = {k: v for k, v in update.dict().items() if v is not None}
+    if "amenities" in fields:
+        fields["amenity_tags"] = amenity_tags(fields["amenities"])
+    if "geo" not in fields and ("address" in fields or "location" in fields):
+        fields["geo"] = geocoder.geocode(fields.get("address"), fields.get("location"))
+    return fields
+
+@api_router.post("/properties", response_model=Property, response_class=ORJSONResponse)
 async def create_property(property_data: PropertyCreate):
-    property_obj = Property(**property_data.dict())
-    result = await db.properties.insert_one(property_obj.dict())
-    return property_obj
+    property_obj = Property(**_with_geo(property_data.dict()))
+    property_dict = _keyed(property_obj.dict())
+    result = await db.properties.insert_one(property_dict)
+    property_changes.publish(ChangeEvent("insert", property_obj.id, property_dict))
+    return fast_response(trusted_dump(Property, property_dict))
 
-@api_router.get("/properties", response_model=List[Property])
-async def get_properties(
-    status: str = "active",
+def _property_query(
+    status: Optional[str] = None,
     property_type: Optional[str] = None,
     min_price: Optional[int] = None,
     max_price: Optional[int] = None,
     bedrooms: Optional[int] = None,
-    limit: int = 100
-):
-    query = {"status": status}
-
+    amenities_all: Optional[List[str]] = None,
+    amenities_any: Optional[List[str]] = None
+) -> dict:
+    # Structured listing filters -> Mongo query
+    query = {}
+    if status is not None:
+        query["status"] = status
     if property_type:
         query["property_type"] = property_type
     if min_price is not None:
@@ -289,35 +660,506 @@ async def get_properties(
         query.setdefault("price", {})["$lte"] = max_price
     if bedrooms is not None:
         query["bedrooms"] = bedrooms
+    return amenity_filter(query, amenities_all, amenities_any)
+
+def _property_from_row(row: dict) -> dict:
+    # Same validation as POST /api/properties
+    return _keyed(Property(**_with_geo(PropertyCreate(**row).dict())).dict())
+
+@api_router.post("/properties/bulk")
+async def bulk_ingest_properties(
+    request: Request,
+    batch_size: int = Query(1000, ge=1, le=10000),
+    max_errors: int = Query(1000, ge=0, le=100000)
+):
+    # Stream an NDJSON body (one PropertyCreate object per line) into batched inserts
+    report = await ingest_ndjson(
+        request.stream(), db.properties, _property_from_row, batch_size=batch_size, max_errors=max_errors
+    )
+    if report.inserted:
+        property_changes.publish(ChangeEvent("reset"))
+    logger.info(
+        f"Bulk ingest: {report.inserted}/{report.rows_received} rows inserted "
+        f"in {report.duration_seconds}s ({report.rows_per_second} rows/s)"
+    )
+    return report.to_dict()
+
+@api_router.post("/properties/batch", response_class=ORJSONResponse)
+async def get_properties_batch(request: BatchGetRequest):
+    # Many listings by id in request order: cached ones directly, the rest in one $in query
+    selected = _selected_fields(request.fields)
+    projection = to_projection(selected) if selected else {"_id": 0}
+    dump = (lambda doc: trusted_dump(Property, doc)) if selected is None else (lambda doc: trim(doc, selected))
+    found = await fetch_by_ids(
+        db.properties, request.ids, projection, dump, cache=property_doc_cache, fields=request.fields,
+        fallback=db[ARCHIVE_COLLECTION],
+    )
+    return fast_response(ordered_results(request.ids, found))
+
+@api_router.post("/properties/valuations", response_class=ORJSONResponse)
+async def value_properties(request: ValuationRequest):
+    # Estimated price and price-per-sqft ranges for many listings from their nearest comparable sales
+    statuses = tuple(sorted(set(request.statuses)))
+    comparables = comparables_cache.get(statuses)
+    if comparables is None:
+        version = comparables_version.value
+        comparables = await ComparableSet.load([db.properties, db[ARCHIVE_COLLECTION]], statuses)
+        comparables_cache.set(statuses, comparables, version)
+    # NumPy distance blocks: seconds for large candidate sets, so off the event loop
+    results = await asyncio.to_thread(
+        comparables.value, [candidate.dict() for candidate in request.properties], k=request.k
+    )
+    return fast_response({"comparables": len(comparables), "results": results})
+
+@api_router.patch("/properties/bulk")
+async def bulk_patch_properties(request: BulkPatchRequest):
+    # Many PropertyUpdate-shaped patches in one unordered bulk_write
+    ops = []
+    for operation in request.operations:
+        fields = _update_fields(operation.update)
+        if operation.id is not None:
+            query = {"id": operation.id}
+            if operation.version is not None:
+                query["version"] = version_filter(operation.version)
+            ops.append(PatchOp(query, fields, id=operation.id, derived=_derived_updates(fields)))
+        else:
+            ops.append(PatchOp(_property_query(**operation.filter.dict()), fields, many=True, derived=_derived_updates(fields)))
 
-    properties = await db.properties.find(query).limit(limit).to_list(limit)
-    return [Property(**prop) for prop in properties]
+    result = await bulk_patch(db.properties, ops)
+    if result["modified"]:
+        property_changes.publish(ChangeEvent("reset"))
+    return result
 
-@api_router.get("/properties/{property_id}", response_model=Property)
-async def get_property(property_id: str):
-    property_data = await db.properties.find_one({"id": property_id})
+@api_router.post("/properties/archive")
+async def archive_properties(older_than_days: Optional[float] = Query(None, ge=0)):
+    # Run archival now; defaults to ARCHIVE_AFTER_DAYS, required when that is unset
+    if older_than_days is None and not archive_after_days:
+        raise HTTPException(status_code=400, detail="older_than_days is required when ARCHIVE_AFTER_DAYS is unset")
+    archived = await listing_archiver.run_once(older_than_days)
+    return {"archived": archived, **listing_archiver.stats()}
+
+@api_router.get("/properties/export")
+async def export_properties(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[str] = None,
+    property_type: Optional[str] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    bedrooms: Optional[int] = None,
+    amenities_all: Optional[str] = None,
+    amenities_any: Optional[str] = None,
+    after_id: Optional[str] = None,
+    batch_size: int = Query(1000, ge=1, le=10000)
+):
+    # Full inventory dump streamed straight from the cursor; memory stays constant. Archived listings
+    # are merged in unless the status filter is a hot one.
+    query = _property_query(
+        status, property_type, min_price, max_price, bedrooms, parse_amenities(amenities_all), parse_amenities(amenities_any)
+    )
+    rows = export_rows(
+        db.properties,
+        query,
+        format,
+        columns=list(Property.model_fields),
+        dump=lambda doc: trusted_dump(Property, doc),
+        after_id=after_id,
+        batch_size=batch_size,
+        archive=db[ARCHIVE_COLLECTION] if status is None or is_archived_status(status) else None,
+    )
+    filename = f"properties.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@api_router.get("/properties/search", response_model=List[PropertySearchResult], response_class=ORJSONResponse)
+async def search_properties(
+    q: str = Query(..., min_length=1, max_length=200),
+    status: str = "active",
+    property_type: Optional[str] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    bedrooms: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    if_none_match: Optional[str] = Header(None)
+):
+    # Relevance-ranked keyword search; "under 1M" / "3 beds" in q become filters unless given explicitly
+    key = cache_key(
+        "search", q=q, status=status, property_type=property_type, min_price=min_price, max_price=max_price,
+        bedrooms=bedrooms, limit=limit, offset=offset,
+    )
+    cached = property_cache.get(key)
+    if cached is not None:
+        return conditional_json_response(*cached, if_none_match)
+    version = properties_version.value
+
+    parsed = parse_search_query(q)
+    filters = {"min_price": min_price, "max_price": max_price, "bedrooms": bedrooms}
+    for name, value in parsed.hints.items():
+        if filters[name] is None:
+            filters[name] = value
+    query = _property_query(status, property_type, **filters)
+
+    # Offset paging: $text scores the whole match set on every page anyway. The in-memory index holds
+    # only the hot collection, so archived statuses are searched in Mongo.
+    archived = is_archived_status(status)
+    if parsed.text and search_backend == 'memory' and property_search_index.index.ready and not archived:
+        # Rank in process, then fetch just the page's documents and keep the ranking order
+        ranked = property_search_index.index.search(
+            parsed.text, limit=limit + 1, offset=offset, status=status, property_type=property_type, **filters
+        )
+        scores = dict(ranked)
+        rows = await db.properties.find({"id": {"$in": list(scores)}}, {"_id": 0}).to_list(len(scores))
+        by_id = {row["id"]: row for row in rows}
+        docs = [{**by_id[doc_id], "score": score} for doc_id, score in ranked if doc_id in by_id]
+    else:
+        if parsed.text:
+            query = text_query(query, parsed.text)
+            projection, order = {"_id": 0, "score": TEXT_SCORE}, [("score", TEXT_SCORE), ("id", 1)]
+        else:
+            projection, order = {"_id": 0}, DEFAULT_PROPERTY_SORT.spec()
+        if archived:
+            # Read-through: the first offset + limit + 1 matches of each collection, merged, then the page cut out
+            window = offset + limit + 1
+            hot, cold = await asyncio.gather(*(
+                collection.find(query, projection).sort(order).limit(window).to_list(window)
+                for collection in (db.properties, db[ARCHIVE_COLLECTION])
+            ))
+            if parsed.text:
+                docs = merge_ranked(hot, cold, window)[offset:]
+            else:
+                docs = merge_pages(hot, cold, DEFAULT_PROPERTY_SORT, window)[offset:]
+        else:
+            cursor = db.properties.find(query, projection).sort(order)
+            docs = await cursor.skip(offset).limit(limit + 1).to_list(limit + 1)
+
+    headers = {}
+    if len(docs) > limit:
+        docs = docs[:limit]
+        headers["X-Next-Offset"] = str(offset + limit)
+    results = [{**trusted_dump(Property, doc), "score": round(doc.get("score", 0.0), 4)} for doc in docs]
+
+    body = render_json(results)
+    headers = etag_headers(body, headers)
+    property_cache.set(key, (body, headers), version)
+    return conditional_json_response(body, headers, if_none_match)
+
+@api_router.get("/properties/stats", response_class=ORJSONResponse)
+async def get_property_stats():
+    # Counts, price percentiles and price per sqft from the in-memory aggregates; no Mongo round trip
+    if not inventory_stats.inventory.ready:
+        raise HTTPException(status_code=503, detail="Inventory statistics are still loading", headers={"Retry-After": "5"})
+    return fast_response({**inventory_stats.inventory.snapshot(), "maintenance": inventory_stats.stats()})
+
+@api_router.get("/properties/facets", response_class=ORJSONResponse)
+async def get_property_facets(
+    status: Optional[str] = None,
+    property_type: Optional[str] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    bedrooms: Optional[int] = None,
+    amenities_all: Optional[str] = None,
+    amenities_any: Optional[str] = None,
+    top: int = Query(20, ge=1, le=100),
+    if_none_match: Optional[str] = Header(None)
+):
+    # Sidebar counts for every facet in one $facet round trip; cached until the inventory changes
+    all_tags, any_tags = parse_amenities(amenities_all), parse_amenities(amenities_any)
+    key = cache_key(
+        "facets", status=status, property_type=property_type, min_price=min_price, max_price=max_price,
+        bedrooms=bedrooms, amenities_all=all_tags and ",".join(all_tags), amenities_any=any_tags and ",".join(any_tags),
+        top=top,
+    )
+    cached = property_cache.get(key)
+    if cached is not None:
+        return conditional_json_response(*cached, if_none_match)
+    version = properties_version.value
+
+    # A chosen status scopes everything (and leads the index); otherwise status is a facet too
+    clauses = {
+        "property_type": _property_query(property_type=property_type),
+        "price": _property_query(min_price=min_price, max_price=max_price),
+        "bedrooms": _property_query(bedrooms=bedrooms),
+        "amenities": _property_query(amenities_all=all_tags, amenities_any=any_tags),
+    }
+    facets = [name for name in FACET_FIELDS if name != "status" or status is None]
+    # Archived listings are counted unless the status filter is a hot one
+    archive = ARCHIVE_COLLECTION if status is None or is_archived_status(status) else None
+    pipeline = facet_pipeline(clauses, base=_property_query(status=status), facets=facets, top=top, union_with=archive)
+    result = await db.properties.aggregate(pipeline).to_list(1)
+
+    body = render_json(shape_facets(result[0] if result else None))
+    headers = etag_headers(body)
+    property_cache.set(key, (body, headers), version)
+    return conditional_json_response(body, headers, if_none_match)
+
+@api_router.get(
+    "/properties",
+    response_model=Union[List[Property], List[PropertyNearResult], List[PropertySummary]],
+    response_class=ORJSONResponse,
+)
+async def get_properties(
+    status: str = "active",
+    property_type: Optional[str] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    bedrooms: Optional[int] = None,
+    amenities_all: Optional[str] = None,
+    amenities_any: Optional[str] = None,
+    near: Optional[str] = None,
+    within_radius: Optional[float] = Query(None, gt=0, le=500),
+    bbox: Optional[str] = None,
+    sort: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    offset: int = Query(0, ge=0, le=10000),
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    # Comma-separated amenities, e.g. amenities_all=Pool,Gym; matched on normalized tags
+    all_tags, any_tags = parse_amenities(amenities_all), parse_amenities(amenities_any)
+    key = cache_key(
+        "list", status=status, property_type=property_type, min_price=min_price, max_price=max_price,
+        bedrooms=bedrooms, amenities_all=all_tags and ",".join(all_tags), amenities_any=any_tags and ",".join(any_tags),
+        near=near, within_radius=within_radius, bbox=bbox, sort=sort, limit=limit, cursor=cursor, offset=offset,
+        fields=fields,
+    )
+    # Cache hit: answer (or 304) without touching Mongo or re-serializing
+    cached = property_cache.get(key)
+    if cached is not None:
+        return conditional_json_response(*cached, if_none_match)
+    version = properties_version.value
+
+    selected = _selected_fields(fields)
+    query = _property_query(status, property_type, min_price, max_price, bedrooms, all_tags, any_tags)
+    if bbox is not None:
+        try:
+            query = within_bbox(query, parse_bbox(bbox))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if near is not None:
+        if cursor:
+            raise HTTPException(status_code=400, detail="near results are paged with offset, not cursor")
+        if sort is not None:
+            raise HTTPException(status_code=400, detail="near results are always sorted by distance")
+        return await _get_properties_near(
+            key, version, query, _near_point(near), within_radius, selected, limit, offset, if_none_match
+        )
+    if within_radius is not None:
+        raise HTTPException(status_code=400, detail="within_radius requires near")
+    if offset:
+        raise HTTPException(status_code=400, detail="offset is only supported with near; use cursor")
+
+    # Keyset paging: resume after the last (sort field, id) seen; every sort has a (status, field, id) index
+    try:
+        keyset = parse_sort(sort)
+        # Amenity and bbox filters aren't in the snapshot, so those queries stay on Mongo
+        snapshot = property_snapshot.snapshot
+        columnar = (
+            filter_backend == 'memory' and snapshot.ready and snapshot.covers(status)
+            and bbox is None and not all_tags and not any_tags
+        )
+        if columnar:
+            after = keyset.decode_cursor(cursor) if cursor else None
+            return await _get_properties_columnar(
+                key, version, snapshot, keyset, after, limit, selected, fields, if_none_match,
+                status=status, property_type=property_type, min_price=min_price, max_price=max_price,
+                bedrooms=bedrooms,
+            )
+        if cursor:
+            query = keyset.after(query, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Sort key is always fetched so the next cursor can be built
+    projection = to_projection(selected + [keyset.field]) if selected else None
+
+    # One extra row tells us whether another page exists
+    properties = await db.properties.find(query, projection).sort(keyset.spec()).limit(limit + 1).to_list(limit + 1)
+    if is_archived_status(status):
+        # Read-through: the same page from the archive, merged in sort order
+        archived = await (
+            db[ARCHIVE_COLLECTION].find(query, projection).sort(keyset.spec()).limit(limit + 1).to_list(limit + 1)
+        )
+        properties = merge_pages(properties, archived, keyset, limit + 1)
+    headers = {}
+    if len(properties) > limit:
+        properties = properties[:limit]
+        headers["X-Next-Cursor"] = keyset.encode_cursor(properties[-1])
+
+    if selected is None:
+        body = render_json(trusted_dump_many(Property, properties))
+    else:
+        body = render_json([trim(prop, selected) for prop in properties])
+    headers = etag_headers(body, headers)
+    property_cache.set(key, (body, headers), version)
+    return conditional_json_response(body, headers, if_none_match)
+
+async def _get_properties_columnar(
+    key, version, snapshot, keyset, after, limit, selected, fields, if_none_match, **filters
+):
+    # Filter and order in the columnar snapshot, then hydrate the page by id (cache first, one $in)
+    rows = snapshot.page(keyset, limit + 1, after, **filters)
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = keyset.encode_cursor(rows[-1])
+
+    ids = [row["id"] for row in rows]
+    projection = to_projection(selected) if selected else {"_id": 0}
+    dump = (lambda doc: trusted_dump(Property, doc)) if selected is None else (lambda doc: trim(doc, selected))
+    found = await fetch_by_ids(db.properties, ids, projection, dump, cache=property_doc_cache, fields=fields)
+    # A listing deleted between the snapshot and the fetch is simply left out of the page
+    body = render_json([found[doc_id] for doc_id in ids if found[doc_id] is not None])
+    headers = etag_headers(body, headers)
+    property_cache.set(key, (body, headers), version)
+    return conditional_json_response(body, headers, if_none_match)
+
+async def _get_properties_near(key, version, query, point, within_radius, selected, limit, offset, if_none_match):
+    # Nearest first via $geoNear; offset paging since distance isn't a stored sort key
+    max_meters = within_radius * METERS_PER_MILE if within_radius is not None else None
+    projection = to_projection(selected + ["distance"]) if selected else None
+    pipeline = near_pipeline(point, query, max_meters, skip=offset, limit=limit + 1, projection=projection)
+    properties = await db.properties.aggregate(pipeline).to_list(limit + 1)
+    headers = {}
+    if len(properties) > limit:
+        properties = properties[:limit]
+        headers["X-Next-Offset"] = str(offset + limit)
+
+    dump = (lambda prop: trusted_dump(Property, prop)) if selected is None else (lambda prop: trim(prop, selected))
+    body = render_json([
+        {**dump(prop), "distance_miles": round(prop["distance"] / METERS_PER_MILE, 3)} for prop in properties
+    ])
+    headers = etag_headers(body, headers)
+    property_cache.set(key, (body, headers), version)
+    return conditional_json_response(body, headers, if_none_match)
+
+@api_router.get(
+    "/properties/{property_id}",
+    response_model=Union[Property, PropertySummary],
+    response_class=ORJSONResponse,
+)
+async def get_property(
+    property_id: str,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    key = cache_key("detail", id=property_id, fields=fields)
+    cached = property_cache.get(key)
+    if cached is not None:
+        return conditional_json_response(*cached, if_none_match)
+    version = properties_version.value
+
+    selected = _selected_fields(fields)
+    # version is always fetched: the ETag carries it so clients can send it back in If-Match
+    projection = to_projection(selected + ["version"]) if selected else None
+    property_data = await db.properties.find_one({"id": property_id}, projection)
+    if not property_data:
+        property_data = await db[ARCHIVE_COLLECTION].find_one({"id": property_id}, projection)
     if not property_data:
         raise HTTPException(status_code=404, detail="Property not found")
-    return Property(**property_data)
+    if selected is None:
+        body = render_json(trusted_dump(Property, property_data))
+    else:
+        body = render_json(trim(property_data, selected))
+    headers = etag_headers(body, version=property_data.get("version") or INITIAL_VERSION)
+    property_cache.set(key, (body, headers), version)
+    return conditional_json_response(body, headers, if_none_match)
 
-@api_router.put("/properties/{property_id}", response_model=Property)
-async def update_property(property_id: str, property_data: PropertyUpdate):
-    existing_property = await db.properties.find_one({"id": property_id})
-    if not existing_property:
+@api_router.get(
+    "/properties/{property_id}/similar",
+    response_model=Union[List[PropertySimilarResult], List[PropertySummary]],
+    response_class=ORJSONResponse,
+)
+async def get_similar_properties(
+    property_id: str,
+    k: int = Query(10, ge=1, le=100),
+    status: str = "active",
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    # k nearest listings by price, size, rooms, age, lot, type and amenities; the source listing may be archived
+    index = similar_listings.index
+    if not index.ready:
+        raise HTTPException(status_code=503, detail="Similarity index is still loading", headers={"Retry-After": "5"})
+    if not index.covers(status):
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(sorted(index.statuses))}")
+    key = cache_key("similar", id=property_id, k=k, status=status, fields=fields)
+    cached = property_cache.get(key)
+    if cached is not None:
+        return conditional_json_response(*cached, if_none_match)
+    version = properties_version.value
+
+    full_dump = lambda doc: trusted_dump(Property, doc)
+    source = (await fetch_by_ids(
+        db.properties, [property_id], {"_id": 0}, full_dump, cache=property_doc_cache,
+        fallback=db[ARCHIVE_COLLECTION],
+    ))[property_id]
+    if source is None:
         raise HTTPException(status_code=404, detail="Property not found")
+    neighbours = index.neighbours(source, k, status=status)
+
+    selected = _selected_fields(fields)
+    projection = to_projection(selected) if selected else {"_id": 0}
+    dump = full_dump if selected is None else (lambda doc: trim(doc, selected))
+    found = await fetch_by_ids(
+        db.properties, [doc_id for doc_id, _ in neighbours], projection, dump, cache=property_doc_cache, fields=fields
+    )
+    body = render_json([
+        {**found[doc_id], "similarity_distance": distance}
+        for doc_id, distance in neighbours if found[doc_id] is not None
+    ])
+    headers = etag_headers(body)
+    property_cache.set(key, (body, headers), version)
+    return conditional_json_response(body, headers, if_none_match)
 
-    update_data = {k: v for k, v in property_data.dict().items() if v is not None}
+@api_router.put("/properties/{property_id}", response_model=Property, response_class=ORJSONResponse)
+async def update_property(
+    property_id: str,
+    property_data: PropertyUpdate,
+    if_match: Optional[str] = Header(None)
+):
+    update_data = _update_fields(property_data)
     update_data["updated_at"] = datetime.utcnow()
 
-    await db.properties.update_one({"id": property_id}, {"$set": update_data})
-    updated_property = await db.properties.find_one({"id": property_id})
-    return Property(**updated_property)
+    # Optional optimistic concurrency: only apply on top of the version the client read
+    query = {"id": property_id}
+    try:
+        expected_version = parse_if_match(if_match)
+    except ValueError as e:
+        raise HTTPException(status_code=412, detail=str(e))
+    if expected_version is not None:
+        query["version"] = version_filter(expected_version)
+
+    # Atomic find-and-modify returning the post-image
+    update = versioned_update(update_data, _derived_updates(update_data))
+    updated_property = await db.properties.find_one_and_update(
+        query, update, projection={"_id": 0}, return_document=ReturnDocument.AFTER
+    )
+    if not updated_property and await restore_listing(db.properties, db[ARCHIVE_COLLECTION], property_id):
+        # Editing an archived listing (e.g. relisting it) brings it back into the hot collection
+        updated_property = await db.properties.find_one_and_update(
+            query, update, projection={"_id": 0}, return_document=ReturnDocument.AFTER
+        )
+    if not updated_property:
+        if expected_version is not None and await db.properties.count_documents({"id": property_id}, limit=1):
+            raise HTTPException(status_code=412, detail="Property was modified by another request")
+        raise HTTPException(status_code=404, detail="Property not found")
+
+    property_changes.publish(ChangeEvent("update", property_id, updated_property))
+    body = render_json(trusted_dump(Property, updated_property))
+    return cached_json_response(body, etag_headers(body, version=updated_property.get("version")))
 
 @api_router.delete("/properties/{property_id}")
 async def delete_property(property_id: str):
     result = await db.properties.delete_one({"id": property_id})
+    if result.deleted_count == 0:
+        result = await db[ARCHIVE_COLLECTION].delete_one({"id": property_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Property not found")
+    property_changes.publish(ChangeEvent("delete", property_id))
     return {"message": "Property deleted successfully"}
 
 @api_router.post("/seed-properties")
@@ -432,10 +1274,12 @@ async def seed_properties():
 
     properties = []
     for prop_data in sample_properties:
-        property_obj = Property(**prop_data)
-        properties.append(property_obj.dict())
+        property_obj = Property(**_with_geo(prop_data))
+        properties.append(_keyed(property_obj.dict()))
 
     result = await db.properties.insert_many(properties)
+    for prop in properties:
+        property_changes.publish(ChangeEvent("insert", prop["id"], prop))
     return {"message": f"Successfully seeded {len(result.inserted_ids)} properties"}
 
 # Include router
@@ -447,6 +1291,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Next-Offset", "ETag"],
 )
 
 # Logging config
@@ -462,6 +1307,42 @@ async def startup_event():
     global search_agent, chat_agent, real_estate_agent
     logger.info("Starting AI Agents API...")
 
+    # Indexes for the router's query shapes
+    await ensure_indexes(db)
+    retention = await ensure_status_check_ttl(db.status_checks, status_check_ttl)
+    if retention:
+        logger.info(f"Status check retention index {retention} ({status_check_ttl or 'no'} seconds)")
+    tagged = await backfill_amenity_tags(db.properties)
+    if tagged:
+        logger.info(f"Backfilled amenity tags on {tagged} properties")
+    priced = await backfill_price_per_sqft(db.properties)
+    if priced:
+        logger.info(f"Backfilled price_per_sqft on {priced} properties")
+    collscans = await find_collscans(db)
+    if collscans:
+        logger.warning(f"Query shapes without index support: {', '.join(collscans)}")
+
+    # Hear about writes made by other replicas
+    property_watcher.start()
+
+    if status_write_mode == 'buffered':
+        status_writer.start()
+
+    # Inventory statistics and the similarity index load in the background and then follow change events
+    inventory_stats.start()
+    similar_listings.start()
+
+    # Build the in-memory search index in the background; $text serves until it is ready
+    if search_backend == 'memory':
+        property_search_index.start()
+
+    if archive_after_days:
+        listing_archiver.start()
+
+    # Columnar snapshot loads in the background; Mongo serves listing filters until it is ready
+    if filter_backend == 'memory':
+        property_snapshot.start()
+
     # Lazy agent init for faster startup
     logger.info("AI Agents API ready!")
 
@@ -479,5 +1360,13 @@ async def shutdown_db_client():
         # MCP cleanup automatic
         pass
 
+    await property_watcher.stop()
+    await property_search_index.stop()
+    await inventory_stats.stop()
+    await similar_listings.stop()
+    await listing_archiver.stop()
+    await property_snapshot.stop()
+    # Queued status checks are written before the client closes
+    await status_writer.stop()
     client.close()
     logger.info("AI Agents API shutdown complete.")
@@ -0,0 +1,481 @@
+# Shared test fakes: an in-memory stand-in for the Motor collections and database the backend uses
+
+import asyncio
+import copy
+import math
+import sys
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from bson import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+# A field that isn't in the document, as opposed to one stored as null
+_MISSING = object()
+
+_TYPES = {
+    "string": str, "int": int, "double": float, "object": dict, "array": list, "date": datetime, "objectId": ObjectId,
+}
+_EARTH_RADIUS_METERS = 6378100.0
+
+
+def _get(doc, path):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _order(value):
+    # Mongo orders null and missing before any value
+    return (0, 0) if value is None or value is _MISSING else (1, value)
+
+
+def _equal(value, operand):
+    if operand is None:
+        return value is None or value is _MISSING
+    return value is not _MISSING and value == operand
+
+
+def _candidates(value):
+    # A condition on an array field matches the array itself or any element
+    return [value, *value] if isinstance(value, list) else [value]
+
+
+def _compare(op, value, operand):
+    # Range operators never match null or missing fields, nor values of another type
+    if value is None or value is _MISSING:
+        return False
+    try:
+        if op == "$gt":
+            return value > operand
+        if op == "$gte":
+            return value >= operand
+        if op == "$lt":
+            return value < operand
+        return value <= operand
+    except TypeError:
+        return False
+
+
+def _point(value):
+    if isinstance(value, dict) and value.get("type") == "Point":
+        return value["coordinates"]
+    return None
+
+
+def _within(value, operand):
+    # $geoWithin a $geometry polygon, treated as the ring's bounding box (what within_bbox builds)
+    point = _point(value)
+    if point is None:
+        return False
+    ring = operand["$geometry"]["coordinates"][0]
+    lngs, lats = [corner[0] for corner in ring], [corner[1] for corner in ring]
+    return min(lngs) <= point[0] <= max(lngs) and min(lats) <= point[1] <= max(lats)
+
+
+def _meters(a, b):
+    lng1, lat1, lng2, lat2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * _EARTH_RADIUS_METERS * math.asin(math.sqrt(h))
+
+
+def _condition(value, condition):
+    if not (isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition)):
+        return any(_equal(candidate, condition) for candidate in _candidates(value))
+    for op, operand in condition.items():
+        if op == "$eq":
+            ok = any(_equal(candidate, operand) for candidate in _candidates(value))
+        elif op == "$ne":
+            ok = not any(_equal(candidate, operand) for candidate in _candidates(value))
+        elif op == "$in":
+            ok = any(_equal(candidate, item) for candidate in _candidates(value) for item in operand)
+        elif op == "$nin":
+            ok = not any(_equal(candidate, item) for candidate in _candidates(value) for item in operand)
+        elif op == "$all":
+            ok = isinstance(value, list) and all(item in value for item in operand)
+        elif op == "$exists":
+            ok = (value is not _MISSING) == bool(operand)
+        elif op == "$type":
+            ok = value is not _MISSING and isinstance(value, _TYPES[operand])
+        elif op == "$not":
+            ok = not _condition(value, operand)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            ok = any(_compare(op, candidate, operand) for candidate in _candidates(value))
+        elif op == "$geoWithin":
+            ok = _within(value, operand)
+        else:
+            raise NotImplementedError(f"StubCollection does not support {op}")
+        if not ok:
+            return False
+    return True
+
+
+def matches(doc, query):
+    for name, condition in (query or {}).items():
+        if name == "$and":
+            ok = all(matches(doc, clause) for clause in condition)
+        elif name == "$or":
+            ok = any(matches(doc, clause) for clause in condition)
+        elif name == "$nor":
+            ok = not any(matches(doc, clause) for clause in condition)
+        elif name.startswith("$"):
+            raise NotImplementedError(f"StubCollection does not support {name}")
+        else:
+            ok = _condition(_get(doc, name), condition)
+        if not ok:
+            return False
+    return True
+
+
+def _project(doc, projection):
+    if not projection:
+        return copy.deepcopy(doc)
+    included = [name for name, flag in projection.items() if name != "_id" and flag and not isinstance(flag, dict)]
+    if included:
+        projected = {name: copy.deepcopy(doc[name]) for name in included if name in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            projected["_id"] = doc["_id"]
+        return projected
+    return {name: copy.deepcopy(value) for name, value in doc.items() if projection.get(name, 1)}
+
+
+def _sort(docs, spec):
+    for name, direction in reversed(spec):
+        docs.sort(key=lambda doc: _order(_get(doc, name)), reverse=direction < 0)
+    return docs
+
+
+def _evaluate(expression, doc):
+    # The aggregation expressions used in pipeline updates
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = _get(doc, expression[1:])
+        return None if value is _MISSING else value
+    if isinstance(expression, list):
+        return [_evaluate(item, doc) for item in expression]
+    if not isinstance(expression, dict):
+        return expression
+    if len(expression) != 1 or not next(iter(expression)).startswith("$"):
+        return {name: _evaluate(value, doc) for name, value in expression.items()}
+    op, args = next(iter(expression.items()))
+    if op == "$literal":
+        return copy.deepcopy(args)
+    if op == "$cond":
+        condition, then, otherwise = args
+        return _evaluate(then if _evaluate(condition, doc) else otherwise, doc)
+    values = [_evaluate(arg, doc) for arg in (args if isinstance(args, list) else [args])]
+    if op == "$ifNull":
+        return next((value for value in values if value is not None), None)
+    if op in ("$gt", "$gte", "$lt", "$lte", "$eq", "$ne"):
+        left, right = _order(values[0]), _order(values[1])
+        return {
+            "$gt": left > right, "$gte": left >= right, "$lt": left < right,
+            "$lte": left <= right, "$eq": left == right, "$ne": left != right,
+        }[op]
+    if op == "$and":
+        return all(values)
+    if op == "$or":
+        return any(values)
+    if any(value is None for value in values):
+        return None
+    if op == "$add":
+        return sum(values)
+    if op == "$subtract":
+        return values[0] - values[1]
+    if op == "$multiply":
+        return math.prod(values)
+    if op == "$divide":
+        return values[0] / values[1]
+    if op == "$round":
+        return round(values[0], values[1] if len(values) > 1 else 0)
+    raise NotImplementedError(f"StubCollection does not support {op}")
+
+
+def _apply(doc, update):
+    # Operator updates ($set/$unset/$inc) or a pipeline of $set stages
+    if isinstance(update, list):
+        for stage in update:
+            (op, fields), = stage.items()
+            if op not in ("$set", "$addFields"):
+                raise NotImplementedError(f"StubCollection does not support pipeline stage {op}")
+            values = {name: _evaluate(expression, doc) for name, expression in fields.items()}
+            doc.update(values)
+        return
+    for op, fields in update.items():
+        for name, value in fields.items():
+            if op == "$set":
+                doc[name] = copy.deepcopy(value)
+            elif op == "$unset":
+                doc.pop(name, None)
+            elif op == "$inc":
+                doc[name] = doc.get(name, 0) + value
+            elif op != "$setOnInsert":
+                raise NotImplementedError(f"StubCollection does not support {op}")
+
+
+class StubCursor:
+    # find() / aggregate() result: sort, skip and limit apply lazily, like a Motor cursor
+    def __init__(self, docs, projection=None, collection=None):
+        self.docs = docs
+        self.projection = projection
+        self.collection = collection
+        self._sort = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key, direction=None):
+        self._sort = [(key, direction or 1)] if isinstance(key, str) else list(key)
+        return self
+
+    def skip(self, n):
+        self._skip = n
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def batch_size(self, n):
+        if self.collection is not None:
+            self.collection.batch_sizes.append(n)
+        return self
+
+    def results(self):
+        docs = _sort(list(self.docs), self._sort)[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return [_project(doc, self.projection) for doc in docs]
+
+    async def to_list(self, length=None):
+        docs = self.results()
+        return docs if length is None else docs[:length]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.results():
+            # Give other tasks a turn between documents, as batches arriving from the server would
+            await asyncio.sleep(0)
+            yield doc
+
+
+class StubCollection:
+    # In-memory collection; documents get an ObjectId _id on insert, like the server assigns.
+    # `queries` records every find() filter, `batch_sizes` its cursor's batch size and `bulk_writes`
+    # every bulk_write() request list.
+    def __init__(self, docs=(), name="properties", database=None):
+        self.name = name
+        self.database = database
+        self.docs = []
+        self.queries = []
+        self.batch_sizes = []
+        self.bulk_writes = []
+        self.indexes = {"_id_": {"key": [("_id", 1)]}}
+        for doc in docs:
+            self._insert(doc)
+
+    def _insert(self, doc):
+        doc.setdefault("_id", ObjectId())
+        if any(existing["_id"] == doc["_id"] for existing in self.docs):
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} dup key: {doc['_id']}")
+        self.docs.append(copy.deepcopy(doc))
+        return doc["_id"]
+
+    def _matching(self, query):
+        return [doc for doc in self.docs if matches(doc, query)]
+
+    def ids(self):
+        return {doc["id"] for doc in self.docs}
+
+    def find(self, query=None, projection=None, **options):
+        self.queries.append(query)
+        return StubCursor(self._matching(query), projection, self)
+
+    async def find_one(self, query=None, projection=None, **options):
+        docs = await self.find(query, projection).limit(1).to_list(1)
+        return docs[0] if docs else None
+
+    async def count_documents(self, query, limit=0, **options):
+        count = len(self._matching(query))
+        return min(count, limit) if limit else count
+
+    async def estimated_document_count(self):
+        return len(self.docs)
+
+    async def distinct(self, field, query=None):
+        values = []
+        for doc in self._matching(query):
+            value = _get(doc, field)
+            if value is not _MISSING and value not in values:
+                values.append(value)
+        return values
+
+    async def insert_one(self, doc):
+        return SimpleNamespace(inserted_id=self._insert(doc))
+
+    async def insert_many(self, docs, ordered=True):
+        return SimpleNamespace(inserted_ids=[self._insert(doc) for doc in docs])
+
+    def _replace(self, query, replacement, upsert):
+        for i, doc in enumerate(self.docs):
+            if matches(doc, query):
+                # The _id is immutable: a replacement keeps the stored one
+                self.docs[i] = {**copy.deepcopy(replacement), "_id": doc.get("_id", replacement.get("_id"))}
+                return SimpleNamespace(matched_count=1, modified_count=int(doc != self.docs[i]), upserted_id=None)
+        if not upsert:
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+        replacement = copy.deepcopy(replacement)
+        if "_id" not in replacement and "_id" in (query or {}):
+            replacement["_id"] = query["_id"]
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=self._insert(replacement))
+
+    def _update(self, query, update, upsert, many):
+        matched = modified = 0
+        for doc in self._matching(query):
+            before = copy.deepcopy(doc)
+            _apply(doc, update)
+            matched += 1
+            modified += int(doc != before)
+            if not many:
+                break
+        upserted_id = None
+        if not matched and upsert:
+            doc = {name: value for name, value in (query or {}).items() if not name.startswith("$")}
+            _apply(doc, update)
+            if isinstance(update, dict):
+                doc.update(copy.deepcopy(update.get("$setOnInsert", {})))
+            upserted_id = self._insert(doc)
+        return SimpleNamespace(matched_count=matched, modified_count=modified, upserted_id=upserted_id)
+
+    async def replace_one(self, query, replacement, upsert=False):
+        return self._replace(query, replacement, upsert)
+
+    async def update_one(self, query, update, upsert=False):
+        return self._update(query, update, upsert, many=False)
+
+    async def update_many(self, query, update, upsert=False):
+        return self._update(query, update, upsert, many=True)
+
+    async def find_one_and_update(
+        self, query, update, projection=None, return_document=ReturnDocument.BEFORE, upsert=False, **options
+    ):
+        docs = self._matching(query)
+        if not docs:
+            return None
+        before = _project(docs[0], projection)
+        _apply(docs[0], update)
+        return _project(docs[0], projection) if return_document == ReturnDocument.AFTER else before
+
+    async def delete_one(self, query):
+        docs = self._matching(query)[:1]
+        self.docs = [doc for doc in self.docs if all(doc is not gone for gone in docs)]
+        return SimpleNamespace(deleted_count=len(docs))
+
+    async def delete_many(self, query):
+        docs = self._matching(query)
+        self.docs = [doc for doc in self.docs if all(doc is not gone for gone in docs)]
+        return SimpleNamespace(deleted_count=len(docs))
+
+    async def bulk_write(self, requests, ordered=True):
+        self.bulk_writes.append(list(requests))
+        totals = {"inserted_count": 0, "matched_count": 0, "modified_count": 0, "deleted_count": 0, "upserted_count": 0}
+        for request in requests:
+            if isinstance(request, InsertOne):
+                self._insert(request._doc)
+                totals["inserted_count"] += 1
+                continue
+            if isinstance(request, (DeleteOne, DeleteMany)):
+                delete = self.delete_one if isinstance(request, DeleteOne) else self.delete_many
+                totals["deleted_count"] += (await delete(request._filter)).deleted_count
+                continue
+            if isinstance(request, ReplaceOne):
+                result = self._replace(request._filter, request._doc, request._upsert)
+            elif isinstance(request, (UpdateOne, UpdateMany)):
+                result = self._update(request._filter, request._doc, request._upsert, isinstance(request, UpdateMany))
+            else:
+                raise NotImplementedError(f"StubCollection does not support {type(request).__name__}")
+            totals["matched_count"] += result.matched_count
+            totals["modified_count"] += result.modified_count
+            totals["upserted_count"] += int(result.upserted_id is not None)
+        return SimpleNamespace(**totals)
+
+    def aggregate(self, pipeline):
+        # $geoNear plus the plain stages that follow it; no $group or $facet
+        docs, projection = list(self.docs), None
+        for stage in pipeline:
+            (op, spec), = stage.items()
+            if op == "$geoNear":
+                origin = spec["near"]["coordinates"]
+                near = []
+                for doc in docs:
+                    point = _point(_get(doc, spec["key"]))
+                    if point is None or not matches(doc, spec.get("query")):
+                        continue
+                    distance = _meters(origin, point)
+                    if spec.get("maxDistance") is None or distance <= spec["maxDistance"]:
+                        near.append({**doc, spec["distanceField"]: distance})
+                docs = sorted(near, key=lambda doc: doc[spec["distanceField"]])
+            elif op == "$match":
+                docs = [doc for doc in docs if matches(doc, spec)]
+            elif op == "$sort":
+                docs = _sort(docs, list(spec.items()))
+            elif op == "$skip":
+                docs = docs[spec:]
+            elif op == "$limit":
+                docs = docs[:spec]
+            elif op == "$project":
+                projection = spec
+            elif op == "$unionWith":
+                other = self.database[spec["coll"]]
+                docs += [doc for doc in other.docs if all(matches(doc, s["$match"]) for s in spec["pipeline"])]
+            else:
+                raise NotImplementedError(f"StubCollection does not support {op}")
+        return StubCursor(docs, projection)
+
+    async def create_indexes(self, models):
+        names = []
+        for model in models:
+            document = dict(model.document)
+            names.append(document.pop("name"))
+            self.indexes[names[-1]] = {"key": list(document.pop("key").items()), **document}
+        return names
+
+    async def create_index(self, keys, name, **options):
+        self.indexes[name] = {"key": keys, **options}
+        return name
+
+    async def drop_index(self, name):
+        del self.indexes[name]
+
+    async def index_information(self):
+        return copy.deepcopy(self.indexes)
+
+
+class StubDatabase:
+    # Collections are created on first access, by attribute or item; `commands` records command()
+    def __init__(self):
+        self.collections = {}
+        self.commands = []
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = StubCollection(name=name, database=self)
+        return self.collections[name]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, name, target, **options):
+        self.commands.append((name, target, options))
+        return {"ok": 1}
@@ -0,0 +1,51 @@
+# Amenity tag normalization and filter tests
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.amenities import amenity_filter, amenity_tags, backfill_amenity_tags, normalize_amenity, parse_amenities
+from tests.conftest import StubCollection
+
+
+def test_normalize_folds_case_punctuation_and_aliases():
+    assert normalize_amenity("  Wine-Cellar ") == "wine cellar"
+    assert normalize_amenity("Swimming Pool") == "pool"
+    assert normalize_amenity("Fitness Center") == "gym"
+
+
+def test_tags_are_sorted_and_unique():
+    assert amenity_tags(["Pool", "Gym", "swimming pool", "", "  "]) == ["gym", "pool"]
+    assert amenity_tags(None) == []
+
+
+def test_parse_amenities_param():
+    assert parse_amenities("Pool, Gym") == ["gym", "pool"]
+    assert parse_amenities(" , ") is None
+    assert parse_amenities(None) is None
+
+
+def test_amenity_filter_any_all():
+    assert amenity_filter({"status": "active"}, None, None) == {"status": "active"}
+    assert amenity_filter({}, ["gym", "pool"], None) == {"amenity_tags": {"$all": ["gym", "pool"]}}
+    assert amenity_filter({}, None, ["spa"]) == {"amenity_tags": {"$in": ["spa"]}}
+    assert amenity_filter({}, ["pool"], ["spa", "gym"]) == {"amenity_tags": {"$all": ["pool"], "$in": ["spa", "gym"]}}
+
+
+def test_backfill_tags_untagged_documents_in_batches():
+    collection = StubCollection([
+        {"id": "a", "amenities": ["Pool"]},
+        {"id": "b", "amenities": ["Gym"], "amenity_tags": ["gym"]},
+        {"id": "c"},
+        {"id": "d", "amenities": ["Fitness Center"]},
+    ])
+    assert asyncio.run(backfill_amenity_tags(collection, batch_size=2)) == 3
+    assert [len(batch) for batch in collection.bulk_writes] == [2, 1]
+    first = collection.bulk_writes[0][0]
+    assert first._filter == {"id": "a"} and first._doc == {"$set": {"amenity_tags": ["pool"]}}
+    tags = {doc["id"]: doc["amenity_tags"] for doc in collection.docs}
+    assert tags == {"a": ["pool"], "b": ["gym"], "c": [], "d": ["gym"]}
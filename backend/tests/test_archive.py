@@ -0,0 +1,112 @@
+# Hot/cold listing archival tests
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from pymongo import DESCENDING
+
+from realty.archive import (
+    ListingArchiver,
+    archive_listings,
+    is_archived_status,
+    merge_pages,
+    merge_ranked,
+    restore_listing,
+)
+from realty.invalidation import ChangeWatcher, InvalidationBus
+from realty.pagination import KeysetSort
+from tests.conftest import StubCollection
+
+NOW = datetime(2024, 6, 1)
+
+
+class RelistingCollection(StubCollection):
+    # Relists one listing between the copy step and the delete, like a concurrent write
+    def __init__(self, docs, relist):
+        super().__init__(docs)
+        self.relist = relist
+
+    async def delete_many(self, query):
+        for doc in self.docs:
+            if doc["id"] == self.relist:
+                doc.update(status="active", updated_at=NOW)
+        self.relist = None
+        return await super().delete_many(query)
+
+
+def listing(id, status, days_old, created_at=None):
+    return {"id": id, "status": status, "updated_at": NOW - timedelta(days=days_old), "created_at": created_at}
+
+
+def test_only_old_listings_outside_active_and_pending_move():
+    hot = StubCollection([
+        listing("a", "sold", 200),
+        listing("b", "sold", 10),
+        listing("c", "active", 400),
+        listing("d", "pending", 400),
+        listing("e", "withdrawn", 120),
+    ])
+    cold = StubCollection()
+    moved = asyncio.run(archive_listings(hot, cold, NOW - timedelta(days=90), batch_size=1))
+    assert moved == 2
+    assert hot.ids() == {"b", "c", "d"}
+    assert cold.ids() == {"a", "e"}
+
+
+def test_listing_relisted_mid_move_stays_hot_without_archive_copy():
+    hot = RelistingCollection([listing("a", "sold", 200), listing("b", "sold", 200)], relist="a")
+    cold = StubCollection()
+    moved = asyncio.run(archive_listings(hot, cold, NOW - timedelta(days=90)))
+    assert moved == 1
+    assert hot.ids() == {"a"} and cold.ids() == {"b"}
+
+
+def test_restore_moves_a_listing_back():
+    hot, cold = StubCollection(), StubCollection([listing("a", "sold", 200)])
+    assert asyncio.run(restore_listing(hot, cold, "a"))
+    assert hot.ids() == {"a"} and not cold.docs
+    assert not asyncio.run(restore_listing(hot, cold, "missing"))
+
+
+def test_archive_round_trip_keeps_the_id_key_deletes_are_resolved_by():
+    hot, cold = StubCollection([{**listing("a", "sold", 200), "_id": "a"}]), StubCollection()
+    asyncio.run(archive_listings(hot, cold, NOW - timedelta(days=90)))
+    assert [doc["_id"] for doc in cold.docs] == ["a"]
+    assert asyncio.run(restore_listing(hot, cold, "a"))
+
+    # A change-stream delete of the restored listing carries only its _id
+    [restored] = hot.docs
+    watcher = ChangeWatcher(hot, InvalidationBus())
+    assert watcher.change_event({"operationType": "delete", "documentKey": {"_id": restored["_id"]}}).id == "a"
+
+
+def test_merge_pages_orders_like_mongo_and_prefers_hot_copy():
+    keyset = KeysetSort("created_at", DESCENDING)
+    hot = [{"id": "h2", "created_at": 5}, {"id": "dup", "created_at": 3, "src": "hot"}, {"id": "h1", "created_at": None}]
+    cold = [{"id": "c1", "created_at": 4}, {"id": "dup", "created_at": 3, "src": "cold"}, {"id": "c0", "created_at": None}]
+    merged = merge_pages(hot, cold, keyset, limit=4)
+    assert [doc["id"] for doc in merged] == ["h2", "c1", "dup", "h1"]
+    assert merged[2]["src"] == "hot"
+
+
+def test_merge_ranked_orders_by_score_then_id_and_prefers_hot_copy():
+    hot = [{"id": "h", "score": 2.0}, {"id": "dup", "score": 1.5, "src": "hot"}]
+    cold = [{"id": "c", "score": 2.0}, {"id": "dup", "score": 1.5, "src": "cold"}, {"id": "low", "score": 0.1}]
+    merged = merge_ranked(hot, cold, limit=3)
+    assert [doc["id"] for doc in merged] == ["c", "h", "dup"] and merged[2]["src"] == "hot"
+
+
+def test_archiver_reports_moves():
+    hot = StubCollection([{**listing("a", "sold", 0), "updated_at": datetime.utcnow() - timedelta(days=5)}])
+    resets = []
+    archiver = ListingArchiver(hot, StubCollection(), after_days=90, on_archive=resets.append)
+    assert asyncio.run(archiver.run_once()) == 0 and resets == []
+    assert asyncio.run(archiver.run_once(after_days=1)) == 1
+    assert resets == [1] and archiver.stats()["archived"] == 1 and archiver.stats()["runs"] == 2
+    assert is_archived_status("sold") and not is_archived_status("active") and not is_archived_status(None)
@@ -0,0 +1,57 @@
+# Batch get-by-ids tests
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.batch import fetch_by_ids, ordered_results
+from realty.cache import CollectionVersion, VersionedLRUCache
+from tests.conftest import StubCollection
+
+
+def dump(doc):
+    return {"id": doc["id"], "title": doc["title"]}
+
+
+def test_one_in_query_and_request_order_with_markers():
+    collection = StubCollection([{"id": "a", "title": "A"}, {"id": "b", "title": "B"}])
+    found = asyncio.run(fetch_by_ids(collection, ["b", "x", "a", "b"], None, dump))
+    assert collection.queries == [{"id": {"$in": ["b", "x", "a"]}}]
+
+    body = ordered_results(["b", "x", "a", "b"], found)
+    assert [r["id"] for r in body["results"]] == ["b", "x", "a", "b"]
+    assert body["results"][1] == {"id": "x", "found": False, "property": None}
+    assert body["results"][2]["property"] == {"id": "a", "title": "A"}
+    assert body["not_found"] == ["x"]
+
+
+def test_cached_documents_skip_the_query_until_a_write():
+    collection = StubCollection([{"id": "a", "title": "A"}, {"id": "b", "title": "B"}])
+    version = CollectionVersion("properties")
+    cache = VersionedLRUCache(version)
+
+    asyncio.run(fetch_by_ids(collection, ["a"], None, dump, cache=cache))
+    asyncio.run(fetch_by_ids(collection, ["a", "b"], None, dump, cache=cache))
+    assert collection.queries[-1] == {"id": {"$in": ["b"]}}
+
+    asyncio.run(fetch_by_ids(collection, ["a", "b"], None, dump, cache=cache))
+    assert len(collection.queries) == 2
+
+    version.bump()
+    asyncio.run(fetch_by_ids(collection, ["a", "b"], None, dump, cache=cache))
+    assert collection.queries[-1] == {"id": {"$in": ["a", "b"]}}
+
+
+def test_misses_fall_back_to_the_archive_once():
+    hot = StubCollection([{"id": "a", "title": "A"}])
+    archive = StubCollection([{"id": "z", "title": "Z"}])
+    found = asyncio.run(fetch_by_ids(hot, ["a", "z", "x"], None, dump, fallback=archive))
+    assert archive.queries == [{"id": {"$in": ["z", "x"]}}]
+    assert found["z"] == {"id": "z", "title": "Z"} and found["x"] is None
+
+    asyncio.run(fetch_by_ids(hot, ["a"], None, dump, fallback=archive))
+    assert len(archive.queries) == 1
@@ -0,0 +1,120 @@
+# In-memory BM25 index tests
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.bm25 import BM25Index, BM25Maintainer, tokenize
+from realty.invalidation import ChangeEvent
+from tests.conftest import StubCollection
+
+
+def listing(id, title, description="", status="active", price=500_000, bedrooms=3, **extra):
+    return {
+        "id": id, "title": title, "description": description, "location": "Austin, TX",
+        "amenities": [], "status": status, "property_type": "house", "price": price, "bedrooms": bedrooms, **extra,
+    }
+
+
+def make_index():
+    index = BM25Index()
+    index.load([
+        listing("a", "Wine cellar estate", "Stone wine cellar and pool", price=2_000_000, bedrooms=5),
+        listing("b", "Pool house", "Backyard pool", price=600_000),
+        listing("c", "Downtown loft", "Walk to wine bars", price=400_000, bedrooms=1),
+        listing("d", "Sold cellar home", "Cellar", status="sold"),
+    ])
+    return index
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("The Wine-Cellar, with a VIEW!") == ["wine", "cellar", "view"]
+
+
+def test_ranking_prefers_title_and_repeated_terms():
+    index = make_index()
+    ids = [doc_id for doc_id, _ in index.search("wine cellar", status="active", prefix=False)]
+    assert ids == ["a", "c"]
+
+
+def test_prefix_expansion_on_last_token():
+    index = make_index()
+    assert [doc_id for doc_id, _ in index.search("cell", status="active")] == ["a"]
+    assert index.search("cell", status="active", prefix=False) == []
+    assert {doc_id for doc_id, _ in index.search("wi* pool", prefix=False)} == {"a", "b", "c"}
+
+
+def test_filters_intersect_matches():
+    index = make_index()
+    assert {d for d, _ in index.search("cellar")} == {"a", "d"}
+    assert [d for d, _ in index.search("cellar", status="sold")] == ["d"]
+    assert [d for d, _ in index.search("wine", max_price=1_000_000)] == ["c"]
+    assert [d for d, _ in index.search("pool", bedrooms=5)] == ["a"]
+    assert index.search("pool", status="pending") == []
+
+
+def test_limit_and_offset_page_through_ranking():
+    index = make_index()
+    everything = index.search("wine pool", limit=10)
+    assert index.search("wine pool", limit=1, offset=1) == everything[1:2]
+
+
+def test_upsert_replaces_and_remove_drops():
+    index = make_index()
+    index.upsert(listing("b", "Lake cabin", "Dock"))
+    assert [d for d, _ in index.search("pool")] == ["a"]
+    assert [d for d, _ in index.search("lake")] == ["b"]
+
+    assert index.remove("a")
+    assert not index.remove("a")
+    assert index.search("pool") == []
+    assert len(index) == 3
+
+
+def test_compaction_keeps_results():
+    index = BM25Index()
+    index.load(listing(f"p{i}", f"home {i}", "pool" if i % 2 else "garden") for i in range(3000))
+    for i in range(1600):
+        index.remove(f"p{i}")
+    stats = index.stats()
+    # Compacted once tombstones passed half the slots
+    assert stats["documents"] == 1400 and stats["slots"] < 1600
+    results = index.search("pool", limit=2000)
+    assert len(results) == 700 and all(int(d[1:]) >= 1600 for d, _ in results)
+
+
+def test_maintainer_replays_events_that_arrive_mid_load():
+    collection = StubCollection([listing("a", "Pool house"), listing("b", "Garden flat")])
+    maintainer = BM25Maintainer(collection)
+
+    async def run():
+        loading = asyncio.create_task(maintainer.reload())
+        await asyncio.sleep(0)
+        maintainer.handle(ChangeEvent("delete", "a"))
+        maintainer.handle(ChangeEvent("insert", "c", listing("c", "Pool villa")))
+        await loading
+
+    asyncio.run(run())
+    assert maintainer.index.ready
+    assert [d for d, _ in maintainer.index.search("pool")] == ["c"]
+    assert maintainer.stats()["reloads"] == 1
+
+
+def test_maintainer_reloads_on_reset():
+    collection = StubCollection([listing("a", "Pool house")])
+    maintainer = BM25Maintainer(collection)
+
+    async def run():
+        await maintainer.reload()
+        collection.docs.append(listing("b", "Pool cottage"))
+        maintainer.handle(ChangeEvent("reset"))
+        maintainer.handle(ChangeEvent("reset"))
+        await maintainer._task
+
+    asyncio.run(run())
+    assert {d for d, _ in maintainer.index.search("pool")} == {"a", "b"}
+    assert maintainer.reloads == 2
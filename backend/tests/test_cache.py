@@ -0,0 +1,69 @@
+# Versioned LRU cache tests
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.cache import CollectionVersion, VersionedLRUCache, cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(**kwargs):
+    clock = FakeClock()
+    return VersionedLRUCache(CollectionVersion("properties"), clock=clock, **kwargs), clock
+
+
+def test_cache_key_is_canonical():
+    a = cache_key("list", status="active", property_type=None, min_price=100)
+    b = cache_key("list", min_price=100, status="active")
+    assert a == b
+    assert a != cache_key("detail", min_price=100, status="active")
+
+
+def test_hit_miss_and_lru_eviction():
+    cache, _ = make_cache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 1, 1)
+
+
+def test_ttl_expiry():
+    cache, clock = make_cache(ttl=10)
+    cache.set("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_version_bump_invalidates_entries():
+    cache, _ = make_cache()
+    cache.set("a", 1)
+    cache.invalidate()
+    assert cache.get("a") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_set_with_stale_read_version_is_dropped():
+    # A write landed between reading the version and storing the result
+    cache, _ = make_cache()
+    version = cache.version.value
+    cache.invalidate()
+    cache.set("a", 1, version)
+    assert cache.get("a") is None
@@ -0,0 +1,105 @@
+# Columnar inventory snapshot tests
+
+import asyncio
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.columnar import ColumnarInventory, ColumnarMaintainer
+from realty.invalidation import ChangeEvent
+from realty.sorting import PROPERTY_SORTS
+from tests.conftest import StubCollection
+
+
+def make_listings(n, seed=5):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"p{rng.randint(0, 9999):04d}-{i}",
+            "status": rng.choice(["active", "pending", "sold"]),
+            "property_type": rng.choice(["house", "condo"]),
+            "price": rng.choice([None, rng.randint(1, 20) * 100_000]),
+            "bedrooms": rng.choice([None, 1, 2, 3]),
+            "sqft": rng.choice([None, 1500, 2000]),
+            "year_built": rng.choice([None, 1990, 2000]),
+            "price_per_sqft": rng.choice([None, 100.5, 200.25]),
+            "created_at": datetime(2024, 1, 1) + timedelta(seconds=rng.randint(0, 30)),
+        }
+        for i in range(n)
+    ]
+
+
+def expected(listings, sort, status, property_type=None, min_price=None, bedrooms=None):
+    # Mongo semantics: nulls sort first ascending and never match a range
+    rows = [
+        doc for doc in listings
+        if doc["status"] == status
+        and (property_type is None or doc["property_type"] == property_type)
+        and (min_price is None or (doc["price"] is not None and doc["price"] >= min_price))
+        and (bedrooms is None or doc["bedrooms"] == bedrooms)
+    ]
+    rows.sort(key=lambda doc: (doc[sort.field] is not None, doc[sort.field], doc["id"]), reverse=sort.direction < 0)
+    return [doc["id"] for doc in rows]
+
+
+def paged(inventory, sort, limit, **filters):
+    ids, after = [], None
+    while True:
+        page = inventory.page(sort, limit, after, **filters)
+        ids += [row["id"] for row in page]
+        if len(page) < limit:
+            return ids
+        after = (page[-1][sort.field], page[-1]["id"])
+
+
+def test_pages_match_mongo_order_for_every_sort():
+    listings = make_listings(600)
+    inventory = ColumnarInventory(("active", "pending"), capacity=16)
+    for doc in listings:
+        inventory.upsert(doc)
+    for sort in PROPERTY_SORTS.values():
+        for filters in ({}, {"property_type": "house", "min_price": 800_000}, {"bedrooms": 2}):
+            assert paged(inventory, sort, 23, status="active", **filters) == expected(
+                listings, sort, "active", **filters
+            ), (sort.name, filters)
+
+
+def test_large_match_sets_take_the_sampled_bound():
+    listings = make_listings(20_000, seed=9)
+    inventory = ColumnarInventory(("active", "pending"))
+    for doc in listings:
+        inventory.upsert(doc)
+    sort = PROPERTY_SORTS["-price"]
+    page = inventory.page(sort, 50, status="active")
+    assert [row["id"] for row in page] == expected(listings, sort, "active")[:50]
+
+
+def test_writes_move_and_recycle_slots():
+    inventory = ColumnarInventory(("active",))
+    inventory.upsert({"id": "a", "status": "active", "price": 100})
+    inventory.upsert({"id": "b", "status": "active", "price": 200})
+    assert inventory.mask("active", max_price=150).sum() == 1
+
+    inventory.upsert({"id": "a", "status": "sold", "price": 100})
+    assert len(inventory) == 1 and inventory.mask("active").sum() == 1
+    inventory.upsert({"id": "c", "status": "active", "price": 50})
+    assert inventory.stats()["listings"] == 2 and inventory._size == 2
+    assert [row["id"] for row in inventory.page(PROPERTY_SORTS["price"], 10, status="active")] == ["c", "b"]
+    assert not inventory.covers("sold") and inventory.mask("withdrawn").sum() == 0
+
+
+def test_maintainer_loads_hot_statuses_and_follows_events():
+    collection = StubCollection([{"id": "a", "status": "active"}, {"id": "b", "status": "sold"}])
+    maintainer = ColumnarMaintainer(collection, statuses=("active",), refresh_interval=None)
+    asyncio.run(maintainer.reload())
+    assert collection.queries == [{"status": {"$in": ["active"]}}]
+    assert maintainer.snapshot.ready and len(maintainer.snapshot) == 1
+
+    maintainer.handle(ChangeEvent("insert", "c", {"id": "c", "status": "active", "price": 10}))
+    maintainer.handle(ChangeEvent("delete", "a"))
+    assert [row["id"] for row in maintainer.snapshot.page(PROPERTY_SORTS["price"], 5, status="active")] == ["c"]
@@ -0,0 +1,44 @@
+# ETag / If-None-Match tests
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.etag import compute_etag, conditional_json_response, etag_headers, etag_matches
+
+
+def test_etag_is_strong_and_content_addressed():
+    etag = compute_etag(b"[1,2]")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == compute_etag(b"[1,2]")
+    assert etag != compute_etag(b"[1,2,3]")
+
+
+def test_versioned_etag_prefixes_the_version():
+    etag = compute_etag(b"{}", version=3)
+    assert etag.startswith('"3-') and etag[3:] == compute_etag(b"{}")[1:]
+    assert etag != compute_etag(b"{}", version=4)
+
+
+def test_if_none_match_forms():
+    etag = compute_etag(b"{}")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_conditional_response_returns_304_for_current_tag():
+    body = b'[{"id":"p1"}]'
+    headers = etag_headers(body, {"X-Next-Cursor": "abc"})
+    not_modified = conditional_json_response(body, headers, headers["ETag"])
+    assert not_modified.status_code == 304 and not_modified.body == b""
+    assert not_modified.headers["etag"] == headers["ETag"]
+
+    full = conditional_json_response(body, headers, '"stale"')
+    assert full.status_code == 200 and full.body == body
+    assert full.headers["x-next-cursor"] == "abc"
@@ -0,0 +1,62 @@
+# Streaming export tests
+
+import asyncio
+import csv
+import io
+import json
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.export import export_rows
+from tests.conftest import StubCollection
+
+
+def drain(gen):
+    async def run():
+        return [chunk async for chunk in gen]
+    return asyncio.run(run())
+
+
+DOCS = [{"id": f"p{i}", "status": "active", "price": i, "amenities": ["Pool", "Gym"]} for i in range(5)]
+
+
+def test_ndjson_is_chunked_and_resumable():
+    stub = StubCollection(DOCS)
+    chunks = drain(export_rows(stub, {}, "ndjson", ["id", "price"], dict, batch_size=50, chunk_rows=2))
+    assert len(chunks) == 3 and stub.batch_sizes == [50]
+    rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert [r["id"] for r in rows] == ["p0", "p1", "p2", "p3", "p4"]
+
+    resumed = drain(export_rows(stub, {"status": "active"}, "ndjson", ["id"], dict, after_id="p2"))
+    assert [json.loads(line)["id"] for line in b"".join(resumed).splitlines()] == ["p3", "p4"]
+    assert stub.queries[-1] == {"status": "active", "id": {"$gt": "p2"}}
+
+
+def test_csv_writes_header_once_and_flattens_lists():
+    chunks = drain(export_rows(StubCollection(DOCS), {}, "csv", ["id", "price", "amenities"], dict, chunk_rows=2))
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+    assert len(rows) == 5 and rows[0]["amenities"] == "Pool|Gym"
+
+    resumed = b"".join(drain(export_rows(StubCollection(DOCS), {}, "csv", ["id", "price"], dict, after_id="p3")))
+    assert resumed.decode().splitlines() == ["p4,4"]
+
+
+def test_csv_writes_nested_documents_as_json():
+    geo = {"type": "Point", "coordinates": [-97.7431, 30.2672]}
+    collection = StubCollection([{"id": "p0", "geo": geo}, {"id": "p1", "geo": None}])
+    chunks = drain(export_rows(collection, {}, "csv", ["id", "geo"], dict))
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+    assert json.loads(rows[0]["geo"]) == geo and rows[1]["geo"] == ""
+
+
+def test_archive_is_merged_by_id_and_hot_copy_wins():
+    hot = StubCollection([{"id": "p1", "price": 1}, {"id": "p3", "price": 3}])
+    archive = StubCollection([{"id": "p0", "price": 0}, {"id": "p3", "price": -1}, {"id": "p4", "price": 4}])
+    chunks = drain(export_rows(hot, {}, "ndjson", ["id", "price"], dict, after_id="p0", archive=archive))
+    rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert rows == [{"id": "p1", "price": 1}, {"id": "p3", "price": 3}, {"id": "p4", "price": 4}]
+    assert archive.queries == [{"id": {"$gt": "p0"}}]
@@ -0,0 +1,58 @@
+# Facet aggregation pipeline tests
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.facets import facet_pipeline, shape_facets
+
+
+def test_base_filter_leads_and_facets_skip_their_own_clause():
+    clauses = {"property_type": {"property_type": "house"}, "bedrooms": {"bedrooms": 3}}
+    pipeline = facet_pipeline(clauses, base={"status": "active"}, facets=["property_type", "bedrooms", "price"])
+    assert pipeline[0] == {"$match": {"status": "active"}}
+    branches = pipeline[1]["$facet"]
+    assert branches["property_type"][0] == {"$match": {"bedrooms": 3}}
+    assert branches["bedrooms"][0] == {"$match": {"property_type": "house"}}
+    assert branches["price"][0] == {"$match": {"property_type": "house", "bedrooms": 3}}
+    assert branches["total"] == [{"$match": {"property_type": "house", "bedrooms": 3}}, {"$count": "count"}]
+
+
+def test_unfiltered_pipeline_has_no_match_stages():
+    pipeline = facet_pipeline({"price": {}}, facets=["location", "amenities"], top=5)
+    assert len(pipeline) == 1
+    branches = pipeline[0]["$facet"]
+    assert branches["location"][-1] == {"$limit": 5}
+    assert branches["amenities"][0] == {"$unwind": "$amenity_tags"}
+    assert branches["total"] == [{"$count": "count"}]
+
+
+def test_union_with_follows_the_base_match():
+    pipeline = facet_pipeline({}, base={"status": "sold"}, facets=["location"], union_with="properties_archive")
+    assert pipeline[0] == {"$match": {"status": "sold"}}
+    assert pipeline[1] == {"$unionWith": {"coll": "properties_archive", "pipeline": [{"$match": {"status": "sold"}}]}}
+    assert "$facet" in pipeline[2]
+    assert facet_pipeline({}, facets=["location"], union_with="properties_archive")[0]["$unionWith"]["pipeline"] == []
+
+
+def test_shape_facets_labels_values_and_price_buckets():
+    raw = {
+        "total": [{"count": 7}],
+        "property_type": [{"_id": "house", "count": 4}, {"_id": "condo", "count": 3}],
+        "price": [{"_id": 250_000, "count": 5}, {"_id": "overflow", "count": 2}],
+    }
+    shaped = shape_facets(raw)
+    assert shaped["total"] == 7
+    assert shaped["facets"]["property_type"][0] == {"value": "house", "count": 4}
+    assert shaped["facets"]["price"] == [
+        {"min": 250_000, "max": 500_000, "count": 5},
+        {"min": 5_000_000, "max": None, "count": 2},
+    ]
+
+
+def test_shape_facets_empty_result():
+    assert shape_facets(None) == {"total": 0, "facets": {}}
+    assert shape_facets({"total": [], "bedrooms": []}) == {"total": 0, "facets": {"bedrooms": []}}
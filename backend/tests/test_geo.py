@@ -0,0 +1,61 @@
+# Geospatial filter and offline geocoding tests
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.geo import METERS_PER_MILE, OfflineGeocoder, near_pipeline, parse_bbox, parse_point, within_bbox
+
+
+def test_parse_point_takes_lat_lng_and_returns_geojson_order():
+    assert parse_point("30.27, -97.74") == {"type": "Point", "coordinates": [-97.74, 30.27]}
+    assert parse_point("downtown austin") is None
+    with pytest.raises(ValueError):
+        parse_point("95,10")
+
+
+def test_parse_bbox_validates_order_and_range():
+    assert parse_bbox("-98,30,-97,31") == (-98.0, 30.0, -97.0, 31.0)
+    for bad in ["-97,30,-98,31", "-98,30,-97", "a,b,c,d", "-98,30,-97,91"]:
+        with pytest.raises(ValueError):
+            parse_bbox(bad)
+
+
+def test_within_bbox_builds_closed_polygon():
+    query = within_bbox({"status": "active"}, (-98, 30, -97, 31))
+    ring = query["geo"]["$geoWithin"]["$geometry"]["coordinates"][0]
+    assert query["status"] == "active"
+    assert ring[0] == ring[-1] and len(ring) == 5
+
+
+def test_near_pipeline_converts_radius_and_pages():
+    point = parse_point("30.27,-97.74")
+    pipeline = near_pipeline(point, {"status": "active"}, 5 * METERS_PER_MILE, skip=20, limit=11)
+    geo_near = pipeline[0]["$geoNear"]
+    assert geo_near["near"] == point and geo_near["query"] == {"status": "active"}
+    assert geo_near["maxDistance"] == pytest.approx(8046.72)
+    assert pipeline[1:3] == [{"$skip": 20}, {"$limit": 11}]
+    assert "maxDistance" not in near_pipeline(point, {})[0]["$geoNear"]
+
+
+def test_geocoder_prefers_most_specific_match():
+    geocoder = OfflineGeocoder({"Austin, TX": (30.2672, -97.7431), "78701": (30.2713, -97.7426)})
+    assert geocoder.geocode("789 Industrial Blvd, Austin, TX 78701")["coordinates"] == [-97.7426, 30.2713]
+    assert geocoder.geocode("1 Congress Ave, Austin, TX")["coordinates"] == [-97.7431, 30.2672]
+    assert geocoder.geocode("Somewhere, ZZ", "austin,  tx")["coordinates"] == [-97.7431, 30.2672]
+    assert geocoder.geocode(None, "Nowhere") is None
+
+
+def test_geocoder_loads_csv_and_json(tmp_path):
+    csv_path = tmp_path / "places.csv"
+    csv_path.write_text('name,lat,lng\n"Aspen, CO",39.19,-106.82\n')
+    json_path = tmp_path / "places.json"
+    json_path.write_text('{"Downtown Austin": [30.27, -97.742]}')
+    assert OfflineGeocoder.from_file(csv_path).geocode("aspen, co")["coordinates"] == [-106.82, 39.19]
+    assert OfflineGeocoder.from_file(json_path).geocode("Downtown Austin") is not None
+    assert len(OfflineGeocoder.from_file(backend_dir / "data" / "geocode.csv")) > 0
@@ -0,0 +1,93 @@
+# Index registry and query plan tests
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from pymongo.errors import OperationFailure
+
+from realty.indexes import INDEX_REGISTRY, QUERY_SHAPES, IndexSpec, ensure_indexes, plan_stages
+from tests.conftest import StubCollection
+
+
+def test_registry_names_unique():
+    names = [spec.name for spec in INDEX_REGISTRY]
+    assert len(names) == len(set(names))
+
+
+def test_registry_key_patterns_unique():
+    # MongoDB refuses an existing key pattern under another name, so renames would fail on old databases
+    patterns = [(spec.collection, spec.keys) for spec in INDEX_REGISTRY]
+    assert len(patterns) == len(set(patterns))
+    assert any(spec.name == "properties_status_created_id" for spec in INDEX_REGISTRY)
+
+
+class ConflictingCollection(StubCollection):
+    # Any create_indexes call naming one of `conflicts` fails as a whole, like the server's
+    def __init__(self, conflicts):
+        super().__init__(name="c")
+        self.conflicts = conflicts
+
+    async def create_indexes(self, models):
+        if self.conflicts & {model.document["name"] for model in models}:
+            raise OperationFailure("Index already exists with a different name", code=85)
+        return await super().create_indexes(models)
+
+
+def test_ensure_indexes_builds_the_rest_when_one_conflicts():
+    registry = [IndexSpec("c", name, ((name, 1),)) for name in ("a", "b", "c")]
+    collection = ConflictingCollection({"b"})
+    created = asyncio.run(ensure_indexes({"c": collection}, registry))
+    assert created == {"c": ["a", "c"]}
+    assert set(collection.indexes) == {"_id_", "a", "c"}
+
+
+def test_properties_id_is_unique():
+    id_indexes = [
+        spec for spec in INDEX_REGISTRY
+        if spec.collection == "properties" and spec.keys == (("id", 1),)
+    ]
+    assert id_indexes and id_indexes[0].unique
+
+
+def test_every_query_shape_has_index_prefix():
+    # Some index on the collection must lead with a field the shape filters on
+    for shape in QUERY_SHAPES:
+        assert any(
+            spec.collection == shape.collection and spec.keys[0][0] in shape.filter
+            for spec in INDEX_REGISTRY
+        ), shape.name
+
+
+def test_sorted_query_shapes_have_equality_then_sort_index():
+    # Every equality-filtered field, then the sort keys (either direction): no competing plan is more
+    # selective, so none wins with an in-memory SORT
+    def supports(spec, shape):
+        equality = {field for field, value in shape.filter.items() if not isinstance(value, dict)}
+        split = len(equality)
+        flipped = tuple((field, -direction) for field, direction in shape.sort)
+        return (
+            {field for field, _ in spec.keys[:split]} == equality
+            and spec.keys[split:split + len(shape.sort)] in (shape.sort, flipped)
+        )
+
+    for shape in QUERY_SHAPES:
+        if shape.sort:
+            specs = [spec for spec in INDEX_REGISTRY if spec.collection == shape.collection]
+            assert any(supports(spec, shape) for spec in specs), shape.name
+
+
+def test_plan_stages_walks_nested_plans():
+    plan = {
+        "stage": "FETCH",
+        "inputStage": {
+            "stage": "OR",
+            "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}],
+        },
+    }
+    assert plan_stages(plan) == ["FETCH", "OR", "IXSCAN", "COLLSCAN"]
+    assert "COLLSCAN" not in plan_stages({"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}})
@@ -0,0 +1,68 @@
+# Streaming NDJSON ingestion tests
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from pydantic import BaseModel
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.ingest import ingest_ndjson, iter_lines
+
+
+class Row(BaseModel):
+    title: str
+    price: int
+
+
+class RecordingCollection:
+    def __init__(self):
+        self.batches = []
+
+    async def insert_many(self, docs, ordered=True):
+        assert ordered is False
+        self.batches.append(list(docs))
+        return type("Result", (), {"inserted_ids": list(range(len(docs)))})()
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def collect_lines(data: bytes, size: int, max_line_bytes: int = 1 << 20):
+    async def run():
+        return [item async for item in iter_lines(chunked(data, size), max_line_bytes)]
+    return asyncio.run(run())
+
+
+def test_lines_split_across_chunks():
+    lines = collect_lines(b'{"a":1}\n{"b":2}\n{"c":3}', size=3)
+    assert [line for _, line, _ in lines] == [b'{"a":1}', b'{"b":2}', b'{"c":3}']
+    assert [n for n, _, _ in lines] == [1, 2, 3]
+
+
+def test_oversized_line_is_dropped_but_counted():
+    lines = collect_lines(b"x" * 50 + b"\nok\n", size=8, max_line_bytes=16)
+    assert lines == [(1, b"", True), (2, b"ok", False)]
+
+
+def test_ingest_batches_and_reports_row_errors():
+    rows = [json.dumps({"title": f"t{i}", "price": i}) for i in range(5)]
+    rows.insert(2, json.dumps({"title": "bad", "price": "nope"}))
+    rows.insert(4, "not json")
+    body = ("\n".join(rows) + "\n\n").encode()
+    collection = RecordingCollection()
+
+    report = asyncio.run(ingest_ndjson(
+        chunked(body, 7), collection, lambda row: Row(**row).model_dump(), batch_size=2, max_errors=1
+    ))
+
+    assert [len(batch) for batch in collection.batches] == [2, 2, 1]
+    assert (report.rows_received, report.inserted, report.failed) == (7, 5, 2)
+    assert report.errors[0]["line"] == 3 and "price" in report.errors[0]["error"]
+    assert report.errors_truncated
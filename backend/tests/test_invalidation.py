@@ -0,0 +1,89 @@
+# Invalidation bus and polling watcher tests
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.invalidation import ChangeEvent, ChangeWatcher, InvalidationBus
+from tests.conftest import StubCollection
+
+
+def test_bus_fans_out_and_isolates_failing_subscribers():
+    bus = InvalidationBus()
+    seen = []
+
+    def broken(event):
+        raise RuntimeError("boom")
+
+    bus.subscribe(broken)
+    bus.subscribe(seen.append)
+    bus.publish(ChangeEvent("delete", "p1"))
+    assert [e.id for e in seen] == ["p1"]
+
+
+def test_poll_publishes_updates_once_and_finds_deletes():
+    collection = StubCollection()
+    bus = InvalidationBus()
+    events = []
+    bus.subscribe(events.append)
+    watcher = ChangeWatcher(collection, bus, mode="poll", lookback=2.0)
+    base = datetime(2024, 1, 1, 12, 0, 0)
+
+    async def scenario():
+        collection.docs.append({"id": "p1", "updated_at": base})
+        assert await watcher.poll_once() == 0  # baseline
+
+        collection.docs.append({"id": "p2", "updated_at": base + timedelta(seconds=5)})
+        await watcher.poll_once()
+        assert [(e.op, e.id) for e in events] == [("update", "p2")]
+
+        # A lagging replica's write inside the lookback window is still caught, exactly once
+        collection.docs.append({"id": "p3", "updated_at": base + timedelta(seconds=4)})
+        events.clear()
+        await watcher.poll_once()
+        await watcher.poll_once()
+        assert [(e.op, e.id) for e in events] == [("update", "p3")]
+
+        collection.docs = [d for d in collection.docs if d["id"] != "p1"]
+        events.clear()
+        await watcher.poll_once()
+        assert [(e.op, e.id) for e in events] == [("delete", "p1")]
+
+        # An insert in the same interval leaves the count unchanged; the delete is still seen
+        collection.docs = [d for d in collection.docs if d["id"] != "p2"]
+        collection.docs.append({"id": "p4", "updated_at": base + timedelta(seconds=6)})
+        events.clear()
+        await watcher.poll_once()
+        assert [(e.op, e.id) for e in events] == [("update", "p4"), ("delete", "p2")]
+
+        # A listing appearing with an old updated_at can't be described, so caches reset
+        collection.docs.append({"id": "p5", "updated_at": base})
+        events.clear()
+        await watcher.poll_once()
+        assert [e.op for e in events] == ["reset"]
+
+    asyncio.run(scenario())
+
+
+def test_change_stream_deletes_name_the_listing():
+    collection = StubCollection([{"_id": 101, "id": "old"}, {"_id": "p1", "id": "p1"}])
+    watcher = ChangeWatcher(collection, InvalidationBus())
+    assert asyncio.run(watcher.load_legacy_ids()) == 1
+
+    # New listings are keyed by their id
+    event = watcher.change_event({"operationType": "delete", "documentKey": {"_id": "p1"}})
+    assert (event.op, event.id, event.document) == ("delete", "p1", None)
+    # Legacy ObjectId keys resolve through the loaded map, once
+    assert watcher.change_event({"operationType": "delete", "documentKey": {"_id": 101}}).id == "old"
+    assert watcher.change_event({"operationType": "delete", "documentKey": {"_id": 101}}).id is None
+
+    # ...and through keys learned from later events' full documents
+    doc = {"_id": 202, "id": "restored", "price": 1}
+    inserted = {"operationType": "insert", "documentKey": {"_id": 202}, "fullDocument": doc}
+    assert watcher.change_event(inserted).id == "restored"
+    assert watcher.change_event({"operationType": "delete", "documentKey": {"_id": 202}}).id == "restored"
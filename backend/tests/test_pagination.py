@@ -0,0 +1,61 @@
+# Keyset cursor tests
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.pagination import DEFAULT_PROPERTY_SORT, KeysetSort
+
+
+def test_cursor_round_trips_datetime():
+    doc = {"id": "abc", "created_at": datetime(2024, 5, 1, 12, 30, 0, 123000)}
+    cursor = DEFAULT_PROPERTY_SORT.encode_cursor(doc)
+    assert DEFAULT_PROPERTY_SORT.decode_cursor(cursor) == (doc["created_at"], "abc")
+
+
+def test_after_builds_keyset_filter():
+    sort = KeysetSort("price", -1)
+    cursor = sort.encode_cursor({"id": "p1", "price": 500000})
+    query = sort.after({"status": "active", "price": {"$lte": 900000}}, cursor)
+    assert query["status"] == "active"
+    assert query["$or"] == [
+        {"price": {"$lt": 500000}},
+        {"price": None},
+        {"price": 500000, "id": {"$lt": "p1"}},
+    ]
+
+
+def test_after_keeps_existing_or_clause():
+    cursor = DEFAULT_PROPERTY_SORT.encode_cursor({"id": "p1", "created_at": datetime(2024, 1, 1)})
+    query = DEFAULT_PROPERTY_SORT.after({"$or": [{"a": 1}]}, cursor)
+    assert list(query) == ["$and"]
+
+
+def test_rejects_foreign_and_garbage_cursors():
+    price_cursor = KeysetSort("price").encode_cursor({"id": "p1", "price": 1})
+    with pytest.raises(ValueError):
+        DEFAULT_PROPERTY_SORT.decode_cursor(price_cursor)
+    with pytest.raises(ValueError):
+        DEFAULT_PROPERTY_SORT.decode_cursor("not-a-cursor!")
+
+
+def test_after_null_value_pages_past_missing_fields():
+    ascending = KeysetSort("year_built")
+    query = ascending.after({}, ascending.encode_cursor({"id": "p1", "year_built": None}))
+    assert query["$or"] == [{"year_built": {"$ne": None}}, {"year_built": None, "id": {"$gt": "p1"}}]
+
+    descending = KeysetSort("year_built", -1)
+    query = descending.after({}, descending.encode_cursor({"id": "p1", "year_built": None}))
+    assert query["$or"] == [{"year_built": None, "id": {"$lt": "p1"}}]
+
+
+def test_descending_after_value_still_reaches_nulls():
+    descending = KeysetSort("year_built", -1)
+    query = descending.after({}, descending.encode_cursor({"id": "p1", "year_built": 1990}))
+    assert {"year_built": None} in query["$or"]
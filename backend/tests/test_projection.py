@@ -0,0 +1,36 @@
+# Sparse fieldset tests
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.projection import parse_fields, to_projection, trim
+
+ALLOWED = ["id", "title", "price", "description", "created_at"]
+
+
+def test_no_fields_means_full_documents():
+    assert parse_fields(None, ALLOWED) is None
+    assert parse_fields("  ", ALLOWED) is None
+
+
+def test_fields_always_include_id_and_expand_presets():
+    presets = {"card": ["title", "price"]}
+    assert parse_fields("price, title", ALLOWED) == ["id", "price", "title"]
+    assert parse_fields("card,price,description", ALLOWED, presets) == ["id", "title", "price", "description"]
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(ValueError):
+        parse_fields("title,password", ALLOWED)
+
+
+def test_projection_and_trim():
+    assert to_projection(["id", "price"]) == {"_id": 0, "id": 1, "price": 1}
+    doc = {"id": "p1", "price": 1, "created_at": "x"}
+    assert trim(doc, ["id", "price", "title"]) == {"id": "p1", "price": 1}
@@ -0,0 +1,195 @@
+# Route tests: the FastAPI app against an in-memory database
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import server
+from realty import ARCHIVE_COLLECTION
+from tests.conftest import StubDatabase
+
+CREATED = datetime(2024, 1, 1)
+
+
+async def _no_collscans(db):
+    return []
+
+
+@pytest.fixture
+def db(monkeypatch):
+    # Every collection the app and its background maintainers hold points at one fresh StubDatabase
+    db = StubDatabase()
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setattr(server, "find_collscans", _no_collscans)
+    for maintainer in (
+        server.property_watcher, server.inventory_stats, server.property_search_index,
+        server.similar_listings, server.property_snapshot,
+    ):
+        monkeypatch.setattr(maintainer, "collection", db.properties)
+    monkeypatch.setattr(server.inventory_stats, "archive", db[ARCHIVE_COLLECTION])
+    monkeypatch.setattr(server.listing_archiver, "hot", db.properties)
+    monkeypatch.setattr(server.listing_archiver, "cold", db[ARCHIVE_COLLECTION])
+    monkeypatch.setattr(server.status_writer, "collection", db.status_checks)
+    monkeypatch.setattr(server.property_watcher, "mode", "off")
+    server.property_cache.invalidate()
+    server.comparables_cache.invalidate()
+    return db
+
+
+@pytest.fixture
+def client(db):
+    with TestClient(server.app) as client:
+        yield client
+
+
+def listing(id, minutes=0, **fields):
+    # A stored listing as POST /api/properties would write it
+    data = {
+        "id": id, "title": f"Listing {id}", "description": "Quiet street", "price": 500_000,
+        "location": "Austin, TX", "address": f"{id} Main St", "bedrooms": 3, "bathrooms": 2, "sqft": 2000,
+        "property_type": "house", "image_url": "https://example.com/a.jpg",
+        "created_at": CREATED + timedelta(minutes=minutes), **fields,
+    }
+    return server._keyed(server.Property(**data).dict())
+
+
+def store(collection, *docs):
+    asyncio.run(collection.insert_many(list(docs)))
+
+
+def pages(client, url):
+    # Follow X-Next-Cursor to the end, returning the ids of every page
+    ids, cursor = [], None
+    while True:
+        response = client.get(url + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200, response.text
+        ids.append([prop["id"] for prop in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+
+
+def test_cursor_pages_follow_the_sort_without_gaps(db, client):
+    # Pairs of listings share a created_at, so pages also split on the id tie-breaker
+    store(
+        db.properties,
+        *(listing(f"p{i}", minutes=i // 2, price=100_000 * (7 - i)) for i in range(7)),
+        listing("s", status="sold"),
+    )
+    assert pages(client, "/api/properties?limit=3") == [["p0", "p1", "p2"], ["p3", "p4", "p5"], ["p6"]]
+    by_price = [["p6", "p5", "p4", "p3"], ["p2", "p1", "p0"]]
+    assert pages(client, "/api/properties?limit=4&sort=price") == by_price
+    assert client.get("/api/properties?cursor=garbage").status_code == 400
+
+
+def test_columnar_and_mongo_paths_serve_the_same_pages(db, client, monkeypatch):
+    store(db.properties, *(
+        listing(
+            f"p{i}", minutes=i, price=100_000 * (i % 4 + 1), bedrooms=i % 3 + 1,
+            property_type=("house", "condo")[i % 2],
+        )
+        for i in range(12)
+    ))
+    urls = [
+        "/api/properties?limit=4&sort=-price",
+        "/api/properties?limit=5&property_type=house&min_price=200000",
+        "/api/properties?limit=3&bedrooms=2&sort=created_at",
+    ]
+    from_mongo = [pages(client, url) for url in urls]
+
+    monkeypatch.setattr(server, "filter_backend", "memory")
+    asyncio.run(server.property_snapshot.reload())
+    server.property_cache.invalidate()
+    db.properties.queries.clear()
+    assert [pages(client, url) for url in urls] == from_mongo
+    # Pages were hydrated by id rather than filtered by Mongo
+    assert db.properties.queries and all(list(query) == ["id"] for query in db.properties.queries)
+
+
+def test_near_orders_by_distance_and_bbox_filters(db, client):
+    store(
+        db.properties,
+        listing("far", geo={"type": "Point", "coordinates": [-97.9, 30.5]}),
+        listing("near", geo={"type": "Point", "coordinates": [-97.74, 30.27]}),
+        listing("mid", geo={"type": "Point", "coordinates": [-97.8, 30.3]}),
+        listing("nowhere"),
+    )
+    response = client.get("/api/properties?near=30.2672,-97.7431&within_radius=10")
+    nearby = response.json()
+    assert [prop["id"] for prop in nearby] == ["near", "mid"]
+    assert nearby[0]["distance_miles"] < nearby[1]["distance_miles"] < 10
+    assert client.get("/api/properties?near=30.2672,-97.7431&limit=1").headers["X-Next-Offset"] == "1"
+
+    response = client.get("/api/properties?bbox=-97.85,30.2,-97.7,30.35")
+    assert sorted(prop["id"] for prop in response.json()) == ["mid", "near"]
+    assert client.get("/api/properties?bbox=1,2,3").status_code == 400
+    assert client.get("/api/properties?near=Atlantis").status_code == 400
+
+
+def test_archived_listings_read_through(db, client):
+    store(db.properties, listing("hot-sold", minutes=2, status="sold"), listing("active", minutes=3))
+    store(db[ARCHIVE_COLLECTION], listing("cold-sold", minutes=1, status="sold"), listing("cold-old", status="sold"))
+    assert pages(client, "/api/properties?status=sold&limit=2") == [["cold-old", "cold-sold"], ["hot-sold"]]
+    assert client.get("/api/properties/cold-old").json()["status"] == "sold"
+    assert pages(client, "/api/properties?limit=10") == [["active"]]
+
+
+def test_put_if_match_round_trips_the_detail_etag(db, client):
+    store(db.properties, listing("a"))
+    etag = client.get("/api/properties/a").headers["ETag"]
+
+    response = client.put("/api/properties/a", json={"price": 600_000}, headers={"If-Match": etag})
+    assert response.status_code == 200 and response.json()["version"] == 2
+    assert response.json()["price_per_sqft"] == 300.0
+    # The old tag now names a stale version
+    stale = client.put("/api/properties/a", json={"price": 700_000}, headers={"If-Match": etag})
+    assert stale.status_code == 412
+    assert client.put("/api/properties/a", json={"price": 700_000}, headers={"If-Match": '"abc"'}).status_code == 412
+
+    fresh = client.put("/api/properties/a", json={"price": 700_000}, headers={"If-Match": response.headers["ETag"]})
+    assert fresh.status_code == 200 and fresh.json()["version"] == 3
+    assert client.put("/api/properties/missing", json={"price": 1}, headers={"If-Match": "*"}).status_code == 404
+
+
+def test_moves_regeocode_and_clear_coordinates_the_geocoder_cannot_place(db, client):
+    austin = {"type": "Point", "coordinates": [-97.7431, 30.2672]}
+    store(db.properties, listing("a", geo=austin), listing("b", geo=austin), listing("c", geo=austin))
+
+    moved = client.put("/api/properties/a", json={"location": "Beverly Hills, CA", "address": "1 Rodeo Dr"})
+    assert moved.json()["geo"] == {"type": "Point", "coordinates": [-118.4004, 34.0736]}
+    unknown = client.put("/api/properties/b", json={"location": "Atlantis", "address": "1 Sunken Way"})
+    assert unknown.status_code == 200 and unknown.json()["geo"] is None
+    # Coordinates sent with the move are kept as given
+    explicit = {"type": "Point", "coordinates": [-97.0, 30.0]}
+    response = client.put("/api/properties/c", json={"location": "Atlantis", "geo": explicit})
+    assert response.json()["geo"] == explicit
+
+    operations = [{"id": "a", "update": {"location": "Atlantis"}}]
+    response = client.patch("/api/properties/bulk", json={"operations": operations})
+    assert response.status_code == 200 and response.json()["modified"] == 1
+    assert client.get("/api/properties/a").json()["geo"] is None
+    assert client.get("/api/properties?near=30.2672,-97.7431&within_radius=5").json() == []
+
+
+def test_search_reads_archived_statuses_through(db, client):
+    store(db.properties, listing("hot", minutes=2, status="sold"), listing("active", minutes=3))
+    store(
+        db[ARCHIVE_COLLECTION],
+        listing("cold-new", minutes=1, status="sold"),
+        listing("cold-old", status="sold"),
+        listing("cold-studio", status="sold", bedrooms=0),
+    )
+    first = client.get("/api/properties/search?q=3 beds&status=sold&limit=2")
+    assert [prop["id"] for prop in first.json()] == ["cold-old", "cold-new"]
+    assert first.headers["X-Next-Offset"] == "2"
+    second = client.get("/api/properties/search?q=3 beds&status=sold&limit=2&offset=2")
+    assert [prop["id"] for prop in second.json()] == ["hot"] and "X-Next-Offset" not in second.headers
+    assert [prop["id"] for prop in client.get("/api/properties/search?q=3 beds").json()] == ["active"]
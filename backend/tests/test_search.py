@@ -0,0 +1,34 @@
+# Search query parsing tests
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.search import parse_search_query, text_query
+
+
+def test_price_and_bedroom_hints_are_extracted():
+    parsed = parse_search_query("pool ocean view under 1M")
+    assert parsed.text == "pool ocean view"
+    assert parsed.hints == {"max_price": 1_000_000}
+
+    parsed = parse_search_query("3 beds over $450k near downtown")
+    assert parsed.text == "near downtown"
+    assert parsed.hints == {"min_price": 450_000, "bedrooms": 3}
+
+
+def test_plain_numbers_and_grouping():
+    assert parse_search_query("condo below 750,000").hints == {"max_price": 750_000}
+    assert parse_search_query("under 1.5 million").hints == {"max_price": 1_500_000}
+
+
+def test_keywords_only_query_is_untouched():
+    parsed = parse_search_query("  wine   cellar ")
+    assert parsed.text == "wine cellar" and parsed.hints == {}
+
+
+def test_text_query_keeps_structured_filters():
+    assert text_query({"status": "active"}, "pool") == {"status": "active", "$text": {"$search": "pool"}}
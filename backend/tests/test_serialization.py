@@ -0,0 +1,52 @@
+# Fast serialization path tests
+
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.serialization import fast_response, trusted_dump, trusted_dump_many
+
+
+class Listing(BaseModel):
+    id: str
+    price: int
+    status: str = "active"
+    amenities: List[str] = Field(default_factory=list)
+    year_built: Optional[int] = None
+    created_at: datetime
+
+
+def test_trusted_dump_fills_defaults_and_drops_extras():
+    doc = {"_id": object(), "id": "p1", "price": 10, "created_at": datetime(2024, 1, 1)}
+    assert trusted_dump(Listing, doc) == {
+        "id": "p1",
+        "price": 10,
+        "status": "active",
+        "amenities": [],
+        "year_built": None,
+        "created_at": datetime(2024, 1, 1),
+    }
+
+
+def test_fast_response_matches_validated_json():
+    docs = [
+        {"id": "p1", "price": 10, "amenities": ["Pool"], "created_at": datetime(2024, 1, 1, 8, 30, 0, 250000)},
+        {"id": "p2", "price": 20, "status": "sold", "created_at": datetime(2024, 2, 1)},
+    ]
+    fast = json.loads(fast_response(trusted_dump_many(Listing, docs)).body)
+    validated = [Listing(**doc).model_dump(mode="json") for doc in docs]
+    assert fast == validated
+
+
+def test_fast_response_passes_headers():
+    response = fast_response([], headers={"X-Next-Cursor": "abc"})
+    assert response.headers["x-next-cursor"] == "abc"
+    assert response.body == b"[]"
@@ -0,0 +1,75 @@
+# Similar-listings index tests
+
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.similar import SimilarityIndex
+
+
+def listing(id, price=500_000, sqft=2000, bedrooms=3, property_type="house", tags=(), status="active", **extra):
+    return {
+        "id": id, "status": status, "property_type": property_type, "price": price, "sqft": sqft,
+        "bedrooms": bedrooms, "bathrooms": 2, "year_built": 2000, "amenity_tags": list(tags), **extra,
+    }
+
+
+def test_nearest_first_excluding_the_source_and_other_statuses():
+    index = SimilarityIndex(("active", "pending"))
+    index.upsert(listing("src"))
+    index.upsert(listing("close", price=520_000))
+    index.upsert(listing("far", price=2_000_000, sqft=6000, bedrooms=6))
+    index.upsert(listing("pending-twin", status="pending"))
+    result = index.neighbours(listing("src"), k=5)
+    assert [doc_id for doc_id, _ in result] == ["close", "far"]
+    assert result[0][1] < result[1][1]
+    assert [doc_id for doc_id, _ in index.neighbours(listing("src"), k=5, status="pending")] == ["pending-twin"]
+
+
+def test_type_and_amenities_add_weighted_distance():
+    index = SimilarityIndex(type_weight=2.0, amenity_weight=1.0)
+    index.upsert(listing("condo", property_type="condo", tags=["pool"]))
+    index.upsert(listing("house-gym", tags=["gym"]))
+    index.upsert(listing("house-pool", tags=["pool", "gym"]))
+    distances = dict(index.neighbours(listing("q", tags=["pool", "spa"]), k=3))
+    # Identical numerics: only the categorical terms remain
+    assert distances["condo"] == pytest.approx(math.sqrt(2.0 + 0.5), abs=1e-4)
+    assert distances["house-pool"] == pytest.approx(math.sqrt(2 / 3), abs=1e-4)
+    assert distances["house-gym"] == pytest.approx(1.0, abs=1e-4)
+
+
+def test_missing_features_cost_one_standard_deviation():
+    index = SimilarityIndex()
+    index.upsert(listing("a", lot_size=0.5))
+    index.upsert(listing("b"))
+    distances = dict(index.neighbours(listing("q", lot_size=0.5), k=2))
+    assert distances["a"] == 0
+    assert distances["b"] == pytest.approx(1.0, abs=1e-4)
+
+
+def test_writes_update_and_remove_rows():
+    index = SimilarityIndex(capacity=2)
+    for i in range(5):
+        index.upsert(listing(f"p{i}", price=100_000 * (i + 1)))
+    index.upsert(listing("p0", status="sold"))
+    assert index.remove("p1") and len(index) == 3
+    index.upsert(listing("p9", price=100_000, tags=[f"tag{i}" for i in range(70)]))
+    assert index.amenities.shape[0] == 2
+    assert index.neighbours(listing("q", price=100_000), k=1)[0][0] == "p9"
+
+
+def test_popcount_fallback_matches_bitwise_count(monkeypatch):
+    from realty import similar
+
+    words = np.array([0, 1, 0xFFFFFFFFFFFFFFFF, 0x8000000000000001, 0b1011], dtype=np.uint64)
+    expected = [bin(int(word)).count("1") for word in words]
+    assert similar._popcount(words).tolist() == expected
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    assert similar._popcount(words).tolist() == expected
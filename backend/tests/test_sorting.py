@@ -0,0 +1,35 @@
+# Listing sort option tests
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.indexes import INDEX_REGISTRY
+from realty.pagination import DEFAULT_PROPERTY_SORT
+from realty.sorting import PROPERTY_SORTS, SORT_FIELDS, parse_sort, price_per_sqft
+
+
+def test_parse_sort_names_and_directions():
+    assert parse_sort(None) is DEFAULT_PROPERTY_SORT
+    assert parse_sort("-price").spec() == [("price", -1), ("id", -1)]
+    assert parse_sort("sqft").spec() == [("sqft", 1), ("id", 1)]
+    with pytest.raises(ValueError):
+        parse_sort("bathrooms")
+
+
+def test_every_sort_has_a_status_field_id_index():
+    keys = {spec.keys for spec in INDEX_REGISTRY if spec.collection == "properties"}
+    for field in SORT_FIELDS:
+        assert (("status", 1), (field, 1), ("id", 1)) in keys, field
+    assert len(PROPERTY_SORTS) == 2 * len(SORT_FIELDS)
+
+
+def test_price_per_sqft():
+    assert price_per_sqft(500_000, 2000) == 250.0
+    assert price_per_sqft(500_000, 0) is None
+    assert price_per_sqft(500_000, None) is None
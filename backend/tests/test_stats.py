@@ -0,0 +1,125 @@
+# Inventory statistics and quantile sketch tests
+
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.invalidation import ChangeEvent
+from realty.stats import InventoryStats, QuantileSketch, StatsMaintainer
+from tests.conftest import StubCollection
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = random.Random(3)
+    values = sorted(rng.lognormvariate(13, 0.8) for _ in range(5000))
+    sketch = QuantileSketch(0.01)
+    for value in values:
+        sketch.add(value)
+    for q in (0.1, 0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.01)
+
+
+def test_sketch_remove_and_merge():
+    a, b = QuantileSketch(), QuantileSketch()
+    for value in (100, 200, 300):
+        a.add(value)
+    b.add(1000)
+    a.merge(b)
+    assert a.count == 4 and a.quantile(1.0) == pytest.approx(1000, rel=0.01)
+    a.remove(1000)
+    assert a.count == 3 and a.quantile(1.0) == pytest.approx(300, rel=0.01)
+    with pytest.raises(ValueError):
+        a.merge(QuantileSketch(0.05))
+
+
+def listing(id, status="active", property_type="house", price=500_000, sqft=2000):
+    return {"id": id, "status": status, "property_type": property_type, "price": price, "sqft": sqft}
+
+
+def test_updates_and_deletes_subtract_previous_contribution():
+    stats = InventoryStats()
+    stats.upsert(listing("a", price=400_000, sqft=2000))
+    stats.upsert(listing("b", property_type="condo", price=600_000, sqft=1000))
+    stats.upsert(listing("a", status="sold", price=450_000, sqft=0))
+    snapshot = stats.snapshot()
+    assert snapshot["total"] == 2
+    assert snapshot["by_status"] == {"active": 1, "sold": 1}
+    assert snapshot["by_status_type"] == {"active": {"condo": 1}, "sold": {"house": 1}}
+    assert snapshot["price"]["all"]["mean"] == 525_000
+    assert snapshot["price_per_sqft"]["all"]["count"] == 1
+
+    assert stats.remove("b") and not stats.remove("b")
+    snapshot = stats.snapshot()
+    assert snapshot["by_type"] == {"house": 1}
+    assert "active" not in snapshot["price"]
+    assert snapshot["price"]["all"]["p50"] == pytest.approx(450_000, rel=0.01)
+
+
+def test_snapshot_is_memoized_until_a_write():
+    stats = InventoryStats()
+    stats.upsert(listing("a"))
+    first = stats.snapshot()
+    assert stats.snapshot() is first
+    stats.upsert(listing("b"))
+    assert stats.snapshot() is not first
+
+
+def test_recompute_measures_drift_and_corrects_it():
+    collection = StubCollection([listing("a"), listing("b")])
+    maintainer = StatsMaintainer(collection, refresh_interval=None)
+
+    async def run():
+        await maintainer.reload()
+        maintainer.handle(ChangeEvent("update", "a", listing("a", price=700_000)))
+        # A write this replica never heard about
+        collection.docs = [listing("a", price=700_000), listing("b", status="sold")]
+        await maintainer.reload()
+
+    asyncio.run(run())
+    assert maintainer.last_drift == 1
+    assert maintainer.inventory.snapshot()["by_status"] == {"active": 1, "sold": 1}
+
+
+def test_reloads_forced_by_resets_are_not_counted_as_drift(caplog):
+    collection = StubCollection([listing("a"), listing("b")])
+    maintainer = StatsMaintainer(collection, refresh_interval=None)
+
+    async def run():
+        await maintainer.reload()
+        # A bulk patch: the writes are intended, announced with a reset
+        collection.docs = [listing("a", status="sold"), listing("b", status="sold")]
+        maintainer.handle(ChangeEvent("reset"))
+        await maintainer._task
+        # A periodic refresh afterwards finds nothing missed
+        await maintainer.reload()
+
+    asyncio.run(run())
+    assert maintainer.inventory.snapshot()["by_status"] == {"sold": 2}
+    assert maintainer.last_drift == 0 and maintainer.reloads == 3
+    assert "drifted" not in caplog.text
+
+
+def test_archive_is_counted_and_archived_deletes_are_restored():
+    collection = StubCollection([listing("a"), listing("b")])
+    archive = StubCollection([listing("c", status="sold")])
+    maintainer = StatsMaintainer(collection, refresh_interval=None, archive=archive)
+
+    async def run():
+        await maintainer.reload()
+        assert maintainer.inventory.snapshot()["by_status"] == {"active": 2, "sold": 1}
+        # The archiver moves b, then deletes it from the hot collection; a is really deleted
+        archive.docs.append(listing("b", status="sold"))
+        maintainer.handle(ChangeEvent("delete", "b"))
+        maintainer.handle(ChangeEvent("delete", "a"))
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert maintainer.inventory.snapshot()["by_status"] == {"sold": 2}
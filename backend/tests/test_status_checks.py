@@ -0,0 +1,78 @@
+# Status check history tests
+
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from pymongo.errors import OperationFailure
+
+from realty.indexes import INDEX_REGISTRY
+from realty.status_checks import (
+    STATUS_CHECK_SORT,
+    STATUS_CHECK_TTL_INDEX,
+    ensure_status_check_ttl,
+    latest_pipeline,
+    parse_clients,
+    status_check_query,
+)
+from tests.conftest import StubCollection, StubDatabase
+
+
+def test_query_filters_clients_and_half_open_window():
+    since, until = datetime(2024, 1, 1), datetime(2024, 1, 2)
+    assert status_check_query() == {}
+    assert status_check_query(["web"], since=since) == {"client_name": "web", "timestamp": {"$gte": since}}
+    assert status_check_query(parse_clients(" web, worker ,web,"), since, until) == {
+        "client_name": {"$in": ["web", "worker"]},
+        "timestamp": {"$gte": since, "$lt": until},
+    }
+
+
+def test_cursor_resumes_newest_first_within_the_filter():
+    last = {"id": "b", "timestamp": datetime(2024, 1, 1, 12, 0, 0, 123000)}
+    cursor = STATUS_CHECK_SORT.encode_cursor(last)
+    query = STATUS_CHECK_SORT.after(status_check_query(["web"]), cursor)
+    assert query == {
+        "client_name": "web",
+        "$or": [
+            {"timestamp": {"$lt": last["timestamp"]}},
+            {"timestamp": None},
+            {"timestamp": last["timestamp"], "id": {"$lt": "b"}},
+        ],
+    }
+
+
+def test_latest_view_matches_the_client_index():
+    # DISTINCT_SCAN needs the $sort to follow an index's key order exactly
+    pipeline = latest_pipeline(["web", "worker"])
+    assert pipeline[0] == {"$match": {"client_name": {"$in": ["web", "worker"]}}}
+    index = next(spec for spec in INDEX_REGISTRY if spec.name == "status_checks_client_timestamp_id")
+    assert tuple(pipeline[1]["$sort"].items()) == index.keys
+    assert set(pipeline[2]["$group"]) == {"_id", "id", "timestamp"}
+    assert latest_pipeline()[0]["$sort"] == pipeline[1]["$sort"]
+
+
+class UnauthorizedCollection(StubCollection):
+    async def index_information(self):
+        raise OperationFailure("not authorized")
+
+
+def test_ttl_index_created_retuned_and_dropped():
+    collection = StubDatabase().status_checks
+    assert asyncio.run(ensure_status_check_ttl(collection, 86400)) == "created"
+    assert collection.indexes[STATUS_CHECK_TTL_INDEX]["expireAfterSeconds"] == 86400
+    assert asyncio.run(ensure_status_check_ttl(collection, 86400)) is None
+
+    assert asyncio.run(ensure_status_check_ttl(collection, 3600)) == "updated"
+    assert collection.database.commands == [
+        ("collMod", "status_checks", {"index": {"name": STATUS_CHECK_TTL_INDEX, "expireAfterSeconds": 3600}})
+    ]
+    assert asyncio.run(ensure_status_check_ttl(collection, 0)) == "dropped"
+    assert STATUS_CHECK_TTL_INDEX not in collection.indexes
+    assert asyncio.run(ensure_status_check_ttl(collection, 0)) is None
+    assert asyncio.run(ensure_status_check_ttl(UnauthorizedCollection(), 60)) is None
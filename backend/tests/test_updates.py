@@ -0,0 +1,108 @@
+# Versioned and bulk update helper tests
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.updates import PatchOp, bulk_patch, parse_if_match, version_filter, versioned_update
+from tests.conftest import StubCollection
+
+
+def test_parse_if_match_accepts_bare_quoted_and_weak_versions():
+    assert parse_if_match(None) is None
+    assert parse_if_match("3") == 3
+    assert parse_if_match('"3"') == 3
+    assert parse_if_match('W/"12"') == 12
+    assert parse_if_match("*") is None
+    with pytest.raises(ValueError):
+        parse_if_match('"abc"')
+
+
+def test_parse_if_match_reads_the_version_from_a_detail_etag():
+    from realty.etag import compute_etag
+
+    assert parse_if_match(compute_etag(b"{}", version=7)) == 7
+    with pytest.raises(ValueError):
+        parse_if_match(compute_etag(b"{}"))
+
+
+def test_initial_version_matches_unversioned_documents():
+    assert version_filter(1) == {"$in": [1, None]}
+    assert version_filter(4) == 4
+
+
+def test_versioned_update_wraps_values_as_literals():
+    pipeline = versioned_update({"title": "$1 fixer-upper", "price": 1})
+    stage = pipeline[0]["$set"]
+    assert stage["title"] == {"$literal": "$1 fixer-upper"}
+    assert stage["version"] == {"$add": [{"$ifNull": ["$version", 1]}, 1]}
+    assert len(pipeline) == 1
+
+
+def test_versioned_update_derived_stage_runs_after_the_set():
+    derived = {"price_per_sqft": {"$divide": ["$price", "$sqft"]}}
+    pipeline = versioned_update({"price": 1}, derived)
+    assert pipeline[1] == {"$set": derived}
+
+
+class FailingCollection(StubCollection):
+    # bulk_write number `call` rejects its request at `index` and applies the rest, like an unordered write
+    def __init__(self, docs, call, index):
+        super().__init__(docs)
+        self.call = call
+        self.index = index
+
+    async def bulk_write(self, requests, ordered=True):
+        if len(self.bulk_writes) != self.call:
+            return await super().bulk_write(requests, ordered)
+        applied = await super().bulk_write([r for i, r in enumerate(requests) if i != self.index], ordered)
+        self.bulk_writes[-1] = list(requests)
+        raise BulkWriteError({
+            "nMatched": applied.matched_count,
+            "nModified": applied.modified_count,
+            "writeErrors": [{"index": self.index, "errmsg": "boom"}],
+        })
+
+
+def test_bulk_patch_writes_filter_ops_before_id_ops_and_reports_per_op():
+    collection = StubCollection([
+        {"id": "a", "status": "active"}, {"id": "b", "status": "active"}, {"id": "c", "status": "sold"},
+    ])
+    ops = [
+        PatchOp({"id": "a"}, {"price": 1}, id="a"),
+        PatchOp({"status": "active"}, {"status": "sold"}, many=True),
+        PatchOp({"id": "b", "version": 3}, {"price": 2}, id="b"),
+    ]
+    result = asyncio.run(bulk_patch(collection, ops))
+
+    # Separate calls: unordered bulk_write doesn't guarantee filter ops run before id ops
+    calls = collection.bulk_writes
+    assert [[type(r).__name__ for r in call] for call in calls] == [["UpdateMany"], ["UpdateOne", "UpdateOne"]]
+    filter_stamp = calls[0][0]._doc[0]["$set"]["updated_at"]["$literal"]
+    id_stamp = calls[1][0]._doc[0]["$set"]["updated_at"]["$literal"]
+    assert filter_stamp < id_stamp
+    assert (result["matched"], result["modified"]) == (3, 3)
+    assert [(r["index"], r["matched"]) for r in result["operations"]] == [(0, 1), (1, 2), (2, 0)]
+    assert {doc["id"]: (doc["status"], doc.get("price")) for doc in collection.docs} == {
+        "a": ("sold", 1), "b": ("sold", None), "c": ("sold", None),
+    }
+
+
+def test_bulk_patch_maps_write_errors_back_to_request_order():
+    collection = FailingCollection([{"id": "a", "status": "active"}, {"id": "b", "status": "sold"}], call=1, index=1)
+    ops = [
+        PatchOp({"id": "a"}, {"price": 1}, id="a"),
+        PatchOp({"status": "active"}, {"status": "sold"}, many=True),
+        PatchOp({"id": "b"}, {"price": 2}, id="b"),
+    ]
+    result = asyncio.run(bulk_patch(collection, ops))
+    assert result["operations"][2] == {"index": 2, "matched": 0, "modified": 0, "error": "boom"}
+    assert result["operations"][0]["matched"] == 1 and "error" not in result["operations"][0]
+    assert result["operations"][1]["matched"] == 1
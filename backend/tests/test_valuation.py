@@ -0,0 +1,78 @@
+# Comparable-sales valuation tests
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from realty.valuation import ComparableSet
+from tests.conftest import StubCollection
+
+
+def sale(id, price, sqft=2000, property_type="house", location="Austin, TX", year_built=2000, status="sold"):
+    return {
+        "id": id, "status": status, "property_type": property_type, "location": location,
+        "price": price, "sqft": sqft, "year_built": year_built,
+    }
+
+
+def candidate(sqft=2000, property_type="house", location="Austin, TX", year_built=2000):
+    return {"property_type": property_type, "location": location, "sqft": sqft, "year_built": year_built}
+
+
+def test_estimates_from_nearest_comparables_in_the_same_place():
+    comparables = ComparableSet([
+        sale("a", 400_000), sale("b", 500_000), sale("c", 600_000),
+        sale("huge", 5_000_000, sqft=8000),
+        sale("elsewhere", 9_000_000, location="Miami, FL"),
+        sale("condo", 9_000_000, property_type="condo"),
+    ])
+    [result] = comparables.value([candidate(sqft=1000, location=" austin,  tx")], k=3)
+    assert result["match"] == "location" and result["comparables"] == 3
+    assert sorted(result["comparable_ids"]) == ["a", "b", "c"]
+    assert result["price_per_sqft"] == 250.0
+    assert (result["price_low"], result["estimated_price"], result["price_high"]) == (225_000, 250_000, 275_000)
+
+
+def test_size_and_age_rank_comparables():
+    comparables = ComparableSet([
+        sale("same", 500_000), sale("bigger", 500_000, sqft=2600),
+        sale("older", 500_000, year_built=1960), sale("undated", 500_000, year_built=None),
+    ])
+    [result] = comparables.value([candidate()], k=4)
+    assert result["comparable_ids"] == ["same", "undated", "bigger", "older"]
+    # Without a year_built on the candidate only size counts
+    [result] = comparables.value([candidate(year_built=None)], k=3)
+    assert sorted(result["comparable_ids"]) == ["older", "same", "undated"]
+
+
+def test_falls_back_to_type_then_reports_unvalued():
+    comparables = ComparableSet([sale("a", 400_000), sale("b", 500_000), sale("c", 600_000), sale("free", 0)])
+    results = comparables.value([
+        candidate(location="Dallas, TX"), candidate(property_type="land"), candidate(sqft=0),
+    ])
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert results[0]["match"] == "type" and results[0]["comparables"] == 3
+    assert results[1]["match"] is None and results[1]["estimated_price"] is None
+    assert results[2]["comparable_ids"] == []
+
+
+def test_large_batches_are_split_into_blocks(monkeypatch):
+    monkeypatch.setattr("realty.valuation._BLOCK_CELLS", 10)
+    comparables = ComparableSet([sale(f"s{i}", 100_000 * (i + 1), sqft=1000 + 100 * i) for i in range(6)])
+    results = comparables.value([candidate(sqft=1000 + 100 * (i % 6)) for i in range(25)], k=1)
+    assert [r["comparable_ids"] for r in results] == [[f"s{i % 6}"] for i in range(25)]
+    assert results[7]["estimated_price"] == 200_000
+
+
+def test_load_reads_every_collection_for_the_statuses():
+    hot = StubCollection([sale("a", 400_000), sale("active", 1, status="active")])
+    cold = StubCollection([sale("b", 500_000), sale("c", 600_000)])
+    comparables = asyncio.run(ComparableSet.load([hot, cold], ["sold"]))
+    assert len(comparables) == 3
+    assert comparables.value([candidate()])[0]["price_per_sqft"] == pytest.approx(250.0)
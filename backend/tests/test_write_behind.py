@@ -0,0 +1,101 @@
+# Write-behind insert queue tests
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to Python path for imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from realty.write_behind import WriteBehindQueue
+from tests.conftest import StubCollection
+
+
+class SlowCollection(StubCollection):
+    # Records each insert_many batch; waits `delay` seconds first, or fails with `error`
+    def __init__(self, delay=0.0, error=None):
+        super().__init__(name="status_checks")
+        self.batches = []
+        self.delay = delay
+        self.error = error
+
+    async def insert_many(self, docs, ordered=True):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        self.batches.append([doc["n"] for doc in docs])
+        return await super().insert_many(docs, ordered)
+
+
+def test_flushes_by_size_then_by_time():
+    async def scenario():
+        collection = SlowCollection()
+        queue = WriteBehindQueue(collection, batch_size=3, max_delay=0.2)
+        queue.start()
+        for n in range(4):
+            await queue.submit({"n": n})
+        await asyncio.sleep(0.02)
+        assert collection.batches == [[0, 1, 2]]
+        await asyncio.sleep(0.3)
+        assert collection.batches == [[0, 1, 2], [3]]
+        await queue.stop()
+        return queue.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["written"] == 4 and stats["flushes"] == 2 and stats["depth"] == 0
+    assert stats["max_depth"] >= 3 and stats["avg_flush_ms"] is not None
+
+
+def test_stop_flushes_queued_documents_and_later_writes_go_direct():
+    async def scenario():
+        collection = SlowCollection()
+        queue = WriteBehindQueue(collection, batch_size=100, max_delay=60)
+        await queue.submit({"n": "before start"})
+        queue.start()
+        for n in range(5):
+            await queue.submit({"n": n})
+        await queue.stop()
+        await queue.submit({"n": "after stop"})
+        return collection
+
+    collection = asyncio.run(scenario())
+    assert collection.batches == [[0, 1, 2, 3, 4]]
+    assert [doc["n"] for doc in collection.docs] == ["before start", 0, 1, 2, 3, 4, "after stop"]
+
+
+def test_full_queue_waits_then_rejects():
+    async def scenario():
+        collection = SlowCollection(delay=0.2)
+        queue = WriteBehindQueue(collection, batch_size=1, max_delay=0, max_queue=1, put_timeout=0.05)
+        queue.start()
+        await queue.submit({"n": 0})
+        await asyncio.sleep(0)  # flusher takes 0 and blocks in insert_many
+        await queue.submit({"n": 1})
+        with pytest.raises(asyncio.QueueFull):
+            await queue.submit({"n": 2})
+        await queue.stop()
+        return collection, queue.stats()
+
+    collection, stats = asyncio.run(scenario())
+    assert collection.batches == [[0], [1]]
+    assert stats["waits"] == 1 and stats["rejected"] == 1 and stats["enqueued"] == 2
+
+
+def test_failed_flushes_are_counted_not_raised():
+    async def scenario(error):
+        queue = WriteBehindQueue(SlowCollection(error=error), batch_size=2)
+        queue.start()
+        await queue.submit({"n": 0})
+        await queue.submit({"n": 1})
+        await queue.stop()
+        return queue.stats()
+
+    stats = asyncio.run(scenario(AutoReconnect("down")))
+    assert stats["failed"] == 2 and stats["written"] == 0
+    stats = asyncio.run(scenario(BulkWriteError({"nInserted": 1, "writeErrors": [{}]})))
+    assert stats["failed"] == 1 and stats["written"] == 1
@@ -78,7 +78,7 @@ const RealEstatePage = () => {
   const fetchProperties = async () => {
     try {
       setPropertiesLoading(true);
-      const response = await axios.get(`${API}/properties`);
+      const response = await axios.get(`${API}/properties`, { params: { fields: 'summary' } });
       setProperties(response.data);
     } catch (error) {
       console.error('Error fetching properties:', error);